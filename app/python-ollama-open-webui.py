@@ -1,27 +1,158 @@
+import atexit
 import json
 import logging
+import logging.handlers
 import os
 import queue
+import random
 import subprocess
+import sys
 import threading
 
 # GitHub Actions test rebuild
 import time
-from typing import Any, Dict, List
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
 
 import gradio as gr
 import requests
-from flask import Flask, jsonify, request, send_from_directory
+from flask import Flask, Response, g, jsonify, request, send_from_directory, stream_with_context
+from werkzeug.exceptions import HTTPException
 from werkzeug.serving import make_server
 
 # Build trigger comment - pipeline model fix deployment
 
 # --- Logging Configuration ---
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(module)s - %(funcName)s - %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S",
-)
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(module)s - %(funcName)s - %(message)s"
+LOG_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class SampledLogFilter(logging.Filter):
+    """Rate-limits and samples INFO/DEBUG records per message type (source line).
+
+    Each call site gets a token bucket refilled at ``rate_per_second``; records
+    beyond the bucket are dropped and counted, and the next record that gets
+    through reports how many were suppressed. WARNING and above always pass.
+    """
+
+    def __init__(self, rate_per_second: float = 10.0, sample_rate: float = 1.0):
+        super().__init__()
+        self.rate_per_second = rate_per_second
+        self.sample_rate = sample_rate
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return False
+        if self.rate_per_second <= 0:
+            return True
+
+        key = (record.name, record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            tokens, last, suppressed = self._buckets.get(key, (self.rate_per_second, now, 0))
+            tokens = min(self.rate_per_second, tokens + (now - last) * self.rate_per_second)
+            if tokens < 1:
+                self._buckets[key] = (tokens, now, suppressed + 1)
+                return False
+            self._buckets[key] = (tokens - 1, now, 0)
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class JsonLogFormatter(logging.Formatter):
+    """Formats records as single-line JSON for log collectors."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": self.formatTime(record, LOG_DATE_FORMAT),
+            "level": record.levelname,
+            "logger": record.name,
+            "module": record.module,
+            "function": record.funcName,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "suppressed", 0):
+            entry["suppressed"] = record.suppressed
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class SuppressedCountFormatter(logging.Formatter):
+    """Plain-text formatter that notes how many similar records were rate-limited."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = super().format(record)
+        if getattr(record, "suppressed", 0):
+            message += f" [{record.suppressed} similar messages suppressed]"
+        return message
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that never blocks request threads and defers formatting.
+
+    Records are enqueued unformatted so message interpolation happens on the
+    background writer thread; when the queue is full the record is dropped.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def configure_logging() -> logging.Handler:
+    """Install the root log handler configured from LOG_* environment variables.
+
+    LOG_ASYNC (default true) routes records through a bounded queue to a background
+    writer; LOG_JSON switches to structured output; LOG_RATE_LIMIT and LOG_SAMPLE_RATE
+    throttle INFO/DEBUG records per call site.
+    """
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if os.getenv("LOG_JSON", "false").lower() == "true":
+        stream_handler.setFormatter(JsonLogFormatter())
+    else:
+        stream_handler.setFormatter(SuppressedCountFormatter(LOG_FORMAT, LOG_DATE_FORMAT))
+
+    if os.getenv("LOG_ASYNC", "true").lower() == "true":
+        log_queue = queue.Queue(maxsize=int(os.getenv("LOG_QUEUE_SIZE", "10000")))
+        handler = NonBlockingQueueHandler(log_queue)
+        listener = logging.handlers.QueueListener(log_queue, stream_handler)
+        listener.start()
+        atexit.register(listener.stop)
+    else:
+        handler = stream_handler
+
+    handler.addFilter(
+        SampledLogFilter(
+            rate_per_second=float(os.getenv("LOG_RATE_LIMIT", "10")),
+            sample_rate=float(os.getenv("LOG_SAMPLE_RATE", "1.0")),
+        )
+    )
+
+    root_logger = logging.getLogger()
+    root_logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    root_logger.addHandler(handler)
+    return handler
+
+
+log_handler = configure_logging()
 logger = logging.getLogger(__name__)
 # --- End Logging Configuration ---
 
@@ -34,6 +165,724 @@ except ImportError:
     OPENLIT_AVAILABLE = False
     logger.warning("OpenLit not available - observability disabled")
 
+# --- OpenTelemetry Tracing (API ships with openlit) ---
+try:
+    from opentelemetry import context as otel_context
+    from opentelemetry import trace as otel_trace
+    from opentelemetry.propagate import extract as otel_extract
+    from opentelemetry.propagate import inject as otel_inject
+
+    OTEL_AVAILABLE = True
+except ImportError:
+    OTEL_AVAILABLE = False
+
+
+class RequestTracer:
+    """Creates OpenTelemetry spans for the chat pipeline and no-ops when tracing is off."""
+
+    def __init__(self):
+        self.enabled = False
+        self.record_model_metrics = False
+        self._tracer = None
+
+    def enable(self, record_model_metrics: bool = False) -> bool:
+        """Start emitting spans through the globally configured tracer provider."""
+        if not OTEL_AVAILABLE:
+            logger.warning("OpenTelemetry API not available - request tracing disabled")
+            return False
+        self._tracer = otel_trace.get_tracer("ai-compare")
+        self.record_model_metrics = record_model_metrics
+        self.enabled = True
+        return True
+
+    @contextmanager
+    def span(
+        self,
+        name: str,
+        kind: str = "internal",
+        attributes: Dict[str, Any] = None,
+        carrier: Dict[str, str] = None,
+    ):
+        """Context manager yielding an active span, or None when tracing is disabled.
+
+        ``carrier`` holds inbound headers to continue a remote trace (server spans).
+        """
+        if not self.enabled:
+            yield None
+            return
+
+        span_kinds = {
+            "internal": otel_trace.SpanKind.INTERNAL,
+            "server": otel_trace.SpanKind.SERVER,
+            "client": otel_trace.SpanKind.CLIENT,
+        }
+        context = otel_extract(carrier) if carrier is not None else None
+        with self._tracer.start_as_current_span(
+            name,
+            context=context,
+            kind=span_kinds.get(kind, otel_trace.SpanKind.INTERNAL),
+            attributes={k: v for k, v in (attributes or {}).items() if v is not None},
+        ) as span:
+            yield span
+
+    def in_current_context(self, chunks):
+        """Wrap a generator so each step runs under the trace context active now.
+
+        Streamed responses are iterated after the request handler (and its server
+        span) has returned; without this, spans opened by the generator start a new
+        trace instead of being children of the request.
+        """
+        if not self.enabled:
+            return chunks
+        # Captured here, not inside the generator, which only starts once streaming does
+        context = otel_context.get_current()
+
+        def run():
+            while True:
+                token = otel_context.attach(context)
+                try:
+                    chunk = next(chunks)
+                except StopIteration:
+                    return
+                finally:
+                    otel_context.detach(token)
+                yield chunk
+
+        return run()
+
+    def inject_headers(self, headers: Dict[str, str] = None) -> Dict[str, str]:
+        """Add W3C trace context headers for the current span to an outbound request."""
+        headers = headers if headers is not None else {}
+        if self.enabled:
+            otel_inject(headers)
+        return headers
+
+    @staticmethod
+    def set_attributes(span, attributes: Dict[str, Any]):
+        """Set attributes on a span, ignoring a disabled (None) span and None values."""
+        if span is None:
+            return
+        for key, value in attributes.items():
+            if value is not None:
+                span.set_attribute(key, value)
+
+    def record_ollama_metrics(self, span, response_data: Dict):
+        """Attach Ollama token counts and timings (reported in ns) to a span."""
+        if span is None or not self.record_model_metrics:
+            return
+
+        def to_ms(value):
+            return round(value / 1_000_000, 2) if isinstance(value, (int, float)) else None
+
+        prompt_tokens = response_data.get("prompt_eval_count")
+        completion_tokens = response_data.get("eval_count")
+        eval_duration = response_data.get("eval_duration")
+        tokens_per_second = None
+        if completion_tokens and eval_duration:
+            tokens_per_second = round(completion_tokens / (eval_duration / 1_000_000_000), 2)
+
+        self.set_attributes(
+            span,
+            {
+                "gen_ai.usage.input_tokens": prompt_tokens,
+                "gen_ai.usage.output_tokens": completion_tokens,
+                "ollama.total_duration_ms": to_ms(response_data.get("total_duration")),
+                "ollama.load_duration_ms": to_ms(response_data.get("load_duration")),
+                "ollama.prompt_eval_duration_ms": to_ms(response_data.get("prompt_eval_duration")),
+                "ollama.eval_duration_ms": to_ms(eval_duration),
+                "ollama.tokens_per_second": tokens_per_second,
+            },
+        )
+
+    def record_openai_usage(self, span, response_data: Dict):
+        """Attach token usage from an OpenAI-compatible response (Pipelines / Open WebUI)."""
+        if span is None or not self.record_model_metrics:
+            return
+        usage = response_data.get("usage") or {}
+        self.set_attributes(
+            span,
+            {
+                "gen_ai.usage.input_tokens": usage.get("prompt_tokens"),
+                "gen_ai.usage.output_tokens": usage.get("completion_tokens"),
+            },
+        )
+
+
+# --- Debug Diagnostics (opt-in via DEBUG_ENDPOINTS_ENABLED) ---
+class StackSampler:
+    """Low-overhead wall-clock sampling profiler across all Python threads.
+
+    A background thread snapshots ``sys._current_frames()`` at a fixed rate and
+    aggregates stacks in collapsed (flamegraph.pl / speedscope) format:
+    ``thread;outer_func (file.py:line);inner_func (file.py:line) count``.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _frame_label(frame) -> str:
+        code = frame.f_code
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ":")
+
+    def _collapse(self, thread_name: str, frame) -> str:
+        labels = []
+        while frame is not None:
+            labels.append(self._frame_label(frame))
+            frame = frame.f_back
+        labels.append(thread_name.replace(";", ":").replace(" ", "_"))
+        return ";".join(reversed(labels))
+
+    def profile(self, seconds: float, hz: int = 100) -> Dict[str, Any]:
+        """Sample every thread for ``seconds`` at ``hz`` and return aggregated stacks.
+
+        Only one profile runs at a time; raises RuntimeError if one is in progress.
+        """
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError("A profile is already running")
+        try:
+            interval = 1.0 / hz
+            own_ident = threading.get_ident()
+            counts: Dict[str, int] = {}
+            samples = 0
+            deadline = time.monotonic() + seconds
+            started = time.time()
+            while time.monotonic() < deadline:
+                names = {t.ident: t.name for t in threading.enumerate()}
+                for ident, frame in sys._current_frames().items():
+                    if ident == own_ident:
+                        continue
+                    stack = self._collapse(names.get(ident, f"thread-{ident}"), frame)
+                    counts[stack] = counts.get(stack, 0) + 1
+                samples += 1
+                time.sleep(interval)
+            return {
+                "started": started,
+                "duration_seconds": round(time.time() - started, 3),
+                "hz": hz,
+                "samples": samples,
+                "stacks": counts,
+            }
+        finally:
+            self._lock.release()
+
+    @staticmethod
+    def to_collapsed(stacks: Dict[str, int]) -> str:
+        """Render aggregated stacks as collapsed text, hottest first."""
+        return "".join(
+            f"{stack} {count}\n" for stack, count in sorted(stacks.items(), key=lambda item: -item[1])
+        )
+
+
+def thread_dump() -> List[Dict[str, Any]]:
+    """Return name, state and current stack for every live thread."""
+    import traceback
+
+    frames = sys._current_frames()
+    dump = []
+    for thread in threading.enumerate():
+        frame = frames.get(thread.ident)
+        dump.append(
+            {
+                "name": thread.name,
+                "ident": thread.ident,
+                "daemon": thread.daemon,
+                "alive": thread.is_alive(),
+                "stack": traceback.format_stack(frame) if frame is not None else [],
+            }
+        )
+    return dump
+
+
+class DropOldestQueue(queue.Queue):
+    """Bounded queue whose put() never blocks: when full, the oldest item is discarded.
+
+    ``dropped`` counts discarded items so slow consumers show up in diagnostics.
+    """
+
+    def __init__(self, maxsize: int):
+        super().__init__(maxsize)
+        self.dropped = 0
+
+    def put(self, item, block=True, timeout=None):
+        with self.not_full:
+            if 0 < self.maxsize <= self._qsize():
+                self._get()
+                self.dropped += 1
+            self._put(item)
+            self.unfinished_tasks += 1
+            self.not_empty.notify()
+
+
+class MemoryDiagnostics:
+    """tracemalloc snapshots, snapshot diffs and per-type object counts for leak hunting.
+
+    Tracing starts on the first snapshot request since tracemalloc slows every allocation.
+    """
+
+    def __init__(self, frames: int = 10):
+        self.frames = frames
+        self.baseline = None
+        self.baseline_taken = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _format_stats(stats, limit: int) -> List[Dict[str, Any]]:
+        rows = []
+        for stat in stats[:limit]:
+            frame = stat.traceback[0]
+            row = {
+                "location": f"{frame.filename}:{frame.lineno}",
+                "size_kb": round(stat.size / 1024, 1),
+                "count": stat.count,
+            }
+            if hasattr(stat, "size_diff"):
+                row["size_diff_kb"] = round(stat.size_diff / 1024, 1)
+                row["count_diff"] = stat.count_diff
+            rows.append(row)
+        return rows
+
+    def take_snapshot(self) -> Dict[str, Any]:
+        """Store a new baseline snapshot, starting tracemalloc if needed."""
+        import tracemalloc
+
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.frames)
+            self.baseline = tracemalloc.take_snapshot()
+            self.baseline_taken = time.time()
+            return {"tracing": True, "baseline_taken": self.baseline_taken, "traces": len(self.baseline.traces)}
+
+    def diff(self, limit: int = 20) -> Dict[str, Any]:
+        """Compare a fresh snapshot with the baseline, largest growth first."""
+        import tracemalloc
+
+        with self._lock:
+            if self.baseline is None or not tracemalloc.is_tracing():
+                raise RuntimeError("No baseline snapshot - POST /debug/memory/snapshot first")
+            current = tracemalloc.take_snapshot()
+            stats = current.compare_to(self.baseline, "lineno")
+            return {
+                "baseline_taken": self.baseline_taken,
+                "elapsed_seconds": round(time.time() - self.baseline_taken, 1),
+                "top_growth": self._format_stats(stats, limit),
+            }
+
+    def summary(self, limit: int = 20) -> Dict[str, Any]:
+        """Process memory, top allocation sites (when tracing) and object counts per type."""
+        import gc
+        import tracemalloc
+
+        from collections import Counter
+
+        result: Dict[str, Any] = {"tracing": tracemalloc.is_tracing(), "timestamp": time.time()}
+        try:
+            import psutil
+
+            rss = psutil.Process().memory_info().rss
+            result["rss_mb"] = round(rss / (1024 * 1024), 1)
+        except Exception as e:
+            result["rss_mb"] = None
+            result["rss_error"] = str(e)
+
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            result["traced_current_mb"] = round(current / (1024 * 1024), 2)
+            result["traced_peak_mb"] = round(peak / (1024 * 1024), 2)
+            stats = tracemalloc.take_snapshot().statistics("lineno")
+            result["top_allocations"] = self._format_stats(stats, limit)
+
+        type_counts = Counter(type(obj).__name__ for obj in gc.get_objects())
+        result["object_counts"] = dict(type_counts.most_common(limit))
+        result["gc_counts"] = gc.get_count()
+        return result
+
+
+# --- Automation History ---
+def is_error_reply(reply: str) -> bool:
+    """True when a chat helper returned one of its in-band error strings."""
+    return (
+        reply.startswith("Error")
+        or "Error communicating with Ollama" in reply
+        or "SERVICE DEGRADED" in reply
+    )
+
+
+class AutomationHistory:
+    """Fixed-capacity columnar ring buffer of automation cycles.
+
+    Each cycle is stored as compact numeric columns (``array.array``) instead of
+    result dicts, so memory stays constant however long automation runs. When a
+    ``db_path`` is given, cycles are also appended to a SQLite table in WAL mode and
+    the most recent ``capacity`` rows are reloaded on startup; older rows are pruned
+    every ``capacity // 10`` inserts, so the table stays bounded too.
+
+    Latencies are milliseconds; -1 marks "not measured" (e.g. messages disabled).
+    """
+
+    COLUMNS = (
+        ("timestamp", "d"),
+        ("prompt_index", "i"),
+        ("ollama_ms", "f"),
+        ("webui_ms", "f"),
+        ("ollama_ok", "b"),
+        ("webui_ok", "b"),
+        ("ollama_chars", "i"),
+        ("webui_chars", "i"),
+        ("providers_online", "i"),
+        ("providers_total", "i"),
+        ("provider_check_ms", "f"),
+    )
+
+    def __init__(self, capacity: int = 2880, db_path: str = None):
+        import array
+
+        self.capacity = capacity
+        self.columns = {name: array.array(code, [0] * capacity) for name, code in self.COLUMNS}
+        self.head = 0
+        self.count = 0
+        self.total_recorded = 0
+        self._lock = threading.Lock()
+        self._db = None
+        self._prune_every = max(1, capacity // 10)
+        self._inserts_since_prune = 0
+        if db_path:
+            self._open_db(db_path)
+
+    def _open_db(self, db_path: str):
+        import sqlite3
+
+        try:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            column_defs = ", ".join(
+                f"{name} {'REAL' if code in 'df' else 'INTEGER'}" for name, code in self.COLUMNS
+            )
+            self._db.execute(f"CREATE TABLE IF NOT EXISTS automation_cycles ({column_defs})")
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_cycles_ts ON automation_cycles (timestamp)")
+            self._db.commit()
+
+            names = ", ".join(name for name, _ in self.COLUMNS)
+            rows = self._db.execute(
+                f"SELECT {names} FROM automation_cycles ORDER BY timestamp DESC LIMIT ?",
+                (self.capacity,),
+            ).fetchall()
+            for row in reversed(rows):
+                self._append(dict(zip((name for name, _ in self.COLUMNS), row)))
+            self._prune()
+            logger.info("Automation history persisted to %s (%d cycles restored)", db_path, len(rows))
+        except Exception as e:
+            logger.warning("Automation history persistence disabled - SQLite error: %s", e)
+            self._db = None
+
+    def _append(self, cycle: Dict[str, Any]):
+        for name, _ in self.COLUMNS:
+            self.columns[name][self.head] = cycle.get(name, -1)
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        self.total_recorded += 1
+
+    def _prune(self):
+        """Delete all but the newest ``capacity`` rows (rowids grow with each insert)."""
+        self._db.execute(
+            "DELETE FROM automation_cycles WHERE rowid <= (SELECT MAX(rowid) FROM automation_cycles) - ?",
+            (self.capacity,),
+        )
+        self._db.commit()
+        self._inserts_since_prune = 0
+
+    def record(self, **cycle):
+        """Append one automation cycle; keyword names match COLUMNS."""
+        cycle.setdefault("timestamp", time.time())
+        with self._lock:
+            self._append(cycle)
+        if self._db is not None:
+            try:
+                names = [name for name, _ in self.COLUMNS]
+                self._db.execute(
+                    f"INSERT INTO automation_cycles ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})",
+                    [cycle.get(name, -1) for name in names],
+                )
+                self._db.commit()
+                self._inserts_since_prune += 1
+                if self._inserts_since_prune >= self._prune_every:
+                    self._prune()
+            except Exception as e:
+                logger.warning("Failed to persist automation cycle: %s", e)
+
+    def _indices(self, since: float = None) -> List[int]:
+        """Ring positions in chronological order, optionally only those at/after ``since``."""
+        start = (self.head - self.count) % self.capacity
+        indices = [(start + i) % self.capacity for i in range(self.count)]
+        if since is not None:
+            timestamps = self.columns["timestamp"]
+            indices = [i for i in indices if timestamps[i] >= since]
+        return indices
+
+    def recent(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """The latest ``limit`` cycles as dicts, oldest first."""
+        with self._lock:
+            indices = self._indices()[-limit:] if limit > 0 else []
+            return [{name: self.columns[name][i] for name, _ in self.COLUMNS} for i in indices]
+
+    @staticmethod
+    def _latency_stats(values: List[float]) -> Dict[str, Any]:
+        if not values:
+            return {"avg_ms": None, "p50_ms": None, "p95_ms": None, "max_ms": None}
+        ordered = sorted(values)
+
+        def pct(p):
+            return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))], 1)
+
+        return {
+            "avg_ms": round(sum(ordered) / len(ordered), 1),
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+            "max_ms": round(ordered[-1], 1),
+        }
+
+    def _aggregate(self, indices: List[int]) -> Dict[str, Any]:
+        cols = self.columns
+        result: Dict[str, Any] = {"cycles": len(indices)}
+        for backend in ("ollama", "webui"):
+            measured = [i for i in indices if cols[f"{backend}_ms"][i] >= 0]
+            ok = [i for i in measured if cols[f"{backend}_ok"][i] == 1]
+            result[backend] = {
+                "requests": len(measured),
+                "success_rate": round(len(ok) / len(measured), 3) if measured else None,
+                **self._latency_stats([cols[f"{backend}_ms"][i] for i in ok]),
+            }
+        online = [cols["providers_online"][i] for i in indices]
+        result["providers_online_avg"] = round(sum(online) / len(online), 2) if online else None
+        result["provider_check"] = self._latency_stats([cols["provider_check_ms"][i] for i in indices])
+        return result
+
+    def summary(self, window_seconds: float = None) -> Dict[str, Any]:
+        """Success rates and latency percentiles over the whole buffer or a trailing window."""
+        since = time.time() - window_seconds if window_seconds else None
+        with self._lock:
+            result = self._aggregate(self._indices(since))
+        result.update(
+            {"window_seconds": window_seconds, "capacity": self.capacity, "total_recorded": self.total_recorded}
+        )
+        return result
+
+    def trend(self, bucket_seconds: float = 300, window_seconds: float = None) -> List[Dict[str, Any]]:
+        """Per-bucket aggregates (success rate and latency) for charting over time."""
+        since = time.time() - window_seconds if window_seconds else None
+        with self._lock:
+            buckets: Dict[int, List[int]] = {}
+            for i in self._indices(since):
+                key = int(self.columns["timestamp"][i] // bucket_seconds)
+                buckets.setdefault(key, []).append(i)
+            return [
+                {"bucket_start": key * bucket_seconds, **self._aggregate(indices)}
+                for key, indices in sorted(buckets.items())
+            ]
+
+
+# --- Push Updates (Server-Sent Events) ---
+class EventBroadcaster:
+    """Fan-out of state changes to connected /api/events clients.
+
+    Each subscriber gets its own bounded ``DropOldestQueue``, so one stalled
+    browser tab cannot hold memory or block publishers. Every event is encoded
+    once per publish, and the latest event of each type is replayed to new
+    subscribers so they start from current state without a separate poll.
+    Publishers of deltas pass a full-state ``replay`` payload for that purpose,
+    since replaying the last delta alone would leave new clients partial.
+    """
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self.published = 0
+        self._subscribers: List[DropOldestQueue] = []
+        self._latest: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> DropOldestQueue:
+        subscriber = DropOldestQueue(maxsize=self.queue_size)
+        with self._lock:
+            for message in self._latest.values():
+                subscriber.put(message)
+            self._subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: DropOldestQueue):
+        with self._lock:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+
+    @staticmethod
+    def _encode(event: str, data: Any) -> str:
+        return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'), default=str)}\n\n"
+
+    def publish(self, event: str, data: Any, replay: Any = None):
+        """Send ``data`` to current subscribers; new ones get ``replay`` (default ``data``)."""
+        message = self._encode(event, data)
+        latest = message if replay is None else self._encode(event, replay)
+        with self._lock:
+            self._latest[event] = latest
+            self.published += 1
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            subscriber.put(message)
+
+    def stream(self, subscriber: DropOldestQueue, heartbeat_seconds: float = 15.0):
+        """SSE body for one client; comments keep idle proxies from closing it."""
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    yield subscriber.get(timeout=heartbeat_seconds)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+        finally:
+            self.unsubscribe(subscriber)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "subscribers": len(self._subscribers),
+                "published": self.published,
+                "dropped": sum(subscriber.dropped for subscriber in self._subscribers),
+            }
+
+
+# --- Chat Sessions ---
+class ChatSessionStore:
+    """Server-side multi-turn conversation history, bounded three ways.
+
+    - at most ``max_sessions`` sessions, least recently used evicted first
+    - sessions idle for ``ttl_seconds`` expire
+    - each history is trimmed to ``max_history_tokens`` (estimated as chars / 4)
+
+    Ollama reuses its cached evaluation of a prompt prefix it has already seen, so
+    a history that only grows at the end costs one new turn per request. Trimming
+    therefore drops the oldest half of the history at once rather than one turn at
+    a time: the prefix changes on the rare trim instead of on every turn.
+    """
+
+    # Client-supplied ids become dict keys, so their length is bounded too
+    MAX_ID_LENGTH = 128
+
+    def __init__(self, max_sessions: int = 1000, ttl_seconds: float = 1800, max_history_tokens: int = 2048):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.max_history_tokens = max_history_tokens
+        self.evicted = 0
+        self.expired = 0
+        self._sessions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def estimate_tokens(messages: List[Dict[str, str]]) -> int:
+        return sum(len(m.get("content", "")) // 4 + 4 for m in messages)
+
+    def _expire(self, now: float):
+        # LRU order is also last-used order, so expired sessions are at the front
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if now - session["last_used"] < self.ttl_seconds:
+                break
+            del self._sessions[session_id]
+            self.expired += 1
+
+    def history(self, session_id: str = None) -> tuple:
+        """Return ``(session_id, messages)``, creating a session when the id is new or unknown."""
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            session = self._sessions.get(session_id) if session_id else None
+            if session is None:
+                session_id = session_id or uuid.uuid4().hex
+                session = {"messages": [], "created": now, "last_used": now}
+                self._sessions[session_id] = session
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+                    self.evicted += 1
+            session["last_used"] = now
+            self._sessions.move_to_end(session_id)
+            return session_id, list(session["messages"])
+
+    def append(self, session_id: str, *messages: Dict[str, str]):
+        """Add turns to a session and trim it to the token budget."""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return
+            history = session["messages"]
+            history.extend(messages)
+            while len(history) > 2 and self.estimate_tokens(history) > self.max_history_tokens:
+                # Drop the oldest half, keeping user/assistant pairs together
+                del history[: max(2, (len(history) // 2) & ~1)]
+            session["last_used"] = time.time()
+
+    @classmethod
+    def valid_id(cls, session_id: Any) -> bool:
+        return isinstance(session_id, str) and 0 < len(session_id) <= cls.MAX_ID_LENGTH
+
+    def reset(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._expire(time.time())
+            return {
+                "sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "evicted": self.evicted,
+                "expired": self.expired,
+            }
+
+
+# --- Traffic Capture (opt-in via TRAFFIC_CAPTURE_PATH) ---
+class TrafficRecorder:
+    """Append-only JSON-lines log of anonymized API requests for load replay.
+
+    Only shape is kept - route template, prompt length, model, status and sizes -
+    never prompt text, query strings or client addresses. Recording stops once the
+    file reaches ``max_bytes`` so a forgotten capture cannot fill the disk.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 50 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.recorded = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a", buffering=1)
+        self._size = self._file.tell()
+        self.full = self._size >= max_bytes
+
+    def record(self, **fields):
+        line = json.dumps(fields, separators=(",", ":")) + "\n"
+        with self._lock:
+            if self.full:
+                return
+            if self._size + len(line) > self.max_bytes:
+                self.full = True
+                logger.warning("Traffic capture %s reached %d bytes - recording stopped", self.path, self.max_bytes)
+                return
+            self._file.write(line)
+            self._size += len(line)
+            self.recorded += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {"path": self.path, "recorded": self.recorded, "bytes": self._size, "full": self.full}
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
 
 # --- HTTP API Server for Observable Traffic ---
 class ObservableAPIServer:
@@ -43,13 +892,35 @@ class ObservableAPIServer:
         self.chat_interface = chat_interface
         self.port = port
         self.app = Flask(__name__)
+        # Flask answers 413 for larger request bodies before any handler parses them
+        self.app.config["MAX_CONTENT_LENGTH"] = int(os.getenv("MAX_REQUEST_BYTES", str(1024 * 1024)))
         self.server = None
         self.server_thread = None
+        self.debug_enabled = os.getenv("DEBUG_ENDPOINTS_ENABLED", "false").lower() == "true"
+        self.profiler = StackSampler()
+        self.memory = MemoryDiagnostics(frames=int(os.getenv("TRACEMALLOC_FRAMES", "10")))
+        self.traffic = None
+        capture_path = os.getenv("TRAFFIC_CAPTURE_PATH")
+        if capture_path:
+            try:
+                max_mb = float(os.getenv("TRAFFIC_CAPTURE_MAX_MB", "50"))
+                self.traffic = TrafficRecorder(capture_path, max_bytes=int(max_mb * 1024 * 1024))
+                logger.info("Recording anonymized traffic to %s", capture_path)
+            except OSError as e:
+                logger.warning("Traffic capture disabled - cannot open %s: %s", capture_path, e)
         self.setup_routes()
+        if self.debug_enabled:
+            self.setup_debug_routes()
+        if self.traffic:
+            self.setup_traffic_capture()
 
     def setup_routes(self):
         """Setup HTTP API routes for observable traffic."""
 
+        @self.app.errorhandler(413)
+        def request_too_large(error):
+            return jsonify({"error": "Request body exceeds MAX_REQUEST_BYTES", "status": "error"}), 413
+
         @self.app.route("/health", methods=["GET", "OPTIONS"])
         def health_check():
             """Health check endpoint - automatically fails when availability demo ConfigMap is in broken state."""
@@ -78,7 +949,7 @@ class ObservableAPIServer:
                     is_demo_active, demo_state, config_value = self.chat_interface._check_configmap_demo_state()
                     if is_demo_active and demo_state == "ON":
                         logger.error(
-                            f"Health check failed - Availability demo ACTIVE (ConfigMap broken: {config_value})"
+                            "Health check failed - Availability demo ACTIVE (ConfigMap broken: %s)", config_value
                         )
                         return (
                             jsonify(
@@ -93,7 +964,7 @@ class ObservableAPIServer:
                         )
                 except Exception as configmap_error:
                     # If ConfigMap check fails, log but don't fail health check
-                    logger.debug(f"ConfigMap check failed (health check continues): {configmap_error}")
+                    logger.debug("ConfigMap check failed (health check continues): %s", configmap_error)
 
                 logger.info("Health check successful - service operational")
                 return (
@@ -108,7 +979,7 @@ class ObservableAPIServer:
                 )
 
             except Exception as e:
-                logger.error(f"Health check endpoint error: {e}")
+                logger.error("Health check endpoint error: %s", e)
                 return jsonify({"status": "ERROR", "error": str(e)}), 500
 
         @self.app.route("/api/test", methods=["GET", "OPTIONS"])
@@ -134,14 +1005,42 @@ class ObservableAPIServer:
             logger.info("Provider status endpoint accessed")
             try:
                 # Return current provider status in the format expected by React frontend
-                return jsonify({
-                    "providers": self.chat_interface.provider_status,
+                providers = self.chat_interface.provider_status
+                renderer = getattr(self.chat_interface, "status_renderer", None)
+                if not isinstance(renderer, ProviderStatusRenderer):
+                    return jsonify({"providers": providers, "timestamp": time.time()}), 200
+
+                # Unchanged providers since the client's last poll: skip the body
+                renderer.sync(providers)
+                etag = renderer.etag
+                if etag in request.headers.get("If-None-Match", ""):
+                    return Response(status=304, headers={"ETag": etag})
+                response = jsonify({
+                    "providers": providers,
+                    "summary": renderer.summary(),
+                    "version": renderer.version,
                     "timestamp": time.time(),
-                }), 200
+                })
+                response.headers["ETag"] = etag
+                return response, 200
             except Exception as e:
-                logger.error(f"Provider status endpoint error: {e}")
+                logger.error("Provider status endpoint error: %s", e)
                 return jsonify({"error": str(e), "providers": {}, "timestamp": time.time()}), 500
 
+        @self.app.route("/api/events", methods=["GET"])
+        def events():
+            """Server-Sent Events: provider-status, demo-state and automation-result pushes."""
+            broadcaster = getattr(self.chat_interface, "events", None)
+            if not isinstance(broadcaster, EventBroadcaster):
+                return jsonify({"error": "Push updates not available"}), 404
+            self.chat_interface.start_demo_state_watcher()
+            heartbeat = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+            return Response(
+                stream_with_context(broadcaster.stream(broadcaster.subscribe(), heartbeat)),
+                mimetype="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+            )
+
         @self.app.route("/api/demo/status", methods=["GET", "OPTIONS"])
         def demo_status():
             """Demo status endpoint for React frontend."""
@@ -166,98 +1065,238 @@ class ObservableAPIServer:
                 logger.error(f"Demo status endpoint error: {e}")
                 return jsonify({"error": str(e), "timestamp": time.time()}), 500
 
+        @self.app.route("/api/automation/history", methods=["GET", "OPTIONS"])
+        def automation_history():
+            """Recent automation cycles from the bounded history buffer."""
+            try:
+                limit = int(request.args.get("limit", "50"))
+                history = self.chat_interface.automation_history
+                return jsonify({"cycles": history.recent(limit), "timestamp": time.time()}), 200
+            except Exception as e:
+                logger.error("Automation history API error: %s", e)
+                return jsonify({"error": str(e)}), 500
+
+        @self.app.route("/api/automation/history/summary", methods=["GET", "OPTIONS"])
+        def automation_history_summary():
+            """Success rates and latency percentiles, optionally over ?window=seconds."""
+            try:
+                window = request.args.get("window", type=float)
+                return jsonify(self.chat_interface.automation_history.summary(window)), 200
+            except Exception as e:
+                logger.error("Automation history summary API error: %s", e)
+                return jsonify({"error": str(e)}), 500
+
+        @self.app.route("/api/automation/history/trend", methods=["GET", "OPTIONS"])
+        def automation_history_trend():
+            """Bucketed success rate and latency trend (?bucket=seconds&window=seconds)."""
+            try:
+                bucket = request.args.get("bucket", default=300.0, type=float)
+                window = request.args.get("window", type=float)
+                trend = self.chat_interface.automation_history.trend(bucket, window)
+                return jsonify({"bucket_seconds": bucket, "buckets": trend, "timestamp": time.time()}), 200
+            except Exception as e:
+                logger.error("Automation history trend API error: %s", e)
+                return jsonify({"error": str(e)}), 500
+
         @self.app.route("/api/chat", methods=["POST", "OPTIONS"])
         def chat_completion():
             """Chat completion endpoint for frontend communication."""
-            try:
-                if (
-                    hasattr(self.chat_interface, "service_health_failure")
-                    and self.chat_interface.service_health_failure
-                ):
-                    logger.error(
-                        "Chat API failed - SERVICE_HEALTH_FAILURE=true (SUSE Observability pattern)"
+            with self.chat_interface.tracer.span(
+                "POST /api/chat",
+                kind="server",
+                attributes={"http.request.method": "POST", "http.route": "/api/chat"},
+                carrier=dict(request.headers),
+            ) as span:
+                try:
+                    if (
+                        hasattr(self.chat_interface, "service_health_failure")
+                        and self.chat_interface.service_health_failure
+                    ):
+                        logger.error(
+                            "Chat API failed - SERVICE_HEALTH_FAILURE=true (SUSE Observability pattern)"
+                        )
+                        return (
+                            jsonify(
+                                {
+                                    "error": "Service degraded - health check failure",
+                                    "status": "service_failure",
+                                    "timestamp": time.time(),
+                                }
+                            ),
+                            500,
+                        )
+
+                    data = request.get_json()
+                    if not data or "message" not in data:
+                        logger.warning("Chat API - missing message in request")
+                        return jsonify({"error": "Missing 'message' in request body"}), 400
+
+                    message = data["message"]
+                    model = data.get("model", "tinyllama:latest")
+                    if not isinstance(message, str) or len(message) > self.chat_interface.max_message_chars:
+                        return jsonify({
+                            "error": f"'message' must be a string of at most {self.chat_interface.max_message_chars} characters"
+                        }), 413
+                    num_predict = data.get("max_tokens")
+                    if num_predict is not None and (
+                        isinstance(num_predict, bool) or not isinstance(num_predict, int) or num_predict < 1
+                    ):
+                        return jsonify({"error": "'max_tokens' must be a positive integer"}), 400
+                    # One budget for the whole request, optionally shortened by the caller
+                    timeout_header = request.headers.get("X-Request-Timeout-Ms", "")
+                    deadline = self.chat_interface.new_deadline(
+                        int(timeout_header) if timeout_header.isdigit() else None
+                    )
+                    RequestTracer.set_attributes(
+                        span,
+                        {"gen_ai.request.model": model, "chat.message_length": len(message)},
                     )
+
+                    logger.info("Chat API request - message: '%.50s...', model: %s", message, model)
+
+                    # Get responses from both services; a session_id continues a conversation
+                    user_turn = {"role": "user", "content": message}
+                    session_id = data.get("session_id")
+                    if session_id is not None and not ChatSessionStore.valid_id(session_id):
+                        return jsonify({
+                            "error": f"'session_id' must be a non-empty string of at most "
+                                     f"{ChatSessionStore.MAX_ID_LENGTH} characters"
+                        }), 400
+                    if session_id or data.get("session"):
+                        session_id, history = self.chat_interface.sessions.history(session_id)
+                        messages = history + [user_turn]
+                    else:
+                        messages = [user_turn]
+
+                    if data.get("stream"):
+                        # Streaming relays Ollama's NDJSON chunks as they arrive (Ollama only)
+                        chunks = self.chat_interface.stream_chat_with_ollama(messages, model, num_predict, deadline)
+                        if session_id:
+                            chunks = self._record_streamed_turn(chunks, session_id, user_turn)
+                        chunks = self.chat_interface.tracer.in_current_context(chunks)
+                        return Response(
+                            stream_with_context(chunks),
+                            mimetype="application/x-ndjson",
+                            headers={"X-Session-Id": session_id} if session_id else None,
+                        )
+
+                    # Ollama response
+                    logger.info("Requesting Ollama response from %s", self.chat_interface.ollama_base_url)
+                    try:
+                        ollama_response = self.chat_interface.chat_with_ollama(
+                            messages, model, num_predict, deadline
+                        )
+                        logger.info("Ollama response received: %.100s...", ollama_response)
+                    except Exception as e:
+                        logger.error("Ollama request failed: %s", e)
+                        ollama_response = f"Ollama Error: {str(e)}"
+
+                    # Open WebUI response
+                    logger.info("Requesting Open WebUI response from %s", self.chat_interface.open_webui_base_url)
+                    try:
+                        webui_response = self.chat_interface.chat_with_open_webui(
+                            messages, model, deadline
+                        )
+                        logger.info("Open WebUI response received: %.100s...", webui_response)
+                    except Exception as e:
+                        logger.error("Open WebUI request failed: %s", e)
+                        webui_response = f"Open WebUI Error: {str(e)}"
+
+                    result = {
+                        "ollama_response": ollama_response,
+                        "webui_response": webui_response,
+                        "status": "success",
+                        "timestamp": time.time(),
+                        "model": model,
+                    }
+                    if session_id:
+                        # Failed turns are not kept, so a retry does not repeat the question
+                        if not is_error_reply(ollama_response):
+                            self.chat_interface.sessions.append(
+                                session_id, user_turn, {"role": "assistant", "content": ollama_response}
+                            )
+                        result["session_id"] = session_id
+
+                    logger.info("Chat API request completed successfully")
+                    return jsonify(result), 200
+
+                except HTTPException:
+                    raise
+                except Exception as e:
+                    logger.error("Chat API endpoint error: %s", e, exc_info=True)
                     return (
                         jsonify(
                             {
-                                "error": "Service degraded - health check failure",
-                                "status": "service_failure",
+                                "error": str(e),
+                                "status": "error",
                                 "timestamp": time.time(),
+                                "details": "Check server logs for full traceback",
                             }
                         ),
                         500,
                     )
 
-                data = request.get_json()
-                if not data or "message" not in data:
-                    logger.warning("Chat API - missing message in request")
-                    return jsonify({"error": "Missing 'message' in request body"}), 400
-
-                message = data["message"]
-                model = data.get("model", "tinyllama:latest")
+        @self.app.route("/api/chat/sessions/<session_id>", methods=["DELETE"])
+        def reset_chat_session(session_id):
+            """Forget a conversation's history."""
+            if self.chat_interface.sessions.reset(session_id):
+                return jsonify({"status": "deleted", "session_id": session_id}), 200
+            return jsonify({"error": "Unknown session"}), 404
 
-                logger.info(
-                    f"Chat API request - message: '{message[:50]}...', model: {model}"
-                )
+        @self.app.route("/api/compare", methods=["POST", "OPTIONS"])
+        def compare_models():
+            """Run one prompt on several models concurrently.
 
-                # Get responses from both services
-                messages = [{"role": "user", "content": message}]
-
-                # Ollama response
-                logger.info(
-                    f"Requesting Ollama response from {self.chat_interface.ollama_base_url}"
-                )
-                try:
-                    ollama_response = self.chat_interface.chat_with_ollama(
-                        messages, model
-                    )
-                    logger.info(f"Ollama response received: {ollama_response[:100]}...")
-                except Exception as e:
-                    logger.error(f"Ollama request failed: {e}")
-                    ollama_response = f"Ollama Error: {str(e)}"
-
-                # Open WebUI response
-                logger.info(
-                    f"Requesting Open WebUI response from {self.chat_interface.open_webui_base_url}"
-                )
-                try:
-                    webui_response = self.chat_interface.chat_with_open_webui(
-                        messages, model
-                    )
-                    logger.info(
-                        f"Open WebUI response received: {webui_response[:100]}..."
-                    )
-                except Exception as e:
-                    logger.error(f"Open WebUI request failed: {e}")
-                    webui_response = f"Open WebUI Error: {str(e)}"
-
-                result = {
-                    "ollama_response": ollama_response,
-                    "webui_response": webui_response,
-                    "status": "success",
-                    "timestamp": time.time(),
-                    "model": model,
-                }
-
-                logger.info("Chat API request completed successfully")
+            Streams one NDJSON line per model as it finishes, then a summary line;
+            ``"stream": false`` returns a single JSON document instead.
+            """
+            if self.chat_interface.service_health_failure:
+                return jsonify({"error": "Service degraded - health check failure", "status": "service_failure"}), 500
+            data = request.get_json(silent=True) or {}
+            models = data.get("models")
+            if "message" not in data or not isinstance(models, list) or not models:
+                return jsonify({"error": "Request needs 'message' and a non-empty 'models' list"}), 400
+            if not isinstance(data["message"], str) or len(data["message"]) > self.chat_interface.max_message_chars:
+                return jsonify({"error": f"'message' is limited to {self.chat_interface.max_message_chars} characters"}), 413
+            models = list(dict.fromkeys(str(m) for m in models))
+            if len(models) > self.chat_interface.compare_max_models:
+                return jsonify({"error": f"At most {self.chat_interface.compare_max_models} models per comparison"}), 400
+
+            start = time.monotonic()
+            results = self.chat_interface.compare_models(data["message"], models)
+            if not data.get("stream", True):
+                ordered = sorted(results, key=lambda r: models.index(r["model"]))
+                return jsonify({"results": ordered, "total_ms": round((time.monotonic() - start) * 1000, 1)}), 200
+
+            def generate():
+                for result in results:
+                    yield json.dumps(result) + "\n"
+                yield json.dumps({"done": True, "models": len(models),
+                                  "total_ms": round((time.monotonic() - start) * 1000, 1)}) + "\n"
+
+            return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+        @self.app.route("/api/pipeline/levels", methods=["POST", "OPTIONS"])
+        def pipeline_levels():
+            """Run one prompt at every pipeline response level in parallel (via the Pipelines service)."""
+            data = request.get_json(silent=True) or {}
+            if "message" not in data:
+                return jsonify({"error": "Missing 'message' in request body"}), 400
+            if not isinstance(data["message"], str) or len(data["message"]) > self.chat_interface.max_message_chars:
+                return jsonify({
+                    "error": f"'message' must be a string of at most {self.chat_interface.max_message_chars} characters"
+                }), 400
+            try:
+                result = self.chat_interface.compare_pipeline_levels(data["message"])
                 return jsonify(result), 200
-
+            except json.JSONDecodeError as e:
+                logger.error("Pipeline levels API got a non-JSON reply: %s", e)
+                return jsonify({"error": "Bad upstream reply: Pipelines did not return a JSON level batch"}), 502
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 503
             except Exception as e:
-                import traceback
-
-                logger.error(f"Chat API endpoint error: {e}")
-                logger.error(f"Chat API traceback: {traceback.format_exc()}")
-                return (
-                    jsonify(
-                        {
-                            "error": str(e),
-                            "status": "error",
-                            "timestamp": time.time(),
-                            "details": "Check server logs for full traceback",
-                        }
-                    ),
-                    500,
-                )
+                logger.error("Pipeline levels API error: %s", e)
+                return jsonify({"error": str(e)}), 502
 
         @self.app.route("/api/availability-demo/toggle", methods=["POST", "OPTIONS"])
         def toggle_availability_demo():
@@ -372,7 +1411,7 @@ class ObservableAPIServer:
                 return jsonify(metrics), 200
 
             except Exception as e:
-                logger.error(f"Metrics API error: {e}")
+                logger.error("Metrics API error: %s", e)
                 return jsonify({"error": str(e)}), 500
 
         # Frontend serving routes
@@ -403,19 +1442,136 @@ class ObservableAPIServer:
         def after_request(response):
             response.headers.add("Access-Control-Allow-Origin", "*")
             response.headers.add(
-                "Access-Control-Allow-Headers", "Content-Type,Authorization"
+                "Access-Control-Allow-Headers", "Content-Type,Authorization,X-Request-Timeout-Ms"
             )
             response.headers.add(
                 "Access-Control-Allow-Methods", "GET,PUT,POST,DELETE,OPTIONS"
             )
             return response
 
+    def _record_streamed_turn(self, chunks, session_id: str, user_turn: Dict[str, str]):
+        """Pass NDJSON chunks through, then store the assembled reply in the session."""
+        parts = []
+        failed = False
+        for chunk in chunks:
+            try:
+                data = json.loads(chunk)
+                parts.append(data.get("message", {}).get("content", ""))
+                failed = failed or "error" in data
+            except ValueError:
+                failed = True
+            yield chunk
+        if not failed:
+            self.chat_interface.sessions.append(
+                session_id, user_turn, {"role": "assistant", "content": "".join(parts)}
+            )
+
+    def setup_traffic_capture(self):
+        """Record the shape of every API request for later replay by the load simulator."""
+
+        @self.app.before_request
+        def start_timer():
+            g.request_start = time.monotonic()
+
+        @self.app.after_request
+        def capture(response):
+            if request.method == "OPTIONS" or request.path.startswith("/debug"):
+                return response
+            try:
+                body = request.get_json(silent=True) if request.is_json else None
+                body = body if isinstance(body, dict) else {}
+                message = body.get("message")
+                fields = dict(
+                    ts=round(time.time(), 3),
+                    route=request.url_rule.rule if request.url_rule else "unmatched",
+                    method=request.method,
+                    status=response.status_code,
+                    model=body.get("model"),
+                    prompt_chars=len(message) if isinstance(message, str) else None,
+                    stream=bool(body.get("stream")),
+                    response_bytes=None if response.is_streamed else response.calculate_content_length(),
+                )
+                started = g.request_start
+
+                def record():
+                    self.traffic.record(**fields, duration_ms=round((time.monotonic() - started) * 1000, 1))
+
+                if response.is_streamed:
+                    # Streamed bodies are still being generated here; time them when the stream closes
+                    response.call_on_close(record)
+                else:
+                    record()
+            except Exception as e:
+                logger.debug("Traffic capture failed: %s", e)
+            return response
+
+    def setup_debug_routes(self):
+        """Setup opt-in diagnostics routes for live profiling of the app pod."""
+        logger.warning("Debug endpoints enabled: /debug/profile, /debug/threads, /debug/memory")
+
+        @self.app.route("/debug/profile", methods=["GET"])
+        def debug_profile():
+            """Sample all thread stacks for ?seconds=N and return collapsed stacks."""
+            try:
+                seconds = min(float(request.args.get("seconds", "10")), 60.0)
+                hz = max(1, min(int(request.args.get("hz", "100")), 1000))
+            except ValueError:
+                return jsonify({"error": "seconds and hz must be numeric"}), 400
+
+            try:
+                result = self.profiler.profile(seconds, hz)
+            except RuntimeError as e:
+                return jsonify({"error": str(e)}), 409
+
+            if request.args.get("format", "collapsed") == "json":
+                return jsonify(result), 200
+            return (
+                StackSampler.to_collapsed(result["stacks"]),
+                200,
+                {"Content-Type": "text/plain; charset=utf-8"},
+            )
+
+        @self.app.route("/debug/threads", methods=["GET"])
+        def debug_threads():
+            """Dump the current stack of every live thread."""
+            threads = thread_dump()
+            return jsonify({"count": len(threads), "threads": threads, "timestamp": time.time()}), 200
+
+        @self.app.route("/debug/memory", methods=["GET"])
+        def debug_memory():
+            """Memory summary: RSS, top allocation sites, object counts and queue depths."""
+            try:
+                limit = max(1, min(int(request.args.get("limit", "20")), 200))
+            except ValueError:
+                return jsonify({"error": "limit must be an integer"}), 400
+            result = self.memory.summary(limit)
+            result["queues"] = self.chat_interface.queue_stats()
+            return jsonify(result), 200
+
+        @self.app.route("/debug/memory/snapshot", methods=["POST"])
+        def debug_memory_snapshot():
+            """Take a tracemalloc baseline snapshot (starts tracing on first call)."""
+            return jsonify(self.memory.take_snapshot()), 200
+
+        @self.app.route("/debug/memory/diff", methods=["GET"])
+        def debug_memory_diff():
+            """Show allocation growth since the baseline snapshot."""
+            try:
+                limit = max(1, min(int(request.args.get("limit", "20")), 200))
+            except ValueError:
+                return jsonify({"error": "limit must be an integer"}), 400
+            try:
+                return jsonify(self.memory.diff(limit)), 200
+            except RuntimeError as e:
+                return jsonify({"error": str(e)}), 409
+
     def start_server(self):
         """Start the HTTP API server in background thread."""
         try:
-            self.server = make_server("0.0.0.0", self.port, self.app)
+            # Threaded so slow inference calls and debug profiles don't block /health
+            self.server = make_server("0.0.0.0", self.port, self.app, threaded=True)
             self.server_thread = threading.Thread(
-                target=self.server.serve_forever, daemon=True
+                target=self.server.serve_forever, name="http-api-server", daemon=True
             )
             self.server_thread.start()
             logger.info(f"Observable HTTP API server started on port {self.port}")
@@ -423,11 +1579,196 @@ class ObservableAPIServer:
         except Exception as e:
             logger.error(f"Failed to start HTTP API server: {e}")
 
-    def stop_server(self):
-        """Stop the HTTP API server."""
-        if self.server:
-            self.server.shutdown()
-            logger.info("Observable HTTP API server stopped")
+    def stop_server(self):
+        """Stop the HTTP API server."""
+        if self.server:
+            self.server.shutdown()
+            logger.info("Observable HTTP API server stopped")
+
+
+# Educational levels of the response_level pipeline (pipelines/response_level_pipeline.py
+# defines the same levels, in the same order, without the emoji)
+PIPELINE_LEVELS = [
+    {"name": "🎯 Default", "modifier": ""},
+    {
+        "name": "🧒 Kid Mode",
+        "modifier": "Explain like I'm 5 years old using simple words, fun examples, and easy-to-understand concepts.",
+    },
+    {
+        "name": "🔬 Young Scientist",
+        "modifier": "Explain like I'm 12 years old with some science details but keep it understandable and engaging.",
+    },
+    {
+        "name": "🎓 College Student",
+        "modifier": "Explain like I'm a college student with technical context, examples, and deeper analysis.",
+    },
+    {
+        "name": "⚗️ Scientific",
+        "modifier": "Give me the full scientific explanation with precise terminology, detailed mechanisms, and technical accuracy.",
+    },
+]
+
+# Provider boxes always drawn in the UI, keyed by name
+DEFAULT_PROVIDERS = {
+    "OpenAI": {"country": "🇺🇸 USA", "flag": "🇺🇸"},
+    "Claude (Anthropic)": {"country": "🇺🇸 USA", "flag": "🇺🇸"},
+    "DeepSeek": {"country": "🇨🇳 China", "flag": "🇨🇳"},
+    "Google Gemini": {"country": "🇺🇸 USA", "flag": "🇺🇸"},
+    "Cohere": {"country": "🇨🇦 Canada", "flag": "🇨🇦"},
+    "Mistral AI": {"country": "🇫🇷 France", "flag": "🇫🇷"},
+    "Perplexity": {"country": "🇺🇸 USA", "flag": "🇺🇸"},
+    "Together AI": {"country": "🇺🇸 USA", "flag": "🇺🇸"},
+    "Groq": {"country": "🇺🇸 USA", "flag": "🇺🇸"},
+    "Hugging Face": {"country": "🇺🇸 USA", "flag": "🇺🇸"},
+}
+
+
+class ProviderStatusRenderer:
+    """Renders the provider panel, re-rendering only providers whose status changed.
+
+    Each provider's card is cached together with the fields it was rendered from,
+    and the online count and response-time totals are adjusted per changed provider
+    instead of being recounted. ``version`` increases whenever any provider changes,
+    so ``etag`` lets HTTP clients skip unchanged updates.
+    """
+
+    HEADER = """
+        <div style='background: linear-gradient(135deg, #0c322c 0%, #1a4a3a 100%); padding: 15px; border-radius: 15px; box-shadow: 0 8px 32px rgba(0,0,0,0.3);'>
+            <h3 style='color: #30ba78; margin: 0 0 15px 0; font-size: 16px; text-align: center; font-weight: 600;'>🤖 Model Providers</h3>
+            
+            
+            <!-- Model Provider List -->
+            <div style='margin-bottom: 15px;'>
+        """
+
+    def __init__(self):
+        self.version = 0
+        self.online = 0
+        self.rt_total = 0
+        self.rt_count = 0
+        # name -> (fingerprint, card_html, online, response_time_ms or None)
+        self._cards: Dict[str, tuple] = {}
+        self._html = None
+        self._epoch = f"{os.getpid():x}-{int(time.time()):x}"
+        self._lock = threading.Lock()
+
+    @property
+    def etag(self) -> str:
+        return f'W/"providers-{self._epoch}-{self.version}"'
+
+    @staticmethod
+    def _fingerprint(info):
+        if isinstance(info, dict):
+            return (info.get("status", "🔴"), info.get("flag", "🌍"), info.get("response_time", "---ms"))
+        return ("legacy", str(info))
+
+    @staticmethod
+    def _response_time_ms(info):
+        rt_str = info.get("response_time") if isinstance(info, dict) else None
+        if not isinstance(rt_str, str) or rt_str == "---ms" or not rt_str.endswith("ms"):
+            return None
+        try:
+            return int(rt_str[:-2])
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _render_card(name: str, info) -> str:
+        if not isinstance(info, dict):
+            # Fallback for old format
+            return f"""
+                <div style='display: flex; align-items: center; justify-content: space-between; padding: 8px 12px; margin-bottom: 4px; background: rgba(255,255,255,0.05); border-radius: 12px;'>
+                    <span style='color: #ffffff; font-size: 12px; font-weight: 500;'>{name}</span>
+                    <span style='font-size: 14px;'>{info}</span>
+                </div>
+                """
+        status = info.get("status", "🔴")
+        flag = info.get("flag", "🌍")
+        response_time = info.get("response_time", "---ms")
+        return f"""
+                <div style='display: flex; align-items: center; justify-content: space-between; padding: 8px 12px; margin-bottom: 4px; background: rgba(255,255,255,0.05); border-radius: 12px; border-left: 3px solid {"#28a745" if status == "🟢" else "#dc3545"};'>
+                    <div style='display: flex; align-items: center; gap: 8px; flex: 1; min-width: 0;'>
+                        <span style='font-size: 14px; width: 18px; text-align: center; flex-shrink: 0;'>{flag}</span>
+                        <span style='color: #ffffff; font-size: 12px; font-weight: 500; flex: 1; white-space: nowrap; overflow: hidden; text-overflow: ellipsis;'>{name}</span>
+                    </div>
+                    <div style='display: flex; align-items: center; gap: 8px; flex-shrink: 0; min-width: 80px;'>
+                        <span style='font-size: 14px; width: 16px; text-align: center;'>{status}</span>
+                        <span style='color: #a0a0a0; font-size: 10px; text-align: right; min-width: 45px; font-family: monospace;'>{response_time}</span>
+                    </div>
+                </div>
+                """
+
+    def _forget(self, name: str):
+        _, _, online, rt = self._cards.pop(name)
+        self.online -= online
+        if rt is not None:
+            self.rt_total -= rt
+            self.rt_count -= 1
+
+    def sync(self, provider_status: Dict) -> List[str]:
+        """Re-render providers that changed since the last call and return their names."""
+        with self._lock:
+            changed = []
+            for name in [n for n in self._cards if n not in provider_status]:
+                self._forget(name)
+                changed.append(name)
+            for name, info in provider_status.items():
+                fingerprint = self._fingerprint(info)
+                cached = self._cards.get(name)
+                if cached and cached[0] == fingerprint:
+                    continue
+                if cached:
+                    self._forget(name)
+                online = int(isinstance(info, dict) and info.get("status") == "🟢")
+                rt = self._response_time_ms(info)
+                self._cards[name] = (fingerprint, self._render_card(name, info), online, rt)
+                self.online += online
+                if rt is not None:
+                    self.rt_total += rt
+                    self.rt_count += 1
+                changed.append(name)
+            if changed:
+                self.version += 1
+                self._html = None
+            return changed
+
+    def summary(self) -> Dict[str, int]:
+        return {
+            "total": len(self._cards),
+            "online": self.online,
+            "offline": len(self._cards) - self.online,
+            "avg_response_ms": int(self.rt_total / self.rt_count) if self.rt_count else 0,
+        }
+
+    def render(self, provider_status: Dict) -> str:
+        self.sync(provider_status)
+        with self._lock:
+            if self._html is None:
+                stats = self.summary()
+                cards = "".join(self._cards[name][1] for name in sorted(self._cards))
+                self._html = self.HEADER + cards + f"""
+            </div>
+            
+            <!-- Compact Statistics -->
+            <div style='background: linear-gradient(135deg, rgba(48, 186, 120, 0.1) 0%, rgba(48, 186, 120, 0.05) 100%); border: 1px solid rgba(48, 186, 120, 0.2); border-radius: 12px; padding: 12px; text-align: center;'>
+                <div style='display: grid; grid-template-columns: 1fr 1fr 1fr; gap: 8px; font-size: 11px;'>
+                    <div style='text-align: center;'>
+                        <div style='color: #28a745; font-weight: 700; font-size: 16px;'>{stats["online"]}</div>
+                        <div style='color: #ffffff; opacity: 0.8; font-size: 9px;'>Online</div>
+                    </div>
+                    <div style='text-align: center;'>
+                        <div style='color: #dc3545; font-weight: 700; font-size: 16px;'>{stats["offline"]}</div>
+                        <div style='color: #ffffff; opacity: 0.8; font-size: 9px;'>Offline</div>
+                    </div>
+                    <div style='text-align: center;'>
+                        <div style='color: #ffc107; font-weight: 700; font-size: 16px;'>{stats["avg_response_ms"]}ms</div>
+                        <div style='color: #ffffff; opacity: 0.8; font-size: 9px;'>Avg RT</div>
+                    </div>
+                </div>
+            </div>
+        </div>
+        """
+            return self._html
 
 
 class ChatInterface:
@@ -445,22 +1786,9 @@ class ChatInterface:
 
         # Initialize provider status with pre-drawn boxes (default offline)
         # CRITICAL: Always guarantee all 10 providers are present from startup
-        default_providers = {
-            "OpenAI": {"country": "🇺🇸 USA", "flag": "🇺🇸"},
-            "Claude (Anthropic)": {"country": "🇺🇸 USA", "flag": "🇺🇸"},
-            "DeepSeek": {"country": "🇨🇳 China", "flag": "🇨🇳"},
-            "Google Gemini": {"country": "🇺🇸 USA", "flag": "🇺🇸"},
-            "Cohere": {"country": "🇨🇦 Canada", "flag": "🇨🇦"},
-            "Mistral AI": {"country": "🇫🇷 France", "flag": "🇫🇷"},
-            "Perplexity": {"country": "🇺🇸 USA", "flag": "🇺🇸"},
-            "Together AI": {"country": "🇺🇸 USA", "flag": "🇺🇸"},
-            "Groq": {"country": "🇺🇸 USA", "flag": "🇺🇸"},
-            "Hugging Face": {"country": "🇺🇸 USA", "flag": "🇺🇸"},
-        }
-
         self.provider_status = {}
         # Always initialize all 10 providers first
-        for name, info in default_providers.items():
+        for name, info in DEFAULT_PROVIDERS.items():
             self.provider_status[name] = {
                 "status": "🔴",
                 "response_time": "---ms",
@@ -480,6 +1808,26 @@ class ChatInterface:
                         "flag", self.provider_status[name]["flag"]
                     )
 
+        # Caches rendered provider cards between Gradio refreshes
+        self.status_renderer = ProviderStatusRenderer()
+        # Pushes state changes to /api/events subscribers instead of having each poll
+        self.events = EventBroadcaster()
+        self.demo_state_poll_seconds = float(os.getenv("DEMO_STATE_POLL_SECONDS", "5"))
+        self._demo_state_watcher = None
+        self._published_fingerprints = {}
+
+        # Multi-model comparison: cap on simultaneous Ollama generations across all requests
+        self.compare_max_concurrency = max(1, int(os.getenv("COMPARE_MAX_CONCURRENCY", "2")))
+        self.compare_max_models = int(os.getenv("COMPARE_MAX_MODELS", "8"))
+        self.compare_slots = threading.BoundedSemaphore(self.compare_max_concurrency)
+
+        # Multi-turn conversations for /api/chat and the Gradio chat
+        self.sessions = ChatSessionStore(
+            max_sessions=int(os.getenv("CHAT_SESSION_MAX", "1000")),
+            ttl_seconds=float(os.getenv("CHAT_SESSION_TTL_SECONDS", "1800")),
+            max_history_tokens=int(os.getenv("CHAT_HISTORY_MAX_TOKENS", "2048")),
+        )
+
         # --- MODIFIED: Load URLs from environment variables for K8s ---
         self.ollama_base_url = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
         self.open_webui_base_url = os.getenv("OPEN_WEBUI_BASE_URL")
@@ -497,6 +1845,22 @@ class ChatInterface:
             os.getenv("INFERENCE_TIMEOUT", "30")
         )  # Reduced from 120s for network policies
 
+        # Size budgets: bounded input, generation length and buffered output per request
+        self.num_predict = int(os.getenv("OLLAMA_NUM_PREDICT", "1000"))
+        self.max_message_chars = int(os.getenv("MAX_MESSAGE_CHARS", "8000"))
+        self.max_response_chars = int(os.getenv("MAX_RESPONSE_CHARS", "16000"))
+
+        # Deadline budget shared by every tier of one request (Pipelines -> Open WebUI -> Ollama)
+        self.request_deadline_seconds = float(os.getenv("REQUEST_DEADLINE_SECONDS", "60"))
+        self.min_attempt_seconds = float(os.getenv("MIN_ATTEMPT_SECONDS", "2"))
+
+        # The all-levels batch runs the pipeline's levels PIPELINE_BATCH_CONCURRENCY at a time
+        batch_concurrency = max(1, int(os.getenv("PIPELINE_BATCH_CONCURRENCY", "5")))
+        batch_rounds = -(-len(PIPELINE_LEVELS) // batch_concurrency)
+        self.pipeline_batch_timeout = int(
+            os.getenv("PIPELINE_BATCH_TIMEOUT", str(self.inference_timeout * batch_rounds))
+        )
+
         # Don't add Open WebUI to the provider status list - keep it separate for functionality
 
         if self.ollama_base_url.endswith("/"):
@@ -543,10 +1907,17 @@ class ChatInterface:
         # Thread management for the runner
         self.automation_thread = None
         self.stop_event = threading.Event()
-        self.results_queue = queue.Queue()
+        self.results_queue = DropOldestQueue(
+            maxsize=int(os.getenv("AUTOMATION_RESULTS_QUEUE_SIZE", "20"))
+        )
         self.latest_automation_result = None
+        self.automation_history = AutomationHistory(
+            capacity=int(os.getenv("AUTOMATION_HISTORY_SIZE", "2880")),
+            db_path=os.getenv("AUTOMATION_HISTORY_DB"),
+        )
 
         # --- OpenLit Observability Initialization ---
+        self.tracer = RequestTracer()
         self._initialize_observability()
 
         # --- HTTP API Server for Observable Traffic ---
@@ -565,6 +1936,23 @@ class ChatInterface:
         if self.open_webui_base_url:
             self._authenticate_open_webui()
 
+    def queue_stats(self) -> Dict[str, Dict[str, int]]:
+        """Depth, capacity and drop counts of the in-process queues."""
+        stats = {
+            "automation_results": {
+                "size": self.results_queue.qsize(),
+                "maxsize": self.results_queue.maxsize,
+                "dropped": getattr(self.results_queue, "dropped", 0),
+            }
+        }
+        if isinstance(log_handler, NonBlockingQueueHandler):
+            stats["log_records"] = {
+                "size": log_handler.queue.qsize(),
+                "maxsize": log_handler.queue.maxsize,
+                "dropped": log_handler.dropped,
+            }
+        return stats
+
     def load_or_create_config(self) -> Dict:
         """Loads configuration from config.json, or creates it with defaults if it doesn't exist."""
         default_config = {
@@ -707,6 +2095,10 @@ class ChatInterface:
                     logger.info("  - Full request tracing through the stack")
             
             openlit.init(**openlit_config)
+
+            # openlit registers the global tracer provider, so our spans share its exporter
+            if trace_requests and self.tracer.enable(record_model_metrics=model_metrics or token_tracking):
+                logger.info("Request tracing enabled - spans emitted for /api/chat and backend calls")
             
             # Store observability settings for use in request handling
             self.observability_settings = {
@@ -865,6 +2257,13 @@ class ChatInterface:
 
     def _check_configmap_demo_state(self) -> tuple:
         """Check current ConfigMap state to determine availability demo status."""
+        with self.tracer.span("configmap.demo_state_lookup") as span:
+            result = self._read_configmap_demo_state()
+            RequestTracer.set_attributes(span, {"demo.state": result[1]})
+            return result
+
+    def _read_configmap_demo_state(self) -> tuple:
+        """Read the demo ConfigMap via kubectl and classify the availability demo state."""
         try:
             import os
             import subprocess
@@ -912,7 +2311,7 @@ class ChatInterface:
                 return False, "unknown", "No demo configuration found"
 
         except Exception as e:
-            logger.error(f"Error checking ConfigMap demo state: {e}")
+            logger.error("Error checking ConfigMap demo state: %s", e)
             return False, "error", f"Error: {str(e)}"
 
     def _start_auto_off_timer(self):
@@ -1077,210 +2476,406 @@ class ChatInterface:
             logger.error(f"Error fetching Ollama models: {str(e)}")
             return ["Connection Error - Is Ollama running?"]
 
-    def chat_with_ollama(self, messages: List[Dict[str, str]], model: str) -> str:
+    def new_deadline(self, timeout_ms: Optional[int] = None) -> float:
+        """Monotonic deadline for a request; ``timeout_ms`` (e.g. from X-Request-Timeout-Ms) may only shorten it."""
+        budget = self.request_deadline_seconds
+        if timeout_ms is not None and timeout_ms >= 0:
+            budget = min(budget, timeout_ms / 1000)
+        return time.monotonic() + budget
+
+    def _attempt_timeout(self, deadline: Optional[float]) -> float:
+        """Timeout for the next backend attempt: what is left of ``deadline``, capped at INFERENCE_TIMEOUT.
+
+        Raises TimeoutError when less than MIN_ATTEMPT_SECONDS remain, since such an
+        attempt would only time out and delay the caller further.
+        """
+        if deadline is None:
+            return self.inference_timeout
+        remaining = deadline - time.monotonic()
+        if remaining < self.min_attempt_seconds:
+            raise TimeoutError(f"request deadline exceeded ({max(remaining, 0):.1f}s left)")
+        return min(self.inference_timeout, remaining)
+
+    @staticmethod
+    def _deadline_headers(headers: Dict[str, str], deadline: float) -> Dict[str, str]:
+        """Pass the remaining budget downstream so the next hop can bound its own work."""
+        headers["X-Request-Timeout-Ms"] = str(max(0, int((deadline - time.monotonic()) * 1000)))
+        return headers
+
+    def chat_with_ollama(
+        self, messages: List[Dict[str, str]], model: str, num_predict: int = None, deadline: Optional[float] = None
+    ) -> str:
         """Sends a conversation history to the Ollama /api/chat endpoint."""
-        logger.info(f"Attempting to chat with Ollama model: {model}")
         try:
-            payload = {"model": model, "messages": messages, "stream": False}
-            response = requests.post(
-                f"{self.ollama_base_url}/api/chat",
-                json=payload,
-                timeout=self.inference_timeout,
-            )
-            response.raise_for_status()
-            response_data = response.json()
+            response_data = self._ollama_chat(messages, model, num_predict, deadline)
             return response_data.get("message", {}).get(
                 "content", "Error: Unexpected response format from Ollama."
             )
         except Exception as e:
             return f"Error communicating with Ollama: {str(e)}"
 
-    def chat_with_open_webui(self, messages: List[Dict[str, str]], model: str) -> str:
-        """Sends a conversation history with pipeline-modified prompts for response level cycling."""
-        # Educational levels that the pipeline cycles through
-        pipeline_levels = [
-            {"name": "🎯 Default", "modifier": ""},
-            {
-                "name": "🧒 Kid Mode",
-                "modifier": "Explain like I'm 5 years old using simple words, fun examples, and easy-to-understand concepts.",
-            },
-            {
-                "name": "🔬 Young Scientist",
-                "modifier": "Explain like I'm 12 years old with some science details but keep it understandable and engaging.",
-            },
-            {
-                "name": "🎓 College Student",
-                "modifier": "Explain like I'm a college student with technical context, examples, and deeper analysis.",
-            },
-            {
-                "name": "⚗️ Scientific",
-                "modifier": "Give me the full scientific explanation with precise terminology, detailed mechanisms, and technical accuracy.",
-            },
-        ]
+    def _ollama_payload(self, messages: List[Dict[str, str]], model: str, num_predict: int = None) -> Dict:
+        """Ollama /api/chat body with generation length capped at OLLAMA_NUM_PREDICT."""
+        # Ollama reads num_predict <= 0 as "no limit", so never pass one through
+        limit = max(1, min(num_predict, self.num_predict)) if num_predict else self.num_predict
+        return {"model": model, "messages": messages, "stream": True, "options": {"num_predict": limit}}
 
-        # Calculate which level to use (cycling every 30 seconds)
-        import time
+    def _ollama_chat(
+        self, messages: List[Dict[str, str]], model: str, num_predict: int = None, deadline: Optional[float] = None
+    ) -> Dict:
+        """One Ollama /api/chat call assembled from its NDJSON stream; returns the final chunk or raises.
 
-        level_index = int(time.time() / 30) % len(pipeline_levels)
-        current_level = pipeline_levels[level_index]
-
-        # Apply pipeline level modification to the message
-        modified_messages = messages.copy()
-        if modified_messages and current_level["modifier"]:
-            last_message = modified_messages[-1]
-            if last_message["role"] == "user":
-                modified_messages[-1] = {
-                    "role": "user",
-                    "content": f"{last_message['content']} {current_level['modifier']}",
-                }
+        The reply is parsed chunk by chunk instead of buffering the whole body, and
+        reading stops at MAX_RESPONSE_CHARS or at ``deadline`` (``truncated`` is then
+        set), so a runaway generation cannot grow a worker's memory or latency.
+        """
+        logger.info("Attempting to chat with Ollama model: %s", model)
+        with self.tracer.span(
+            "ollama.chat",
+            kind="client",
+            attributes={"gen_ai.system": "ollama", "gen_ai.request.model": model},
+        ) as span:
+            try:
+                response = requests.post(
+                    f"{self.ollama_base_url}/api/chat",
+                    json=self._ollama_payload(messages, model, num_predict),
+                    headers=self.tracer.inject_headers(),
+                    timeout=self._attempt_timeout(deadline),
+                    stream=True,
+                )
+                try:
+                    RequestTracer.set_attributes(span, {"http.response.status_code": response.status_code})
+                    response.raise_for_status()
+                    parts, size, final, truncated = [], 0, {}, False
+                    for line in response.iter_lines():
+                        if not line:
+                            continue
+                        chunk = json.loads(line)
+                        if "error" in chunk:
+                            raise RuntimeError(chunk["error"])
+                        content = chunk.get("message", {}).get("content", "")
+                        if size + len(content) > self.max_response_chars:
+                            parts.append(content[: self.max_response_chars - size])
+                            truncated = True
+                            logger.warning("Ollama reply from %s truncated at %d chars", model, self.max_response_chars)
+                            break
+                        parts.append(content)
+                        size += len(content)
+                        if chunk.get("done"):
+                            final = chunk
+                            break
+                        if deadline is not None and time.monotonic() >= deadline:
+                            truncated = True
+                            logger.warning("Ollama reply from %s cut off at the request deadline", model)
+                            break
+                finally:
+                    # Closing early drops the connection, which also stops Ollama generating
+                    response.close()
+                response_data = {**final, "message": {"role": "assistant", "content": "".join(parts)}}
+                response_data["truncated"] = truncated
+                self.tracer.record_ollama_metrics(span, response_data)
+                return response_data
+            except Exception as e:
+                RequestTracer.set_attributes(span, {"error.type": type(e).__name__})
+                raise
 
-        # Check if service is in failure state (like co-worker's approach)
-        if self.service_health_failure:
-            logger.warning(
-                f"Service health failure detected: SERVICE_HEALTH_FAILURE=true"
-            )
-            broken_response = f"🔴 **SERVICE DEGRADED**: Health failure detected!\n\n"
-            broken_response += f"❌ Service Status: DEVIATING\n"
-            broken_response += f"🔧 Cause: SERVICE_HEALTH_FAILURE=true\n\n"
-            broken_response += (
-                f"💡 Service cannot process requests while in degraded state.\n"
-            )
-            broken_response += f"⚠️ This demonstrates SUSE Observability's ability to detect configuration changes and service health degradation.\n\n"
-            broken_response += f"🔄 To fix: Use 'Restore Service Health' in the Service Health Simulation modal."
-            return broken_response
-
-        # Try Pipelines service first if available, otherwise fall back to Open WebUI
-        if self.pipelines_base_url:
-            # Use dedicated Pipelines service for enhanced processing
-            api_url = f"{self.pipelines_base_url}/v1/chat/completions"
-            # Use the response_level pipeline which handles the educational level modifications
-            payload = {
-                "model": "response_level",
-                "messages": modified_messages,
-                "stream": False,
-                "max_tokens": 1000,
+    def compare_models(self, message: str, models: List[str]):
+        """Run ``message`` on each model concurrently; yields per-model results as they finish.
+
+        Concurrency is capped by a semaphore shared by all compare requests, so
+        simultaneous comparisons cannot overload (and swap) the Ollama node.
+        """
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+
+        messages = [{"role": "user", "content": message}]
+
+        def run(model: str) -> Dict[str, Any]:
+            with self.compare_slots:
+                start = time.monotonic()
+                try:
+                    data = self._ollama_chat(messages, model)
+                except Exception as e:
+                    return {
+                        "model": model,
+                        "ok": False,
+                        "error": str(e),
+                        "latency_ms": round((time.monotonic() - start) * 1000, 1),
+                    }
+                latency_ms = (time.monotonic() - start) * 1000
+            eval_count = data.get("eval_count")
+            eval_duration = data.get("eval_duration")
+            return {
+                "model": model,
+                "ok": True,
+                "response": data.get("message", {}).get("content", ""),
+                "latency_ms": round(latency_ms, 1),
+                "prompt_tokens": data.get("prompt_eval_count"),
+                "completion_tokens": eval_count,
+                "tokens_per_second": round(eval_count / (eval_duration / 1e9), 2)
+                if eval_count and eval_duration
+                else None,
             }
 
-            # Add authentication header for pipeline service
-            headers = {"Content-Type": "application/json"}
-            if self.pipeline_api_key:
-                headers["Authorization"] = f"Bearer {self.pipeline_api_key}"
+        with ThreadPoolExecutor(
+            max_workers=min(len(models), self.compare_max_concurrency), thread_name_prefix="compare"
+        ) as executor:
+            futures = [executor.submit(run, model) for model in models]
+            for future in as_completed(futures):
+                yield future.result()
 
-            logger.info(
-                f"Attempting Pipelines service with pipeline level: {current_level['name']}"
-            )
-            logger.info(
-                f"Using pipeline API key: {'***' if self.pipeline_api_key else 'None'}"
-            )
-            logger.info(f"Request URL: {api_url}")
-            logger.info(f"Headers: {dict(headers)}")
+    def stream_chat_with_ollama(
+        self, messages: List[Dict[str, str]], model: str, num_predict: int = None, deadline: Optional[float] = None
+    ):
+        """Yields Ollama /api/chat NDJSON lines as they are generated, up to MAX_RESPONSE_CHARS or ``deadline``."""
+        with self.tracer.span(
+            "ollama.chat",
+            kind="client",
+            attributes={"gen_ai.system": "ollama", "gen_ai.request.model": model, "ollama.stream": True},
+        ) as span:
             try:
-                response = requests.post(
-                    api_url,
-                    json=payload,
-                    headers=headers,
-                    timeout=self.inference_timeout,
-                )
-                logger.info(f"Initial response status: {response.status_code}")
-                if response.status_code == 200:
-                    response_data = response.json()
-                    # Handle OpenAI-compatible response format
-                    if "choices" in response_data and response_data["choices"]:
-                        content = (
-                            response_data["choices"][0]
-                            .get("message", {})
-                            .get(
-                                "content",
-                                "Error: Unexpected response format from Open WebUI.",
+                with requests.post(
+                    f"{self.ollama_base_url}/api/chat",
+                    json=self._ollama_payload(messages, model, num_predict),
+                    headers=self.tracer.inject_headers(),
+                    timeout=self._attempt_timeout(deadline),
+                    stream=True,
+                ) as response:
+                    RequestTracer.set_attributes(span, {"http.response.status_code": response.status_code})
+                    response.raise_for_status()
+                    last_line = None
+                    size = 0
+                    for line in response.iter_lines():
+                        if not line:
+                            continue
+                        size += len(json.loads(line).get("message", {}).get("content", ""))
+                        over_budget = size > self.max_response_chars
+                        past_deadline = deadline is not None and time.monotonic() >= deadline
+                        if over_budget or past_deadline:
+                            logger.warning(
+                                "Ollama stream from %s truncated (%s)", model,
+                                "MAX_RESPONSE_CHARS" if over_budget else "request deadline",
                             )
-                        )
-                    else:
-                        # Fallback to Ollama format
-                        content = response_data.get("message", {}).get(
-                            "content",
-                            "Error: Unexpected response format from Open WebUI.",
-                        )
-
-                    # Add pipeline level header to the response - this IS the pipeline working
-                    formatted_response = f"🔄 **Pipeline Mode**: {current_level['name']} (via Pipelines Service)\n\n{content}"
-                    logger.info(
-                        f"Pipelines service response successful with level: {current_level['name']}"
-                    )
-                    return formatted_response
-                else:
-                    logger.warning(
-                        f"Pipelines service failed ({response.status_code}), response: {response.text[:200]}, falling back to Open WebUI or direct Ollama"
-                    )
+                            yield (json.dumps({"message": {"role": "assistant", "content": ""},
+                                               "done": True, "truncated": True}) + "\n").encode()
+                            last_line = None
+                            break
+                        last_line = line
+                        yield line + b"\n"
+                # The final chunk carries Ollama's token counts and timings
+                if span is not None and last_line:
+                    self.tracer.record_ollama_metrics(span, json.loads(last_line))
             except Exception as e:
+                RequestTracer.set_attributes(span, {"error.type": type(e).__name__})
+                logger.error("Ollama streaming request failed: %s", e)
+                yield (json.dumps({"error": f"Error communicating with Ollama: {e}", "done": True}) + "\n").encode()
+
+    def _read_openai_reply(self, response, span) -> str:
+        """Assemble an OpenAI-compatible chat reply from Pipelines / Open WebUI, bounded like _ollama_chat.
+
+        Server-sent deltas are read incrementally and cut off at MAX_RESPONSE_CHARS;
+        an upstream that ignores ``stream`` and answers with one JSON document is read
+        in blocks up to a matching byte cap instead of being buffered unbounded.
+        """
+        unexpected = "Error: Unexpected response format from Open WebUI."
+        try:
+            if response.headers.get("Content-Type", "").startswith("application/json"):
+                limit = self.max_response_chars * 4 + 65536  # UTF-8 worst case plus the JSON envelope
+                body = bytearray()
+                for block in response.iter_content(chunk_size=65536):
+                    body.extend(block)
+                    if len(body) > limit:
+                        raise ValueError(f"reply exceeds {limit} bytes")
+                response_data = json.loads(body)
+                self.tracer.record_openai_usage(span, response_data)
+                choices = response_data.get("choices") or [response_data]  # Ollama format has no choices
+                return choices[0].get("message", {}).get("content", unexpected)[: self.max_response_chars]
+
+            parts, size = [], 0
+            for line in response.iter_lines():
+                if not line.startswith(b"data:"):
+                    continue
+                data = line[5:].strip()
+                if data == b"[DONE]":
+                    break
+                chunk = json.loads(data)
+                if chunk.get("usage"):
+                    self.tracer.record_openai_usage(span, chunk)
+                for choice in chunk.get("choices") or []:
+                    content = (choice.get("delta") or {}).get("content") or ""
+                    if size + len(content) > self.max_response_chars:
+                        parts.append(content[: self.max_response_chars - size])
+                        logger.warning("Reply from %s truncated at %d chars", response.url, self.max_response_chars)
+                        return "".join(parts)
+                    parts.append(content)
+                    size += len(content)
+            return "".join(parts)
+        finally:
+            # Closing early drops the connection, which also stops the upstream generating
+            response.close()
+
+    def chat_with_open_webui(
+        self, messages: List[Dict[str, str]], model: str, deadline: Optional[float] = None
+    ) -> str:
+        """Sends a conversation history with pipeline-modified prompts for response level cycling.
+
+        All fallback tiers share one ``deadline`` (default: REQUEST_DEADLINE_SECONDS from
+        now); each attempt only gets the time that is left, and tiers are skipped once
+        less than MIN_ATTEMPT_SECONDS remain.
+        """
+        if deadline is None:
+            deadline = self.new_deadline()
+        with self.tracer.span(
+            "chat_with_open_webui", attributes={"gen_ai.request.model": model}
+        ) as chain_span:
+            # Calculate which level to use (cycling every 30 seconds)
+            import time
+
+            level_index = int(time.time() / 30) % len(PIPELINE_LEVELS)
+            current_level = PIPELINE_LEVELS[level_index]
+            RequestTracer.set_attributes(chain_span, {"pipeline.level": current_level["name"]})
+
+            # Apply pipeline level modification to the message
+            modified_messages = messages.copy()
+            if modified_messages and current_level["modifier"]:
+                last_message = modified_messages[-1]
+                if last_message["role"] == "user":
+                    modified_messages[-1] = {
+                        "role": "user",
+                        "content": f"{last_message['content']} {current_level['modifier']}",
+                    }
+
+            # Check if service is in failure state (like co-worker's approach)
+            if self.service_health_failure:
                 logger.warning(
-                    f"Pipelines service failed: {str(e)}, falling back to direct Ollama"
+                    f"Service health failure detected: SERVICE_HEALTH_FAILURE=true"
                 )
-        elif self.open_webui_base_url:
-            # Try Open WebUI as secondary option
-            api_url = f"{self.open_webui_base_url}/api/v1/chat/completions"
-            payload = {
-                "model": model,
-                "messages": modified_messages,
-                "stream": False,
-                "max_tokens": 1000,
-            }
+                broken_response = f"🔴 **SERVICE DEGRADED**: Health failure detected!\n\n"
+                broken_response += f"❌ Service Status: DEVIATING\n"
+                broken_response += f"🔧 Cause: SERVICE_HEALTH_FAILURE=true\n\n"
+                broken_response += (
+                    f"💡 Service cannot process requests while in degraded state.\n"
+                )
+                broken_response += f"⚠️ This demonstrates SUSE Observability's ability to detect configuration changes and service health degradation.\n\n"
+                broken_response += f"🔄 To fix: Use 'Restore Service Health' in the Service Health Simulation modal."
+                return broken_response
+
+            # Try Pipelines service first if available, otherwise fall back to Open WebUI
+            if self.pipelines_base_url:
+                # Use dedicated Pipelines service for enhanced processing
+                api_url = f"{self.pipelines_base_url}/v1/chat/completions"
+                # Use the response_level pipeline which handles the educational level modifications
+                payload = {
+                    "model": "response_level",
+                    "messages": modified_messages,
+                    "stream": True,
+                    "max_tokens": self.num_predict,
+                }
 
-            headers = {"Content-Type": "application/json"}
-            if self.open_webui_token:
-                headers["Authorization"] = f"Bearer {self.open_webui_token}"
+                # Add authentication header for pipeline service
+                headers = {"Content-Type": "application/json"}
+                if self.pipeline_api_key:
+                    headers["Authorization"] = f"Bearer {self.pipeline_api_key}"
 
-            logger.info(
-                f"Attempting Open WebUI fallback with pipeline level: {current_level['name']}"
-            )
-            try:
-                response = requests.post(
-                    api_url,
-                    json=payload,
-                    headers=headers,
-                    timeout=self.inference_timeout,
+                logger.info(
+                    "Attempting Pipelines service at %s with pipeline level: %s", api_url, current_level["name"]
                 )
-                if response.status_code == 200:
-                    response_data = response.json()
-                    if "choices" in response_data and response_data["choices"]:
-                        content = (
-                            response_data["choices"][0]
-                            .get("message", {})
-                            .get(
-                                "content",
-                                "Error: Unexpected response format from Open WebUI.",
-                            )
+                logger.debug("Pipelines request header names: %s", list(headers))
+                with self.tracer.span(
+                    "fallback.pipelines",
+                    kind="client",
+                    attributes={"backend.tier": "pipelines", "url.full": api_url},
+                ) as span:
+                    self.tracer.inject_headers(headers)
+                    try:
+                        timeout = self._attempt_timeout(deadline)
+                        response = requests.post(
+                            api_url,
+                            json=payload,
+                            headers=self._deadline_headers(headers, deadline),
+                            timeout=timeout,
+                            stream=True,
                         )
-                    else:
-                        content = response_data.get("message", {}).get(
-                            "content",
-                            "Error: Unexpected response format from Open WebUI.",
+                        RequestTracer.set_attributes(span, {"http.response.status_code": response.status_code})
+                        logger.info("Initial response status: %s", response.status_code)
+                        if response.status_code == 200:
+                            content = self._read_openai_reply(response, span)
+
+                            # Add pipeline level header to the response - this IS the pipeline working
+                            formatted_response = f"🔄 **Pipeline Mode**: {current_level['name']} (via Pipelines Service)\n\n{content}"
+                            logger.info(
+                                "Pipelines service response successful with level: %s", current_level["name"]
+                            )
+                            return formatted_response
+                        else:
+                            logger.warning(
+                                "Pipelines service failed (%s), response: %.200s, falling back to Open WebUI or direct Ollama",
+                                response.status_code,
+                                response.text,
+                            )
+                    except Exception as e:
+                        RequestTracer.set_attributes(span, {"error.type": type(e).__name__})
+                        logger.warning("Pipelines service failed: %s, falling back to direct Ollama", e)
+            elif self.open_webui_base_url:
+                # Try Open WebUI as secondary option
+                api_url = f"{self.open_webui_base_url}/api/v1/chat/completions"
+                payload = {
+                    "model": model,
+                    "messages": modified_messages,
+                    "stream": True,
+                    "max_tokens": self.num_predict,
+                }
+
+                headers = {"Content-Type": "application/json"}
+                if self.open_webui_token:
+                    headers["Authorization"] = f"Bearer {self.open_webui_token}"
+
+                logger.info("Attempting Open WebUI fallback with pipeline level: %s", current_level["name"])
+                with self.tracer.span(
+                    "fallback.open_webui",
+                    kind="client",
+                    attributes={"backend.tier": "open_webui", "url.full": api_url},
+                ) as span:
+                    self.tracer.inject_headers(headers)
+                    try:
+                        timeout = self._attempt_timeout(deadline)
+                        response = requests.post(
+                            api_url,
+                            json=payload,
+                            headers=self._deadline_headers(headers, deadline),
+                            timeout=timeout,
+                            stream=True,
                         )
+                        RequestTracer.set_attributes(span, {"http.response.status_code": response.status_code})
+                        if response.status_code == 200:
+                            content = self._read_openai_reply(response, span)
 
-                    formatted_response = f"🔄 **Pipeline Mode**: {current_level['name']} (via Open WebUI Fallback)\n\n{content}"
-                    logger.info(
-                        f"Open WebUI fallback response successful with level: {current_level['name']}"
-                    )
-                    return formatted_response
-                else:
-                    logger.warning(
-                        f"Open WebUI fallback failed ({response.status_code}), falling back to direct Ollama"
-                    )
-            except Exception as e:
-                logger.warning(
-                    f"Open WebUI fallback failed: {str(e)}, falling back to direct Ollama"
+                            formatted_response = f"🔄 **Pipeline Mode**: {current_level['name']} (via Open WebUI Fallback)\n\n{content}"
+                            logger.info(
+                                "Open WebUI fallback response successful with level: %s", current_level["name"]
+                            )
+                            return formatted_response
+                        else:
+                            logger.warning(
+                                "Open WebUI fallback failed (%s), falling back to direct Ollama", response.status_code
+                            )
+                    except Exception as e:
+                        RequestTracer.set_attributes(span, {"error.type": type(e).__name__})
+                        logger.warning("Open WebUI fallback failed: %s, falling back to direct Ollama", e)
+            else:
+                logger.info(
+                    "No Pipelines or Open WebUI URL configured, using direct Ollama"
                 )
-        else:
-            logger.info(
-                "No Pipelines or Open WebUI URL configured, using direct Ollama"
-            )
 
-        # Fallback to direct Ollama with pipeline-modified prompt - this is STILL pipeline working!
-        logger.info(f"Using direct Ollama with pipeline level: {current_level['name']}")
-        ollama_response = self.chat_with_ollama(modified_messages, model)
+            # Fallback to direct Ollama with pipeline-modified prompt - this is STILL pipeline working!
+            logger.info("Using direct Ollama with pipeline level: %s", current_level["name"])
+            with self.tracer.span(
+                "fallback.direct_ollama", attributes={"backend.tier": "direct_ollama"}
+            ):
+                ollama_response = self.chat_with_ollama(modified_messages, model, deadline=deadline)
 
-        # Add pipeline level header - this is still pipeline functionality
-        formatted_response = f"🔄 **Pipeline Mode**: {current_level['name']} (via Direct Ollama)\n\n{ollama_response}"
-        return formatted_response
+            # Add pipeline level header - this is still pipeline functionality
+            formatted_response = f"🔄 **Pipeline Mode**: {current_level['name']} (via Direct Ollama)\n\n{ollama_response}"
+            return formatted_response
 
     def check_provider_status(self, provider_name: str, provider_info) -> dict:
         """Checks the status of a single provider and returns detailed info."""
@@ -1336,16 +2931,14 @@ class ChatInterface:
         ):
             provider_timeout = self.connection_timeout  # Normal timeout for Google
             logger.info(
-                f"Using normal timeout ({self.connection_timeout}s) for allowed provider: {provider_name}"
+                "Using normal timeout (%ss) for allowed provider: %s", self.connection_timeout, provider_name
             )
         # Fast timeout for commonly blocked providers to prevent delays
         elif provider_name in blocked_providers or any(
             domain in url.lower() for domain in blocked_domains
         ):
             provider_timeout = 1  # 1 second timeout for potentially blocked providers
-            logger.info(
-                f"Using fast timeout (1s) for potentially blocked provider: {provider_name}"
-            )
+            logger.info("Using fast timeout (1s) for potentially blocked provider: %s", provider_name)
         else:
             provider_timeout = self.connection_timeout
 
@@ -1358,7 +2951,7 @@ class ChatInterface:
             # Show as online if we get ANY response (even 403, 404, etc.)
             status = "🟢"
             logger.info(
-                f"Provider {provider_name}: {response.status_code} -> {status} ({response_time}ms)"
+                "Provider %s: %s -> %s (%sms)", provider_name, response.status_code, status, response_time
             )
 
             return {
@@ -1374,9 +2967,7 @@ class ChatInterface:
             timeout_ms = provider_timeout * 1000
             if response_time > timeout_ms:
                 response_time = timeout_ms
-            logger.warning(
-                f"Provider {provider_name} failed: {str(e)} ({response_time}ms)"
-            )
+            logger.warning("Provider %s failed: %s (%sms)", provider_name, e, response_time)
             return {
                 "status": "🔴",
                 "response_time": f"{response_time}ms",
@@ -1425,7 +3016,7 @@ class ChatInterface:
                 }
 
             # Use ThreadPoolExecutor for concurrent checks
-            with ThreadPoolExecutor(max_workers=10) as executor:
+            with ThreadPoolExecutor(max_workers=10, thread_name_prefix="provider-check") as executor:
                 # Submit all provider checks
                 future_to_name = {
                     executor.submit(
@@ -1454,20 +3045,7 @@ class ChatInterface:
                         )
 
             # Ensure all 10 providers are always present - if any are missing, add them
-            default_providers = {
-                "OpenAI": {"country": "🇺🇸 USA", "flag": "🇺🇸"},
-                "Claude (Anthropic)": {"country": "🇺🇸 USA", "flag": "🇺🇸"},
-                "DeepSeek": {"country": "🇨🇳 China", "flag": "🇨🇳"},
-                "Google Gemini": {"country": "🇺🇸 USA", "flag": "🇺🇸"},
-                "Cohere": {"country": "🇨🇦 Canada", "flag": "🇨🇦"},
-                "Mistral AI": {"country": "🇫🇷 France", "flag": "🇫🇷"},
-                "Perplexity": {"country": "🇺🇸 USA", "flag": "🇺🇸"},
-                "Together AI": {"country": "🇺🇸 USA", "flag": "🇺🇸"},
-                "Groq": {"country": "🇺🇸 USA", "flag": "🇺🇸"},
-                "Hugging Face": {"country": "🇺🇸 USA", "flag": "🇺🇸"},
-            }
-
-            for name, info in default_providers.items():
+            for name, info in DEFAULT_PROVIDERS.items():
                 if name not in updated_status:
                     updated_status[name] = {
                         "status": "🔴",
@@ -1484,21 +3062,8 @@ class ChatInterface:
             logger.warning(f"Provider status check failed: {e} - using partial results")
 
         # CRITICAL: Always ensure all 10 providers are present regardless of any errors
-        default_providers = {
-            "OpenAI": {"country": "🇺🇸 USA", "flag": "🇺🇸"},
-            "Claude (Anthropic)": {"country": "🇺🇸 USA", "flag": "🇺🇸"},
-            "DeepSeek": {"country": "🇨🇳 China", "flag": "🇨🇳"},
-            "Google Gemini": {"country": "🇺🇸 USA", "flag": "🇺🇸"},
-            "Cohere": {"country": "🇨🇦 Canada", "flag": "🇨🇦"},
-            "Mistral AI": {"country": "🇫🇷 France", "flag": "🇫🇷"},
-            "Perplexity": {"country": "🇺🇸 USA", "flag": "🇺🇸"},
-            "Together AI": {"country": "🇺🇸 USA", "flag": "🇺🇸"},
-            "Groq": {"country": "🇺🇸 USA", "flag": "🇺🇸"},
-            "Hugging Face": {"country": "🇺🇸 USA", "flag": "🇺🇸"},
-        }
-
         # Force all 10 providers to be present - overwrite if needed
-        for name, info in default_providers.items():
+        for name, info in DEFAULT_PROVIDERS.items():
             if name not in updated_status:
                 updated_status[name] = {
                     "status": "🔴",
@@ -1514,7 +3079,7 @@ class ChatInterface:
             logger.warning(
                 f"Provider count mismatch: expected 10, got {len(updated_status)}. Forcing all 10 providers."
             )
-            for name, info in default_providers.items():
+            for name, info in DEFAULT_PROVIDERS.items():
                 updated_status[name] = {
                     "status": "🔴",
                     "response_time": "---ms",
@@ -1525,12 +3090,88 @@ class ChatInterface:
                 }
 
         self.provider_status = updated_status
+        self._publish_provider_changes(updated_status)
         total_time = time.time() - start_time
         logger.info(
             f"Provider status check completed in {total_time:.1f}s - {len(updated_status)} providers (guaranteed 10)"
         )
         return updated_status
 
+    def _publish_provider_changes(self, provider_status: Dict):
+        """Push only the providers whose status changed since the last publish."""
+        fingerprints = {name: ProviderStatusRenderer._fingerprint(info) for name, info in provider_status.items()}
+        changed = sorted(name for name in fingerprints.keys() | self._published_fingerprints.keys()
+                         if fingerprints.get(name) != self._published_fingerprints.get(name))
+        self._published_fingerprints = fingerprints
+        self.status_renderer.sync(provider_status)
+        if changed:
+            summary, version = self.status_renderer.summary(), self.status_renderer.version
+            self.events.publish(
+                "provider_status",
+                {"providers": {name: provider_status.get(name) for name in changed},
+                 "summary": summary, "version": version},
+                replay={"providers": dict(provider_status), "summary": summary, "version": version, "full": True},
+            )
+
+    def start_demo_state_watcher(self):
+        """Start the shared ConfigMap watcher that feeds demo_state events.
+
+        One kubectl lookup per interval serves every connected dashboard; the
+        watcher idles without subscribers.
+        """
+        if self._demo_state_watcher and self._demo_state_watcher.is_alive():
+            return
+
+        def watch():
+            last = None
+            while True:
+                if self.events.subscriber_count:
+                    is_active, state, config_value = self._check_configmap_demo_state()
+                    current = (is_active, state, config_value, self.service_health_failure)
+                    if current != last:
+                        last = current
+                        self.events.publish("demo_state", {
+                            "availability_demo": {
+                                "is_active": is_active,
+                                "state": state,
+                                "config_value": config_value,
+                            },
+                            "service_health_failure": self.service_health_failure,
+                            "timestamp": time.time(),
+                        })
+                time.sleep(self.demo_state_poll_seconds)
+
+        self._demo_state_watcher = threading.Thread(target=watch, name="demo-state-watcher", daemon=True)
+        self._demo_state_watcher.start()
+
+    def compare_pipeline_levels(self, message: str) -> Dict[str, Any]:
+        """Ask the response_level pipeline to answer ``message`` at every level in one call.
+
+        Raises ValueError when no Pipelines service is configured.
+        """
+        if not self.pipelines_base_url:
+            raise ValueError("Pipelines service not configured (PIPELINES_BASE_URL)")
+        api_url = f"{self.pipelines_base_url}/v1/chat/completions"
+        headers = {"Content-Type": "application/json"}
+        if self.pipeline_api_key:
+            headers["Authorization"] = f"Bearer {self.pipeline_api_key}"
+        payload = {
+            "model": "response_level",
+            "messages": [{"role": "user", "content": message}],
+            "stream": False,
+            "all_levels": True,
+        }
+        with self.tracer.span(
+            "pipelines.all_levels", kind="client", attributes={"backend.tier": "pipelines", "url.full": api_url}
+        ) as span:
+            self.tracer.inject_headers(headers)
+            # Levels run in rounds inside the pipeline, so the batch gets its own, longer timeout
+            response = requests.post(api_url, json=payload, headers=headers, timeout=self.pipeline_batch_timeout)
+            RequestTracer.set_attributes(span, {"http.response.status_code": response.status_code})
+            response.raise_for_status()
+            content = response.json()["choices"][0]["message"]["content"]
+        return json.loads(content)
+
     def _authenticate_open_webui(self):
         """Authenticate with Open WebUI to get an access token."""
         try:
@@ -1621,89 +3262,7 @@ class ChatInterface:
 
     def get_provider_status_html(self) -> str:
         """Generates compact provider cards with flags and status."""
-
-        # Calculate statistics
-        total_providers = len(self.provider_status)
-        online_count = sum(
-            1
-            for info in self.provider_status.values()
-            if isinstance(info, dict) and info.get("status") == "🟢"
-        )
-        offline_count = total_providers - online_count
-
-        # Calculate average response time
-        response_times = []
-        for info in self.provider_status.values():
-            if isinstance(info, dict) and "response_time" in info:
-                try:
-                    rt_str = info["response_time"]
-                    if "ms" in rt_str and rt_str != "---ms":
-                        rt = int(rt_str.replace("ms", ""))
-                        response_times.append(rt)
-                except:
-                    pass
-        avg_rt = int(sum(response_times) / len(response_times)) if response_times else 0
-
-        html_content = f"""
-        <div style='background: linear-gradient(135deg, #0c322c 0%, #1a4a3a 100%); padding: 15px; border-radius: 15px; box-shadow: 0 8px 32px rgba(0,0,0,0.3);'>
-            <h3 style='color: #30ba78; margin: 0 0 15px 0; font-size: 16px; text-align: center; font-weight: 600;'>🤖 Model Providers</h3>
-            
-            
-            <!-- Model Provider List -->
-            <div style='margin-bottom: 15px;'>
-        """
-
-        for name, info in sorted(self.provider_status.items()):
-            if isinstance(info, dict):
-                status = info.get("status", "🔴")
-                flag = info.get("flag", "🌍")
-                response_time = info.get("response_time", "---ms")
-
-                html_content += f"""
-                <div style='display: flex; align-items: center; justify-content: space-between; padding: 8px 12px; margin-bottom: 4px; background: rgba(255,255,255,0.05); border-radius: 12px; border-left: 3px solid {"#28a745" if status == "🟢" else "#dc3545"};'>
-                    <div style='display: flex; align-items: center; gap: 8px; flex: 1; min-width: 0;'>
-                        <span style='font-size: 14px; width: 18px; text-align: center; flex-shrink: 0;'>{flag}</span>
-                        <span style='color: #ffffff; font-size: 12px; font-weight: 500; flex: 1; white-space: nowrap; overflow: hidden; text-overflow: ellipsis;'>{name}</span>
-                    </div>
-                    <div style='display: flex; align-items: center; gap: 8px; flex-shrink: 0; min-width: 80px;'>
-                        <span style='font-size: 14px; width: 16px; text-align: center;'>{status}</span>
-                        <span style='color: #a0a0a0; font-size: 10px; text-align: right; min-width: 45px; font-family: monospace;'>{response_time}</span>
-                    </div>
-                </div>
-                """
-            else:
-                # Fallback for old format
-                html_content += f"""
-                <div style='display: flex; align-items: center; justify-content: space-between; padding: 8px 12px; margin-bottom: 4px; background: rgba(255,255,255,0.05); border-radius: 12px;'>
-                    <span style='color: #ffffff; font-size: 12px; font-weight: 500;'>{name}</span>
-                    <span style='font-size: 14px;'>{info}</span>
-                </div>
-                """
-
-        html_content += f"""
-            </div>
-            
-            <!-- Compact Statistics -->
-            <div style='background: linear-gradient(135deg, rgba(48, 186, 120, 0.1) 0%, rgba(48, 186, 120, 0.05) 100%); border: 1px solid rgba(48, 186, 120, 0.2); border-radius: 12px; padding: 12px; text-align: center;'>
-                <div style='display: grid; grid-template-columns: 1fr 1fr 1fr; gap: 8px; font-size: 11px;'>
-                    <div style='text-align: center;'>
-                        <div style='color: #28a745; font-weight: 700; font-size: 16px;'>{online_count}</div>
-                        <div style='color: #ffffff; opacity: 0.8; font-size: 9px;'>Online</div>
-                    </div>
-                    <div style='text-align: center;'>
-                        <div style='color: #dc3545; font-weight: 700; font-size: 16px;'>{offline_count}</div>
-                        <div style='color: #ffffff; opacity: 0.8; font-size: 9px;'>Offline</div>
-                    </div>
-                    <div style='text-align: center;'>
-                        <div style='color: #ffc107; font-weight: 700; font-size: 16px;'>{avg_rt}ms</div>
-                        <div style='color: #ffffff; opacity: 0.8; font-size: 9px;'>Avg RT</div>
-                    </div>
-                </div>
-            </div>
-        </div>
-        """
-
-        return html_content
+        return self.status_renderer.render(self.provider_status)
 
     def simulate_service_failure(self) -> tuple:
         """Simulates service failure using ConfigMap key manipulation for observable failures."""
@@ -1977,22 +3536,27 @@ class ChatInterface:
             # Initialize response variables
             ollama_reply = "Message sending disabled"
             webui_reply = "Message sending disabled"
+            ollama_ms = webui_ms = -1
 
             # Send messages to models only if enabled
             if self.automation_send_messages:
                 # 1. Send to Ollama
                 logger.info("About to call Ollama...")
+                call_start = time.monotonic()
                 ollama_reply = self.chat_with_ollama(
                     [{"role": "user", "content": current_prompt}], model
                 )
-                logger.info(f"Ollama replied: {ollama_reply[:100]}...")
+                ollama_ms = (time.monotonic() - call_start) * 1000
+                logger.info("Ollama replied: %.100s...", ollama_reply)
 
                 # 2. Send to Open WebUI
                 logger.info("About to call Open WebUI...")
+                call_start = time.monotonic()
                 webui_reply = self.chat_with_open_webui(
                     [{"role": "user", "content": current_prompt}], model
                 )
-                logger.info(f"Open WebUI replied: {webui_reply[:100]}...")
+                webui_ms = (time.monotonic() - call_start) * 1000
+                logger.info("Open WebUI replied: %.100s...", webui_reply)
             else:
                 logger.info(
                     "Skipping message sending - automation_send_messages is disabled"
@@ -2000,9 +3564,27 @@ class ChatInterface:
 
             # 3. Always check providers (this is the ping/monitoring functionality)
             logger.info("About to check provider statuses...")
+            check_start = time.monotonic()
             provider_statuses = self.update_all_provider_status()
+            provider_check_ms = (time.monotonic() - check_start) * 1000
+            providers_online = sum(
+                1 for info in provider_statuses.values() if isinstance(info, dict) and info.get("status") == "🟢"
+            )
             logger.info("Provider status check completed")
 
+            self.automation_history.record(
+                prompt_index=self.automation_prompts.index(current_prompt),
+                ollama_ms=ollama_ms,
+                webui_ms=webui_ms,
+                ollama_ok=int(ollama_ms >= 0 and not is_error_reply(ollama_reply)),
+                webui_ok=int(webui_ms >= 0 and not is_error_reply(webui_reply)),
+                ollama_chars=len(ollama_reply),
+                webui_chars=len(webui_reply),
+                providers_online=providers_online,
+                providers_total=len(provider_statuses),
+                provider_check_ms=provider_check_ms,
+            )
+
             # Create result package
             logger.info("Creating automation result package...")
             result = {
@@ -2014,12 +3596,13 @@ class ChatInterface:
                 ),
                 "ollama_response": ollama_reply,
                 "open_webui_response": webui_reply,
-                "provider_status": provider_statuses,
+                "providers_online": providers_online,
                 "send_messages_enabled": self.automation_send_messages,
             }
             # Store latest result and put in queue for the UI to pick up
             self.latest_automation_result = result
             self.results_queue.put(result)
+            self.events.publish("automation_result", result)
             logger.info("Automation result stored in queue successfully")
 
             # Wait for the next interval
@@ -2053,7 +3636,7 @@ class ChatInterface:
 
         self.stop_event.clear()
         self.automation_thread = threading.Thread(
-            target=self._automation_loop, args=(model, interval), daemon=True
+            target=self._automation_loop, args=(model, interval), name="automation", daemon=True
         )
         self.automation_thread.start()
         logger.info(
@@ -2233,12 +3816,16 @@ class ChatInterface:
     def stop_load_simulator(self) -> tuple:
         """Stop the load simulator deployment."""
         try:
+            deployment_name = os.getenv("DEPLOYMENT_NAME", "ai-compare")
             result = subprocess.run(
                 [
                     "kubectl",
                     "delete",
-                    "deployment",
-                    f"{os.getenv('DEPLOYMENT_NAME', 'ai-compare')}-load-simulator",
+                    f"deployment/{deployment_name}-load-simulator",
+                    # Distributed mode resources (absent otherwise)
+                    f"deployment/{deployment_name}-load-coordinator",
+                    f"service/{deployment_name}-load-coordinator",
+                    "--ignore-not-found",
                     "-n",
                     os.getenv("KUBERNETES_NAMESPACE", "default"),
                 ],
@@ -2277,30 +3864,20 @@ class ChatInterface:
             )
 
     def _generate_load_simulator_yaml(self) -> str:
-        """Generate Kubernetes YAML for load simulator deployment."""
+        """Generate Kubernetes YAML for load simulator deployment.
+
+        With LOAD_SIMULATOR_WORKERS > 1 and a LOAD_SIMULATOR_SCENARIO, this emits a
+        coordinator (Deployment + Service) plus a worker Deployment with that many
+        replicas; the coordinator merges the workers' histograms into one report.
+        """
         namespace = os.getenv("KUBERNETES_NAMESPACE", "default")
         deployment_name = os.getenv("DEPLOYMENT_NAME", "ai-compare")
+        workers = int(os.getenv("LOAD_SIMULATOR_WORKERS", "1"))
+        scenario = os.getenv("LOAD_SIMULATOR_SCENARIO", "")
+        distributed = workers > 1 and bool(scenario)
 
-        yaml_content = f"""
-apiVersion: apps/v1
-kind: Deployment
-metadata:
-  name: {deployment_name}-load-simulator
-  namespace: {namespace}
-  labels:
-    app: {deployment_name}-load-simulator
-    component: load-simulator
-spec:
-  replicas: 1
-  selector:
-    matchLabels:
-      app: {deployment_name}-load-simulator
-  template:
-    metadata:
-      labels:
-        app: {deployment_name}-load-simulator
-    spec:
-      containers:
+        def container(role_env: str) -> str:
+            return f"""      containers:
       - name: load-simulator
         image: ghcr.io/wiredquill/ai-demos-load-simulator:latest
         env:
@@ -2311,7 +3888,7 @@ spec:
         - name: LOAD_SIMULATOR_ENABLED
           value: "true"
         - name: REQUEST_TIMEOUT
-          value: "30"
+          value: "30"{role_env}
         resources:
           requests:
             cpu: "50m"
@@ -2327,8 +3904,77 @@ spec:
           capabilities:
             drop:
             - ALL
+        volumeMounts:
+        - name: reports
+          mountPath: /tmp
+      volumes:
+      - name: reports
+        emptyDir: {{}}
+"""
+
+        def deployment(name: str, replicas: int, component: str, role_env: str = "") -> str:
+            return f"""
+apiVersion: apps/v1
+kind: Deployment
+metadata:
+  name: {name}
+  namespace: {namespace}
+  labels:
+    app: {name}
+    component: {component}
+spec:
+  replicas: {replicas}
+  selector:
+    matchLabels:
+      app: {name}
+  template:
+    metadata:
+      labels:
+        app: {name}
+    spec:
+{container(role_env)}"""
+
+        if not distributed:
+            return deployment(f"{deployment_name}-load-simulator", 1, "load-simulator")
+
+        coordinator = f"{deployment_name}-load-coordinator"
+        scenario_value = json.dumps(scenario)
+        coordinator_env = f"""
+        - name: LOAD_ROLE
+          value: "coordinator"
+        - name: EXPECTED_WORKERS
+          value: "{workers}"
+        - name: LOAD_SCENARIO
+          value: {scenario_value}
+        - name: IDLE_AFTER_RUN
+          value: "true\""""
+        worker_env = f"""
+        - name: LOAD_ROLE
+          value: "worker"
+        - name: COORDINATOR_URL
+          value: "http://{coordinator}:8089"
+        - name: IDLE_AFTER_RUN
+          value: "true\""""
+        service = f"""
+apiVersion: v1
+kind: Service
+metadata:
+  name: {coordinator}
+  namespace: {namespace}
+  labels:
+    component: load-coordinator
+spec:
+  selector:
+    app: {coordinator}
+  ports:
+  - port: 8089
+    targetPort: 8089
 """
-        return yaml_content
+        return "---".join([
+            deployment(coordinator, 1, "load-coordinator", coordinator_env),
+            service,
+            deployment(f"{deployment_name}-load-simulator", workers, "load-simulator", worker_env),
+        ])
 
     def start_load_simulator_ui(
         self, model: str, interval: int, send_messages: bool = None
@@ -2889,25 +4535,46 @@ def create_interface():
 
         # --- Event Handlers ---
 
-        def handle_send_message(message: str, model: str):
+        def handle_send_message(message: str, model: str, request: gr.Request = None):
             if not message.strip():
                 return "", "", ""
             if not model or any(err in model for err in ["Error", "No models"]):
                 error_msg = "⚠️ Please select a valid Ollama model first."
                 return error_msg, error_msg, ""
 
+            if len(message) > chat_instance.max_message_chars:
+                error_msg = f"⚠️ Messages are limited to {chat_instance.max_message_chars} characters."
+                yield error_msg, error_msg, message
+                return
+
             # Show "Thinking..." in both outputs
             yield "🤔 Thinking...", "🤔 Thinking...", ""
 
-            messages_for_api = [{"role": "user", "content": message}]
+            # Each browser session keeps its own conversation
+            user_turn = {"role": "user", "content": message}
+            session_id = getattr(request, "session_hash", None)
+            if session_id:
+                session_id, history = chat_instance.sessions.history(f"gradio-{session_id}")
+                messages_for_api = history + [user_turn]
+            else:
+                messages_for_api = [user_turn]
 
             ollama_reply = chat_instance.chat_with_ollama(messages_for_api, model)
             open_webui_reply = chat_instance.chat_with_open_webui(
                 messages_for_api, model
             )
+            if session_id and not is_error_reply(ollama_reply):
+                chat_instance.sessions.append(session_id, user_turn, {"role": "assistant", "content": ollama_reply})
 
             yield ollama_reply, open_webui_reply, ""
 
+        def handle_clear_chat(request: gr.Request = None):
+            """Clear the outputs and forget this browser session's conversation."""
+            session_hash = getattr(request, "session_hash", None)
+            if session_hash:
+                chat_instance.sessions.reset(f"gradio-{session_hash}")
+            return "", "", ""
+
         def show_config_panel():
             """Show the configuration panel."""
             return gr.Column(visible=True)
@@ -3005,7 +4672,7 @@ def create_interface():
             outputs=[ollama_output, webui_output, msg_input],
         )
         clear_btn.click(
-            lambda: ("", "", ""), outputs=[ollama_output, webui_output, msg_input]
+            handle_clear_chat, outputs=[ollama_output, webui_output, msg_input]
         )
 
         refresh_providers_btn.click(
@@ -0,0 +1,262 @@
+"""
+Benchmarks for the app's hot paths, with baselines and regression checks.
+
+Every benchmark runs in-process against the mock backends (no network, no
+Ollama), so results depend only on the code and the machine:
+
+- health_throughput: GET /health through the Flask app
+- chat_api_latency: POST /api/chat against the mock Ollama
+- provider_status_update: update_all_provider_status with slow and blocked endpoints
+- provider_status_html: get_provider_status_html rendering
+- status_json: GET /api/status serialization
+
+Usage (from app/):
+
+    python tests/benchmarks.py run --output baseline.json
+    python tests/benchmarks.py run --output current.json
+    python tests/benchmarks.py compare baseline.json current.json --threshold 0.15
+
+``compare`` exits non-zero when any benchmark's p50 grew by more than the
+threshold, so it can gate CI.
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Importing conftest also stubs gradio/openlit exactly like the test suite does
+from conftest import make_chat_interface  # noqa: E402
+
+# Keep per-request INFO logging out of the measurements and the output
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+from mock_backends import MockBackend  # noqa: E402
+
+if "main_app" not in sys.modules:
+    spec = importlib.util.spec_from_file_location(
+        "main_app", Path(__file__).parent.parent / "python-ollama-open-webui.py"
+    )
+    main_app = importlib.util.module_from_spec(spec)
+    sys.modules["main_app"] = main_app
+    spec.loader.exec_module(main_app)
+main_app = sys.modules["main_app"]
+
+BENCHMARKS: Dict[str, Dict] = {}
+
+
+def benchmark(name: str, iterations: int, warmup: int = 1):
+    """Register ``func(ctx)`` as a benchmark timed over ``iterations`` calls."""
+
+    def register(func: Callable):
+        BENCHMARKS[name] = {"func": func, "iterations": iterations, "warmup": warmup, "doc": func.__doc__}
+        return func
+
+    return register
+
+
+class BenchmarkContext:
+    """Shared fixtures: a ChatInterface and API client wired to the mock backend."""
+
+    def __init__(self):
+        self.backend = MockBackend(latency_ms=20, tokens_per_second=1000, response_tokens=20)
+        self.backend.start()
+        # Accepts connections but never answers: behaves like a firewalled provider
+        self.blackhole = socket.socket()
+        self.blackhole.bind(("127.0.0.1", 0))
+        self.blackhole.listen(64)
+
+        self.interface = make_chat_interface(
+            OLLAMA_BASE_URL=self.backend.url, PIPELINES_BASE_URL="", OPEN_WEBUI_BASE_URL=""
+        )
+        self.interface.open_webui_base_url = None
+        self.interface.pipelines_base_url = None
+        self.interface.service_health_failure = False
+        self.client = main_app.ObservableAPIServer(self.interface).app.test_client()
+
+    @property
+    def blackhole_url(self) -> str:
+        host, port = self.blackhole.getsockname()
+        return f"http://{host}:{port}"
+
+    def close(self):
+        self.backend.stop()
+        self.blackhole.close()
+
+
+@benchmark("health_throughput", iterations=200, warmup=5)
+def bench_health(ctx: BenchmarkContext):
+    """GET /health (includes the ConfigMap demo-state lookup)."""
+    ctx.client.get("/health")
+
+
+@benchmark("chat_api_latency", iterations=30, warmup=2)
+def bench_chat(ctx: BenchmarkContext):
+    """POST /api/chat: direct Ollama plus the fallback chain, mock backend at 20ms TTFT."""
+    response = ctx.client.post("/api/chat", json={"message": "Why is the sky blue?", "model": "tinyllama:latest"})
+    assert response.status_code == 200
+
+
+@benchmark("provider_status_update", iterations=3, warmup=0)
+def bench_provider_update(ctx: BenchmarkContext):
+    """update_all_provider_status with half the providers slow (200ms) and half blocked."""
+    providers = {}
+    for i, (name, info) in enumerate(main_app.DEFAULT_PROVIDERS.items()):
+        url = f"{ctx.backend.url}/api/tags" if i % 2 else ctx.blackhole_url
+        providers[name] = {**info, "url": url}
+    ctx.interface.config = {"providers": providers}
+    ctx.interface.connection_timeout = 1
+    ctx.backend.configure(latency_ms=200)
+    try:
+        ctx.interface.update_all_provider_status()
+    finally:
+        ctx.backend.configure(latency_ms=20)
+
+
+def _status_fixture(count: int) -> Dict[str, Dict]:
+    return {
+        f"Provider {i:03d}": {
+            "status": "🟢" if i % 3 else "🔴",
+            "response_time": f"{100 + i}ms",
+            "country": "🌍 Unknown",
+            "flag": "🌍",
+            "status_code": 200,
+        }
+        for i in range(count)
+    }
+
+
+@benchmark("provider_status_html", iterations=500, warmup=10)
+def bench_status_html(ctx: BenchmarkContext):
+    """get_provider_status_html for 50 providers."""
+    if len(ctx.interface.provider_status) != 50:
+        ctx.interface.provider_status = _status_fixture(50)
+    ctx.interface.get_provider_status_html()
+
+
+@benchmark("status_json", iterations=500, warmup=10)
+def bench_status_json(ctx: BenchmarkContext):
+    """GET /api/status serializing 50 providers."""
+    if len(ctx.interface.provider_status) != 50:
+        ctx.interface.provider_status = _status_fixture(50)
+    ctx.client.get("/api/status")
+
+
+def _percentile(ordered: List[float], p: float) -> float:
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+
+def run_benchmarks(names: List[str] = None, scale: float = 1.0) -> Dict:
+    """Run the selected benchmarks and return a machine-readable result document."""
+    ctx = BenchmarkContext()
+    results = {}
+    try:
+        for name, bench in BENCHMARKS.items():
+            if names and name not in names:
+                continue
+            for _ in range(bench["warmup"]):
+                bench["func"](ctx)
+            timings = []
+            for _ in range(max(1, int(bench["iterations"] * scale))):
+                start = time.perf_counter()
+                bench["func"](ctx)
+                timings.append((time.perf_counter() - start) * 1000)
+            ordered = sorted(timings)
+            results[name] = {
+                "iterations": len(timings),
+                "mean_ms": round(sum(timings) / len(timings), 4),
+                "min_ms": round(ordered[0], 4),
+                "p50_ms": round(_percentile(ordered, 0.50), 4),
+                "p95_ms": round(_percentile(ordered, 0.95), 4),
+                "max_ms": round(ordered[-1], 4),
+                "ops_per_second": round(len(timings) / (sum(timings) / 1000), 2),
+            }
+            print(f"{name:<26} p50 {results[name]['p50_ms']:>10.3f}ms  p95 {results[name]['p95_ms']:>10.3f}ms"
+                  f"  {results[name]['ops_per_second']:>10.1f} ops/s")
+    finally:
+        ctx.close()
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def compare(baseline: Dict, current: Dict, threshold: float = 0.15, metric: str = "p50_ms") -> List[Dict]:
+    """Per-benchmark change in ``metric``; ``regression`` is set when it grew more than ``threshold``."""
+    rows = []
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if not base:
+            rows.append({"name": name, "baseline": None, "current": result[metric], "change": None, "regression": False})
+            continue
+        change = (result[metric] - base[metric]) / base[metric] if base[metric] else 0.0
+        rows.append({
+            "name": name,
+            "baseline": base[metric],
+            "current": result[metric],
+            "change": round(change, 4),
+            "regression": change > threshold,
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run benchmarks and write a result file")
+    run_parser.add_argument("--output", default="benchmark-results.json")
+    run_parser.add_argument("--only", nargs="*", choices=sorted(BENCHMARKS), help="benchmarks to run")
+    run_parser.add_argument("--scale", type=float, default=1.0, help="multiply iteration counts")
+
+    compare_parser = commands.add_parser("compare", help="flag regressions against a baseline")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.15, help="allowed slowdown (0.15 = 15%%)")
+    compare_parser.add_argument("--metric", default="p50_ms", choices=["p50_ms", "p95_ms", "mean_ms", "min_ms"])
+
+    args = parser.parse_args()
+    if args.command == "run":
+        document = run_benchmarks(args.only, args.scale)
+        with open(args.output, "w") as f:
+            json.dump(document, f, indent=2)
+        print(f"Results written to {args.output}")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    rows = compare(baseline, current, args.threshold, args.metric)
+    for row in rows:
+        if row["baseline"] is None:
+            print(f"{row['name']:<26} new benchmark ({row['current']:.3f}ms)")
+            continue
+        flag = "REGRESSION" if row["regression"] else "ok"
+        print(f"{row['name']:<26} {row['baseline']:>10.3f} -> {row['current']:>10.3f}ms  {row['change']:+7.1%}  {flag}")
+    regressions = [row["name"] for row in rows if row["regression"]]
+    if regressions:
+        print(f"{len(regressions)} regression(s) above {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
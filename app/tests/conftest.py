@@ -165,6 +165,19 @@ def setup_logging():
         logging.root.removeHandler(handler)
 
 
+def make_chat_interface(**env):
+    """Create a real ChatInterface (main_app must be loaded) without its HTTP API server.
+
+    The config file and ConfigMap lookups are stubbed out and ``env`` overrides os.environ
+    while the constructor reads its settings.
+    """
+    main_app = sys.modules["main_app"]
+    with patch("builtins.open", MagicMock()), patch.object(
+        main_app.ChatInterface, "_initialize_api_server"
+    ), patch.object(main_app.os.path, "exists", return_value=False), patch.dict(main_app.os.environ, env):
+        return main_app.ChatInterface()
+
+
 @pytest.fixture
 def chat_interface_mock():
     """Create a mock ChatInterface for testing."""
@@ -193,5 +206,18 @@ def chat_interface_mock():
     mock_interface.selected_model = "tinyllama:latest"
     mock_interface.ollama_models = ["tinyllama:latest"]
     mock_interface.automation_send_messages = True
+    mock_interface.max_message_chars = 8000
+    mock_interface.max_response_chars = 16000
 
     return mock_interface
+
+
+@pytest.fixture
+def mock_backend():
+    """Run the mock Ollama / Pipelines / Open WebUI server on a free local port."""
+    from .mock_backends import MockBackend
+
+    backend = MockBackend()
+    backend.start()
+    yield backend
+    backend.stop()
@@ -0,0 +1,358 @@
+"""
+Mock Ollama / Pipelines / Open WebUI server for deterministic local benchmarks and tests.
+
+Implements the backend endpoints the app and the response-level pipeline call:
+
+- Ollama: POST /api/chat (streaming NDJSON and non-streaming), GET /api/tags,
+  GET /api/ps, POST /api/embed and POST /api/embeddings
+- Pipelines: POST /v1/chat/completions (OpenAI format, SSE when streaming)
+- Open WebUI: POST /api/v1/chat/completions and POST /api/v1/auths/signin
+
+Latency, token rate, error rate and model-load delay are configurable, and all
+randomness comes from a seeded generator so runs are repeatable.
+
+Run standalone (then point OLLAMA_BASE_URL / PIPELINES_BASE_URL /
+OPEN_WEBUI_BASE_URL at it):
+
+    python app/tests/mock_backends.py --port 11434 --latency-ms 200 --tokens-per-second 40
+
+or use the ``mock_backend`` pytest fixture from conftest.py.
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from typing import Any, Dict, List
+
+from flask import Flask, Response, jsonify, request
+from werkzeug.serving import make_server
+
+WORDS = (
+    "the sky appears blue because molecules in the atmosphere scatter shorter "
+    "wavelengths of sunlight more strongly than longer ones so blue light reaches "
+    "our eyes from every direction"
+).split()
+
+
+class MockBackend:
+    """Configurable in-process stand-in for Ollama, Pipelines and Open WebUI."""
+
+    LATENCY_DISTRIBUTIONS = ("constant", "uniform", "exponential", "lognormal")
+    # Settings configure() (and so POST /mock/config) may change; anything else is internal state
+    TUNABLES = ("latency_ms", "latency_distribution", "jitter_ms", "tokens_per_second", "response_tokens",
+                "error_rate", "error_status", "model_load_ms", "models")
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        latency_distribution: str = "constant",
+        jitter_ms: float = 0.0,
+        tokens_per_second: float = 0.0,
+        response_tokens: int = 20,
+        error_rate: float = 0.0,
+        error_status: int = 500,
+        model_load_ms: float = 0.0,
+        models: List[str] = None,
+        embedding_dim: int = 8,
+        seed: int = 42,
+    ):
+        self.models = models or ["tinyllama:latest", "llama3.2:latest"]
+        self.embedding_dim = embedding_dim
+        self.configure(
+            latency_ms=latency_ms,
+            latency_distribution=latency_distribution,
+            jitter_ms=jitter_ms,
+            tokens_per_second=tokens_per_second,
+            response_tokens=response_tokens,
+            error_rate=error_rate,
+            error_status=error_status,
+            model_load_ms=model_load_ms,
+        )
+        self.random = random.Random(seed)
+        self.loaded_models: Dict[str, float] = {}
+        self.requests: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.app = self.create_app()
+        self.server = None
+        self.thread = None
+
+    def configure(self, **settings):
+        """Update behaviour at runtime (also exposed as POST /mock/config)."""
+        unknown = set(settings) - set(self.TUNABLES)
+        if unknown:
+            raise ValueError(f"unknown settings {sorted(unknown)}")
+        if settings.get("latency_distribution", "constant") not in self.LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"unknown latency distribution {settings['latency_distribution']}")
+        for name, value in settings.items():
+            setattr(self, name, value)
+
+    # --- Behaviour model ---
+
+    def _sample_latency(self) -> float:
+        """Seconds before the first token (time-to-first-token) or full non-token reply."""
+        with self._lock:
+            if self.latency_distribution == "uniform":
+                value = self.random.uniform(self.latency_ms - self.jitter_ms, self.latency_ms + self.jitter_ms)
+            elif self.latency_distribution == "exponential":
+                value = self.random.expovariate(1 / self.latency_ms) if self.latency_ms > 0 else 0.0
+            elif self.latency_distribution == "lognormal":
+                sigma = self.jitter_ms / self.latency_ms if self.latency_ms > 0 else 0.0
+                value = self.latency_ms * self.random.lognormvariate(0, sigma)
+            else:
+                value = self.latency_ms
+        return max(value, 0.0) / 1000
+
+    def _should_fail(self) -> bool:
+        with self._lock:
+            return self.random.random() < self.error_rate
+
+    def _load_model(self, model: str) -> float:
+        """Seconds spent loading ``model`` (only the first request per model pays it)."""
+        with self._lock:
+            cold = model not in self.loaded_models
+            self.loaded_models[model] = time.time()
+        return self.model_load_ms / 1000 if cold else 0.0
+
+    def _count(self, route: str):
+        with self._lock:
+            self.requests[route] = self.requests.get(route, 0) + 1
+
+    def _tokens(self, messages: List[Dict[str, Any]]) -> List[str]:
+        """Deterministic reply tokens derived from the last message."""
+        prompt = messages[-1].get("content", "") if messages else ""
+        offset = int(hashlib.sha256(prompt.encode()).hexdigest(), 16) % len(WORDS)
+        return [
+            ("" if i == 0 else " ") + WORDS[(offset + i) % len(WORDS)] for i in range(self.response_tokens)
+        ]
+
+    def _token_gap(self) -> float:
+        return 1 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+    def _error(self):
+        return jsonify({"error": "mock backend injected failure"}), self.error_status
+
+    def _generate(self, model: str, messages: List[Dict[str, Any]]):
+        """Yield (token, timings) pairs with realistic pacing; timings are set on the last token."""
+        load = self._load_model(model)
+        first_token = self._sample_latency()
+        time.sleep(load + first_token)
+        tokens = self._tokens(messages)
+        gap = self._token_gap()
+        eval_start = time.monotonic()
+        for i, token in enumerate(tokens):
+            if i:
+                time.sleep(gap)
+            timings = None
+            if i == len(tokens) - 1:
+                eval_ns = int((time.monotonic() - eval_start) * 1e9)
+                timings = {
+                    "total_duration": int((load + first_token) * 1e9) + eval_ns,
+                    "load_duration": int(load * 1e9),
+                    "prompt_eval_count": sum(len(m.get("content", "").split()) for m in messages),
+                    "prompt_eval_duration": int(first_token * 1e9),
+                    "eval_count": len(tokens),
+                    "eval_duration": eval_ns,
+                }
+            yield token, timings
+
+    # --- HTTP ---
+
+    def create_app(self) -> Flask:
+        app = Flask("mock_backends")
+
+        @app.route("/api/chat", methods=["POST"])
+        def ollama_chat():
+            self._count("/api/chat")
+            body = request.get_json(force=True)
+            model, messages = body.get("model", self.models[0]), body.get("messages", [])
+            if self._should_fail():
+                time.sleep(self._sample_latency())
+                return self._error()
+            created = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+            if body.get("stream", True):
+
+                def stream():
+                    timings = {}
+                    for token, token_timings in self._generate(model, messages):
+                        timings = token_timings or timings
+                        chunk = {"model": model, "created_at": created,
+                                 "message": {"role": "assistant", "content": token}, "done": False}
+                        yield json.dumps(chunk) + "\n"
+                    final = {"model": model, "created_at": created, "message": {"role": "assistant", "content": ""},
+                             "done": True, "done_reason": "stop", **timings}
+                    yield json.dumps(final) + "\n"
+
+                return Response(stream(), mimetype="application/x-ndjson")
+
+            content, timings = "", {}
+            for token, token_timings in self._generate(model, messages):
+                content += token
+                timings = token_timings or timings
+            return jsonify({"model": model, "created_at": created, "message": {"role": "assistant", "content": content},
+                            "done": True, "done_reason": "stop", **timings})
+
+        @app.route("/api/tags", methods=["GET"])
+        def ollama_tags():
+            self._count("/api/tags")
+            return jsonify({"models": [self._model_info(name) for name in self.models]})
+
+        @app.route("/api/ps", methods=["GET"])
+        def ollama_ps():
+            self._count("/api/ps")
+            with self._lock:
+                loaded = list(self.loaded_models)
+            return jsonify({"models": [self._model_info(name) for name in loaded]})
+
+        @app.route("/api/embed", methods=["POST"])
+        @app.route("/api/embeddings", methods=["POST"])
+        def ollama_embed():
+            self._count(request.path)
+            body = request.get_json(force=True)
+            if self._should_fail():
+                return self._error()
+            time.sleep(self._load_model(body.get("model", self.models[0])) + self._sample_latency())
+            if request.path == "/api/embeddings":
+                return jsonify({"embedding": self._embedding(body.get("prompt", ""))})
+            inputs = body.get("input", "")
+            inputs = inputs if isinstance(inputs, list) else [inputs]
+            return jsonify({"model": body.get("model"), "embeddings": [self._embedding(text) for text in inputs]})
+
+        @app.route("/v1/chat/completions", methods=["POST"])
+        @app.route("/api/v1/chat/completions", methods=["POST"])
+        def openai_chat():
+            self._count(request.path)
+            body = request.get_json(force=True)
+            model, messages = body.get("model", self.models[0]), body.get("messages", [])
+            if self._should_fail():
+                time.sleep(self._sample_latency())
+                return self._error()
+            completion_id = f"chatcmpl-mock-{self.requests[request.path]}"
+
+            if body.get("stream"):
+
+                def stream():
+                    for token, _ in self._generate(model, messages):
+                        delta = {"id": completion_id, "object": "chat.completion.chunk", "model": model,
+                                 "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}]}
+                        yield f"data: {json.dumps(delta)}\n\n"
+                    done = {"id": completion_id, "object": "chat.completion.chunk", "model": model,
+                            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+                    yield f"data: {json.dumps(done)}\n\ndata: [DONE]\n\n"
+
+                return Response(stream(), mimetype="text/event-stream")
+
+            content, timings = "", {}
+            for token, token_timings in self._generate(model, messages):
+                content += token
+                timings = token_timings or timings
+            return jsonify({
+                "id": completion_id,
+                "object": "chat.completion",
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": {
+                    "prompt_tokens": timings.get("prompt_eval_count", 0),
+                    "completion_tokens": timings.get("eval_count", 0),
+                    "total_tokens": timings.get("prompt_eval_count", 0) + timings.get("eval_count", 0),
+                },
+            })
+
+        @app.route("/api/v1/auths/signin", methods=["POST"])
+        def webui_signin():
+            self._count("/api/v1/auths/signin")
+            body = request.get_json(force=True, silent=True) or {}
+            if self._should_fail():
+                return self._error()
+            return jsonify({"token": "mock-token", "token_type": "Bearer", "email": body.get("email"), "role": "admin"})
+
+        @app.route("/mock/config", methods=["POST"])
+        def mock_config():
+            try:
+                settings = request.get_json(force=True)
+                if not isinstance(settings, dict):
+                    raise ValueError("expected a JSON object of settings")
+                self.configure(**settings)
+            except (TypeError, ValueError) as e:
+                return jsonify({"error": str(e)}), 400
+            return jsonify({"status": "ok"})
+
+        @app.route("/mock/stats", methods=["GET"])
+        def mock_stats():
+            with self._lock:
+                return jsonify({"requests": dict(self.requests), "loaded_models": list(self.loaded_models)})
+
+        return app
+
+    def _model_info(self, name: str) -> Dict[str, Any]:
+        return {
+            "name": name,
+            "model": name,
+            "size": 637700138,
+            "digest": hashlib.sha256(name.encode()).hexdigest(),
+            "details": {"family": "llama", "parameter_size": "1B", "quantization_level": "Q4_0"},
+        }
+
+    def _embedding(self, text: str) -> List[float]:
+        digest = hashlib.sha256(text.encode()).digest()
+        return [round(digest[i % len(digest)] / 255, 6) for i in range(self.embedding_dim)]
+
+    # --- Lifecycle ---
+
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Serve in a background thread; port 0 picks a free port. Returns the base URL."""
+        self.server = make_server(host, port, self.app, threaded=True)
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, name="mock-backend", daemon=True
+        )
+        self.thread.start()
+        return self.url
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.server.host}:{self.server.port}"
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.thread.join()
+            self.server = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--latency-ms", type=float, default=100.0, help="mean time to first token")
+    parser.add_argument("--latency-distribution", choices=MockBackend.LATENCY_DISTRIBUTIONS, default="constant")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="uniform half-width or lognormal spread")
+    parser.add_argument("--tokens-per-second", type=float, default=50.0)
+    parser.add_argument("--response-tokens", type=int, default=20)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--model-load-ms", type=float, default=0.0, help="delay on the first request per model")
+    parser.add_argument("--models", default="tinyllama:latest,llama3.2:latest")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    backend = MockBackend(
+        latency_ms=args.latency_ms,
+        latency_distribution=args.latency_distribution,
+        jitter_ms=args.jitter_ms,
+        tokens_per_second=args.tokens_per_second,
+        response_tokens=args.response_tokens,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        model_load_ms=args.model_load_ms,
+        models=args.models.split(","),
+        seed=args.seed,
+    )
+    print(f"Mock backends listening on http://{args.host}:{args.port}")
+    make_server(args.host, args.port, backend.app, threaded=True).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
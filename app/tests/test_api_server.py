@@ -0,0 +1,402 @@
+"""
+Tests for the ObservableAPIServer HTTP routes.
+"""
+
+import importlib.util
+import os
+import sys
+import threading
+from pathlib import Path
+from unittest.mock import MagicMock, Mock, patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+if "main_app" not in sys.modules:
+    spec = importlib.util.spec_from_file_location(
+        "main_app", Path(__file__).parent.parent / "python-ollama-open-webui.py"
+    )
+    main_app = importlib.util.module_from_spec(spec)
+    sys.modules["main_app"] = main_app
+    spec.loader.exec_module(main_app)
+main_app = sys.modules["main_app"]
+
+
+@pytest.fixture
+def debug_client(chat_interface_mock):
+    """Flask test client with debug endpoints enabled."""
+    with patch.dict(os.environ, {"DEBUG_ENDPOINTS_ENABLED": "true"}):
+        server = main_app.ObservableAPIServer(chat_interface_mock)
+    return server.app.test_client()
+
+
+class TestDebugEndpoints:
+    def test_debug_routes_disabled_by_default(self, chat_interface_mock):
+        client = main_app.ObservableAPIServer(chat_interface_mock).app.test_client()
+        assert client.get("/debug/threads").status_code == 404
+
+    def test_profile_returns_collapsed_stacks(self, debug_client):
+        stop = threading.Event()
+
+        def busy_worker_loop():
+            while not stop.is_set():
+                sum(range(1000))
+
+        worker = threading.Thread(target=busy_worker_loop, name="busy-worker", daemon=True)
+        worker.start()
+        try:
+            response = debug_client.get("/debug/profile?seconds=0.2&hz=200")
+        finally:
+            stop.set()
+            worker.join()
+
+        assert response.status_code == 200
+        lines = response.get_data(as_text=True).strip().splitlines()
+        assert lines
+        stack, count = lines[0].rsplit(" ", 1)
+        assert stack and int(count) > 0
+        assert any(line.startswith("busy-worker;") and "busy_worker_loop" in line for line in lines)
+
+    def test_profile_rejects_concurrent_runs(self, debug_client):
+        with patch.object(main_app.StackSampler, "profile", side_effect=RuntimeError("busy")):
+            assert debug_client.get("/debug/profile?seconds=1").status_code == 409
+
+    def test_thread_dump(self, debug_client):
+        data = debug_client.get("/debug/threads").get_json()
+        assert data["count"] == len(data["threads"])
+        main_thread = next(t for t in data["threads"] if t["name"] == "MainThread")
+        assert main_thread["stack"]
+
+    def test_memory_summary_and_diff(self, debug_client, chat_interface_mock):
+        chat_interface_mock.queue_stats.return_value = {"automation_results": {"size": 0, "maxsize": 20, "dropped": 0}}
+        summary = debug_client.get("/debug/memory?limit=5").get_json()
+        assert len(summary["object_counts"]) == 5
+        assert summary["queues"]["automation_results"]["maxsize"] == 20
+        assert debug_client.get("/debug/memory?limit=abc").status_code == 400
+        assert debug_client.get("/debug/memory/diff?limit=abc").status_code == 400
+
+        assert debug_client.get("/debug/memory/diff").status_code == 409
+        try:
+            assert debug_client.post("/debug/memory/snapshot").get_json()["tracing"]
+            leak = [bytearray(1024) for _ in range(100)]
+            diff = debug_client.get("/debug/memory/diff?limit=3").get_json()
+            assert len(diff["top_growth"]) <= 3
+            assert any(row["size_diff_kb"] > 0 for row in diff["top_growth"])
+            # Still referenced here, so the allocations were live when the diff was taken
+            assert sum(map(len, leak)) == 100 * 1024
+        finally:
+            import tracemalloc
+
+            tracemalloc.stop()
+
+
+class TestDropOldestQueue:
+    def test_put_discards_oldest_when_full(self):
+        q = main_app.DropOldestQueue(maxsize=2)
+        for item in range(5):
+            q.put(item)
+        assert q.dropped == 3
+        assert [q.get_nowait(), q.get_nowait()] == [3, 4]
+
+
+class TestChatStreaming:
+    @patch("main_app.requests.post")
+    def test_stream_relays_ollama_chunks(self, mock_post, chat_interface_mock):
+        chunks = [
+            b'{"message": {"content": "Blue"}, "done": false}',
+            b"",
+            b'{"message": {"content": " sky"}, "done": false}',
+            b'{"message": {"content": ""}, "done": true, "eval_count": 2}',
+        ]
+        upstream = MagicMock(status_code=200)
+        upstream.iter_lines.return_value = iter(chunks)
+        upstream.__enter__.return_value = upstream
+        mock_post.return_value = upstream
+
+        interface = chat_interface_mock
+        interface.service_health_failure = False
+        interface.ollama_base_url = "http://ollama:11434"
+        interface.inference_timeout = 30
+        interface.tracer = main_app.RequestTracer()
+        interface.num_predict = 1000
+        interface._ollama_payload = main_app.ChatInterface._ollama_payload.__get__(interface)
+        interface.request_deadline_seconds, interface.min_attempt_seconds = 60, 2
+        interface.new_deadline = main_app.ChatInterface.new_deadline.__get__(interface)
+        interface._attempt_timeout = main_app.ChatInterface._attempt_timeout.__get__(interface)
+        interface.stream_chat_with_ollama = main_app.ChatInterface.stream_chat_with_ollama.__get__(interface)
+
+        client = main_app.ObservableAPIServer(interface).app.test_client()
+        response = client.post("/api/chat", json={"message": "sky?", "stream": True, "max_tokens": 64})
+
+        assert response.mimetype == "application/x-ndjson"
+        lines = response.get_data(as_text=True).splitlines()
+        assert [main_app.json.loads(line)["message"]["content"] for line in lines] == ["Blue", " sky", ""]
+        assert mock_post.call_args.kwargs["json"]["stream"] is True
+        assert mock_post.call_args.kwargs["json"]["options"] == {"num_predict": 64}
+        assert mock_post.call_args.kwargs["stream"] is True
+        assert 0 < mock_post.call_args.kwargs["timeout"] <= 30
+
+
+class TestSizeLimits:
+    def test_oversized_requests_are_rejected(self, chat_interface_mock):
+        chat_interface_mock.max_message_chars = 10
+        chat_interface_mock.service_health_failure = False
+        chat_interface_mock.tracer = main_app.RequestTracer()
+        client = main_app.ObservableAPIServer(chat_interface_mock).app.test_client()
+        client.application.config["MAX_CONTENT_LENGTH"] = 64
+
+        assert client.post("/api/chat", json={"message": "x" * 11}).status_code == 413
+        assert client.post("/api/compare", json={"message": "x" * 11, "models": ["a"]}).status_code == 413
+        assert client.post("/api/chat", json={"message": "short", "pad": "y" * 100}).status_code == 413
+        for bad in (-1, 0, True, "10", 1.5):
+            assert client.post("/api/chat", json={"message": "short", "max_tokens": bad}).status_code == 400
+        chat_interface_mock.chat_with_ollama.assert_not_called()
+
+    def test_generation_budget_is_clamped(self, chat_interface_mock):
+        chat_interface_mock.num_predict = 100
+        payload = main_app.ChatInterface._ollama_payload
+        assert payload(chat_interface_mock, [], "m", 500)["options"] == {"num_predict": 100}
+        assert payload(chat_interface_mock, [], "m", -1)["options"] == {"num_predict": 1}
+        assert payload(chat_interface_mock, [], "m")["options"] == {"num_predict": 100}
+
+
+class TestTrafficCapture:
+    def test_records_request_shape_without_prompt_text(self, chat_interface_mock, temp_dir):
+        capture_path = os.path.join(temp_dir, "traffic.jsonl")
+        chat_interface_mock.service_health_failure = False
+        chat_interface_mock.tracer = main_app.RequestTracer()
+        with patch.dict(os.environ, {"TRAFFIC_CAPTURE_PATH": capture_path}):
+            server = main_app.ObservableAPIServer(chat_interface_mock)
+        client = server.app.test_client()
+
+        client.post("/api/chat", json={"model": "tinyllama:latest", "prompt": "secret"})
+        client.get("/script.js?token=abc")
+
+        with open(capture_path) as f:
+            records = [main_app.json.loads(line) for line in f]
+        # Routes are recorded as templates, never concrete paths or query strings
+        assert [r["route"] for r in records] == ["/api/chat", "/<path:filename>"]
+        assert records[0]["status"] == 400
+        assert records[0]["model"] == "tinyllama:latest"
+        assert records[0]["prompt_chars"] is None
+        assert "secret" not in open(capture_path).read()
+        assert "token" not in open(capture_path).read()
+
+    def test_streamed_duration_covers_the_body(self, chat_interface_mock, temp_dir):
+        capture_path = os.path.join(temp_dir, "traffic.jsonl")
+        chat_interface_mock.service_health_failure = False
+        chat_interface_mock.tracer = main_app.RequestTracer()
+
+        def slow_chunks(*args):
+            yield '{"done": false}\n'
+            main_app.time.sleep(0.2)
+            yield '{"done": true}\n'
+
+        chat_interface_mock.stream_chat_with_ollama = slow_chunks
+        with patch.dict(os.environ, {"TRAFFIC_CAPTURE_PATH": capture_path}):
+            server = main_app.ObservableAPIServer(chat_interface_mock)
+        client = server.app.test_client()
+
+        response = client.post("/api/chat", json={"message": "sky?", "stream": True})
+        assert not os.path.exists(capture_path) or not open(capture_path).read()
+        response.get_data()
+        response.close()
+
+        with open(capture_path) as f:
+            (record,) = [main_app.json.loads(line) for line in f]
+        assert record["stream"] is True
+        assert record["duration_ms"] >= 200
+
+    def test_stops_at_size_limit(self, temp_dir):
+        recorder = main_app.TrafficRecorder(os.path.join(temp_dir, "t.jsonl"), max_bytes=100)
+        for _ in range(5):
+            recorder.record(ts=1.0, route="/health", status=200)
+        assert recorder.full
+        assert 0 < recorder.recorded < 5
+        recorder.close()
+
+
+class TestProviderStatusCaching:
+    def test_renderer_rerenders_only_changed_providers(self):
+        renderer = main_app.ProviderStatusRenderer()
+        status = {
+            "A": {"status": "🟢", "response_time": "100ms", "flag": "🇺🇸"},
+            "B": {"status": "🔴", "response_time": "---ms", "flag": "🇫🇷"},
+        }
+        html = renderer.render(status)
+        assert renderer.summary() == {"total": 2, "online": 1, "offline": 1, "avg_response_ms": 100}
+        version = renderer.version
+
+        with patch.object(main_app.ProviderStatusRenderer, "_render_card", wraps=renderer._render_card) as render_card:
+            assert renderer.render({**status}) is html
+            assert renderer.version == version
+            status["B"] = {"status": "🟢", "response_time": "300ms", "flag": "🇫🇷"}
+            renderer.render(status)
+        assert [c.args[0] for c in render_card.call_args_list] == ["B"]
+        assert renderer.summary()["avg_response_ms"] == 200
+        assert renderer.version == version + 1
+
+        del status["A"]
+        assert renderer.sync(status)
+        assert renderer.summary() == {"total": 1, "online": 1, "offline": 0, "avg_response_ms": 300}
+
+    def test_status_etag_returns_not_modified(self, chat_interface_mock):
+        chat_interface_mock.status_renderer = main_app.ProviderStatusRenderer()
+        chat_interface_mock.provider_status = {"A": {"status": "🟢", "response_time": "50ms", "flag": "🌍"}}
+        client = main_app.ObservableAPIServer(chat_interface_mock).app.test_client()
+
+        first = client.get("/api/status")
+        etag = first.headers["ETag"]
+        assert first.get_json()["summary"]["online"] == 1
+        assert client.get("/api/status", headers={"If-None-Match": etag}).status_code == 304
+
+        chat_interface_mock.provider_status = {"A": {"status": "🔴", "response_time": "---ms", "flag": "🌍"}}
+        changed = client.get("/api/status", headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.headers["ETag"] != etag
+
+
+class TestPushEvents:
+    def test_broadcaster_replays_latest_and_isolates_slow_clients(self):
+        events = main_app.EventBroadcaster(queue_size=2)
+        events.publish("demo_state", {"on": False})
+        subscriber = events.subscribe()
+        assert subscriber.get_nowait() == 'event: demo_state\ndata: {"on":false}\n\n'
+
+        for i in range(5):
+            events.publish("automation_result", {"i": i})
+        assert events.stats() == {"subscribers": 1, "published": 6, "dropped": 3}
+
+        stream = events.stream(subscriber, heartbeat_seconds=0.01)
+        assert next(stream).startswith("retry:")
+        assert '"i":3' in next(stream)
+        assert '"i":4' in next(stream)
+        assert next(stream) == ": keepalive\n\n"
+        stream.close()
+        assert events.subscriber_count == 0
+
+    def test_new_subscriber_gets_full_provider_snapshot(self, chat_interface_mock):
+        interface = chat_interface_mock
+        interface.events = main_app.EventBroadcaster()
+        interface.status_renderer = main_app.ProviderStatusRenderer()
+        interface._published_fingerprints = {}
+        publish = main_app.ChatInterface._publish_provider_changes.__get__(interface)
+        status = {name: {"status": "🟢", "response_time": "50ms", "flag": "🌍"} for name in ("A", "B")}
+        publish(status)
+        live = interface.events.subscribe()
+        live.get_nowait()
+
+        publish({**status, "B": {"status": "🔴", "response_time": "---ms", "flag": "🌍"}})
+        delta = main_app.json.loads(live.get_nowait().split("data: ", 1)[1])
+        snapshot = main_app.json.loads(interface.events.subscribe().get_nowait().split("data: ", 1)[1])
+
+        assert list(delta["providers"]) == ["B"] and "full" not in delta
+        assert snapshot["full"] and sorted(snapshot["providers"]) == ["A", "B"]
+        assert snapshot["providers"]["B"]["status"] == "🔴"
+
+    def test_events_route_streams_sse(self, chat_interface_mock):
+        chat_interface_mock.events = main_app.EventBroadcaster()
+        chat_interface_mock.events.publish("provider_status", {"providers": {"A": None}})
+        client = main_app.ObservableAPIServer(chat_interface_mock).app.test_client()
+
+        response = client.get("/api/events")
+        assert response.mimetype == "text/event-stream"
+        chat_interface_mock.start_demo_state_watcher.assert_called_once()
+        body = response.response
+        assert next(body).startswith(b"retry:")
+        assert next(body).startswith(b"event: provider_status")
+        response.close()
+
+
+class TestPipelineLevels:
+    @patch("main_app.requests.post")
+    def test_compare_levels_via_pipelines(self, mock_post, chat_interface_mock):
+        batch = {"prompt": "Why?", "total_ms": 10.0, "concurrency": 5, "results": [{"level": "Default"}]}
+        mock_post.return_value.json.return_value = {"choices": [{"message": {"content": main_app.json.dumps(batch)}}]}
+        interface = chat_interface_mock
+        interface.pipelines_base_url = "http://pipelines:9099"
+        interface.pipeline_api_key = None
+        interface.pipeline_batch_timeout = 90
+        interface.tracer = main_app.RequestTracer()
+        interface.compare_pipeline_levels = main_app.ChatInterface.compare_pipeline_levels.__get__(interface)
+        client = main_app.ObservableAPIServer(interface).app.test_client()
+
+        response = client.post("/api/pipeline/levels", json={"message": "Why?"})
+
+        assert response.get_json() == batch
+        assert mock_post.call_args.kwargs["json"]["all_levels"] is True
+        assert mock_post.call_args.kwargs["timeout"] == 90
+
+        interface.pipelines_base_url = None
+        assert client.post("/api/pipeline/levels", json={"message": "Why?"}).status_code == 503
+
+    @patch("main_app.requests.post")
+    def test_compare_levels_rejects_bad_input_and_replies(self, mock_post, chat_interface_mock):
+        mock_post.return_value.json.return_value = {
+            "choices": [{"message": {"content": "🔴 Pipeline Service BROKEN"}}]
+        }
+        interface = chat_interface_mock
+        interface.pipelines_base_url = "http://pipelines:9099"
+        interface.pipeline_api_key = None
+        interface.pipeline_batch_timeout = 90
+        interface.max_message_chars = 10
+        interface.tracer = main_app.RequestTracer()
+        interface.compare_pipeline_levels = main_app.ChatInterface.compare_pipeline_levels.__get__(interface)
+        client = main_app.ObservableAPIServer(interface).app.test_client()
+
+        for bad in (["Why?"], "x" * 11):
+            assert client.post("/api/pipeline/levels", json={"message": bad}).status_code == 400
+        response = client.post("/api/pipeline/levels", json={"message": "Why?"})
+        assert response.status_code == 502
+        assert "Bad upstream reply" in response.get_json()["error"]
+
+
+class TestChatSessions:
+    def test_lru_eviction_ttl_and_token_budget(self):
+        store = main_app.ChatSessionStore(max_sessions=2, ttl_seconds=60, max_history_tokens=50)
+        a, _ = store.history("a")
+        store.history("b")
+        store.history("a")  # "b" is now least recently used
+        store.history("c")
+        assert store.stats()["evicted"] == 1
+        assert [store.history(s)[1] for s in ("a", "c")] == [[], []]
+        assert store.stats()["evicted"] == 1
+
+        for i in range(10):
+            store.append(a, {"role": "user", "content": f"q{i} " * 5}, {"role": "assistant", "content": "ok"})
+        _, history = store.history(a)
+        assert store.estimate_tokens(history) <= 50
+        assert history[0]["role"] == "user" and history[-1]["content"] == "ok"
+
+        with patch.object(main_app.time, "time", return_value=main_app.time.time() + 61):
+            assert store.stats()["sessions"] == 0
+
+    @patch("main_app.requests.post")
+    def test_chat_api_continues_session(self, mock_post, chat_interface_mock):
+        interface = chat_interface_mock
+        interface.service_health_failure = False
+        interface.tracer = main_app.RequestTracer()
+        interface.sessions = main_app.ChatSessionStore()
+        interface.chat_with_ollama.side_effect = ["Blue light scatters.", "Sunsets are red."]
+        interface.chat_with_open_webui.return_value = "webui"
+        client = main_app.ObservableAPIServer(interface).app.test_client()
+
+        first = client.post("/api/chat", json={"message": "Why is the sky blue?", "session": True}).get_json()
+        session_id = first["session_id"]
+        client.post("/api/chat", json={"message": "And sunsets?", "session_id": session_id})
+
+        sent = interface.chat_with_ollama.call_args_list[1].args[0]
+        assert [m["content"] for m in sent] == ["Why is the sky blue?", "Blue light scatters.", "And sunsets?"]
+        assert client.delete(f"/api/chat/sessions/{session_id}").status_code == 200
+
+    def test_chat_api_rejects_bad_session_ids(self, chat_interface_mock):
+        interface = chat_interface_mock
+        interface.service_health_failure = False
+        interface.tracer = main_app.RequestTracer()
+        interface.sessions = main_app.ChatSessionStore()
+        client = main_app.ObservableAPIServer(interface).app.test_client()
+
+        for bad in (["a"], {"a": 1}, "", "x" * (main_app.ChatSessionStore.MAX_ID_LENGTH + 1), 7):
+            assert client.post("/api/chat", json={"message": "hi", "session_id": bad}).status_code == 400
+        assert interface.sessions.stats()["sessions"] == 0
@@ -0,0 +1,92 @@
+"""
+Tests for the automation runner and its bounded results history.
+"""
+
+import importlib.util
+import os
+import sqlite3
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+if "main_app" not in sys.modules:
+    spec = importlib.util.spec_from_file_location(
+        "main_app", Path(__file__).parent.parent / "python-ollama-open-webui.py"
+    )
+    main_app = importlib.util.module_from_spec(spec)
+    sys.modules["main_app"] = main_app
+    spec.loader.exec_module(main_app)
+main_app = sys.modules["main_app"]
+
+
+def record_cycle(history, timestamp, ollama_ms=100.0, ollama_ok=1, online=8):
+    history.record(
+        timestamp=timestamp,
+        prompt_index=0,
+        ollama_ms=ollama_ms,
+        webui_ms=-1,
+        ollama_ok=ollama_ok,
+        webui_ok=0,
+        providers_online=online,
+        providers_total=10,
+        provider_check_ms=900.0,
+    )
+
+
+class TestAutomationHistory:
+    def test_ring_buffer_is_bounded(self):
+        history = main_app.AutomationHistory(capacity=3)
+        for ts in range(5):
+            record_cycle(history, timestamp=1000.0 + ts)
+        cycles = history.recent(10)
+        assert [c["timestamp"] for c in cycles] == [1002.0, 1003.0, 1004.0]
+        assert history.total_recorded == 5
+
+    def test_summary_success_rate_and_latency(self):
+        history = main_app.AutomationHistory(capacity=10)
+        record_cycle(history, 1000.0, ollama_ms=100.0)
+        record_cycle(history, 1001.0, ollama_ms=300.0)
+        record_cycle(history, 1002.0, ollama_ms=5000.0, ollama_ok=0)
+        summary = history.summary()
+        assert summary["cycles"] == 3
+        assert summary["ollama"]["success_rate"] == 0.667
+        assert summary["ollama"]["avg_ms"] == 200.0
+        # Messages disabled: no webui requests measured
+        assert summary["webui"]["requests"] == 0
+        assert summary["webui"]["success_rate"] is None
+
+    def test_trend_buckets(self):
+        history = main_app.AutomationHistory(capacity=10)
+        for ts in (0.0, 10.0, 65.0):
+            record_cycle(history, ts)
+        trend = history.trend(bucket_seconds=60)
+        assert [(b["bucket_start"], b["cycles"]) for b in trend] == [(0, 2), (60, 1)]
+
+    def test_sqlite_persistence_restores_latest_cycles(self, temp_dir):
+        db_path = os.path.join(temp_dir, "history.db")
+        history = main_app.AutomationHistory(capacity=5, db_path=db_path)
+        for ts in range(7):
+            record_cycle(history, timestamp=2000.0 + ts)
+
+        assert sqlite3.connect(db_path).execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+        restored = main_app.AutomationHistory(capacity=3, db_path=db_path)
+        assert [c["timestamp"] for c in restored.recent(10)] == [2004.0, 2005.0, 2006.0]
+        assert sqlite3.connect(db_path).execute("SELECT COUNT(*) FROM automation_cycles").fetchone()[0] == 3
+
+    def test_sqlite_table_is_pruned_while_recording(self, temp_dir):
+        db_path = os.path.join(temp_dir, "history.db")
+        history = main_app.AutomationHistory(capacity=20, db_path=db_path)
+        for ts in range(100):
+            record_cycle(history, timestamp=3000.0 + ts, online=200)
+
+        rows = sqlite3.connect(db_path).execute("SELECT COUNT(*), MIN(timestamp) FROM automation_cycles").fetchone()
+        assert rows == (20, 3080.0)
+        assert history.recent(1)[0]["providers_online"] == 200
+
+
+def test_is_error_reply():
+    assert main_app.is_error_reply("Error communicating with Ollama: timeout")
+    assert main_app.is_error_reply("🔄 **Pipeline Mode**: x\n\nError communicating with Ollama: boom")
+    assert not main_app.is_error_reply("The sky is blue because of Rayleigh scattering.")
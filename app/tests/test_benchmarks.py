@@ -0,0 +1,30 @@
+"""
+Tests for the benchmark harness's result format and regression comparison.
+"""
+
+from .benchmarks import BENCHMARKS, compare, run_benchmarks
+
+
+def result_doc(**p50s):
+    return {"results": {name: {"p50_ms": value} for name, value in p50s.items()}}
+
+
+class TestCompare:
+    def test_flags_only_slowdowns_above_threshold(self):
+        rows = compare(result_doc(a=10.0, b=10.0, c=10.0), result_doc(a=11.0, b=12.0, c=5.0), threshold=0.15)
+        flagged = {row["name"]: row["regression"] for row in rows}
+        assert flagged == {"a": False, "b": True, "c": False}
+        assert next(row for row in rows if row["name"] == "b")["change"] == 0.2
+
+    def test_new_benchmark_is_not_a_regression(self):
+        rows = compare(result_doc(), result_doc(fresh=3.0))
+        assert rows == [{"name": "fresh", "baseline": None, "current": 3.0, "change": None, "regression": False}]
+
+
+def test_run_produces_comparable_document():
+    assert "status_json" in BENCHMARKS
+    document = run_benchmarks(["status_json"], scale=0.01)
+    result = document["results"]["status_json"]
+    assert result["iterations"] == 5
+    assert result["min_ms"] <= result["p50_ms"] <= result["max_ms"]
+    assert not any(row["regression"] for row in compare(document, document))
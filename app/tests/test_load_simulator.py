@@ -0,0 +1,170 @@
+"""
+Tests for the load simulator's scheduling, histograms, scenarios and result merging.
+"""
+
+import importlib.util
+import random
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+if "load_simulator" not in sys.modules:
+    spec = importlib.util.spec_from_file_location(
+        "load_simulator", Path(__file__).parent.parent.parent / "frontend" / "load_simulator.py"
+    )
+    load_simulator = importlib.util.module_from_spec(spec)
+    sys.modules["load_simulator"] = load_simulator
+    spec.loader.exec_module(load_simulator)
+load_simulator = sys.modules["load_simulator"]
+
+LatencyHistogram = load_simulator.LatencyHistogram
+LoadPhase = load_simulator.LoadPhase
+LoadStats = load_simulator.LoadStats
+
+
+class TestLoadPhase:
+    def test_rate_ramps_linearly_and_clamps(self):
+        phase = LoadPhase("ramp", duration_seconds=10, rps=20, start_rps=10)
+        assert phase.rate_at(0) == 10
+        assert phase.rate_at(5) == 15
+        assert phase.rate_at(99) == 20
+        assert LoadPhase("steady", duration_seconds=10, rps=4).rate_at(3) == 4
+
+    def test_constant_arrivals_follow_the_rate(self):
+        phase = LoadPhase("c", duration_seconds=10, rps=4, arrival="constant")
+        assert phase.next_arrival(1.0) == pytest.approx(1.25)
+
+    def test_poisson_arrivals_average_the_rate_and_stay_in_phase(self):
+        random.seed(7)
+        phase = LoadPhase("p", duration_seconds=100, rps=50)
+        t, arrivals = 0.0, 0
+        while True:
+            t = phase.next_arrival(t)
+            if t >= phase.duration_seconds:
+                break
+            arrivals += 1
+        assert 4500 < arrivals < 5500
+
+    def test_scaled_splits_rates_and_users(self):
+        open_phase = LoadPhase("o", duration_seconds=10, rps=9, start_rps=3).scaled(0, 3)
+        assert (open_phase.rps, open_phase.start_rps) == (3, 1)
+        closed = LoadPhase("u", duration_seconds=10, users=5)
+        assert [closed.scaled(i, 3).users for i in range(3)] == [2, 2, 1]
+
+
+class TestLatencyHistogram:
+    def test_percentiles_within_bucket_precision(self):
+        histogram = LatencyHistogram()
+        for value in range(1, 1001):
+            histogram.record(value)
+        assert histogram.total_count == 1000
+        assert histogram.percentile(50) == pytest.approx(500, rel=0.02)
+        assert histogram.percentile(99) == pytest.approx(990, rel=0.02)
+        assert histogram.percentile(100) == 1000
+        assert LatencyHistogram().percentile(50) == 0.0
+
+    def test_merge_and_round_trip(self):
+        a, b = LatencyHistogram(), LatencyHistogram()
+        for value in (1, 2, 3):
+            a.record(value)
+        for value in (100, 200):
+            b.record(value)
+        a.merge(b)
+        assert (a.total_count, a.min_us, a.max_recorded_us) == (5, 1000, 200_000)
+
+        restored = LatencyHistogram.from_dict(a.to_dict())
+        assert restored.to_dict() == a.to_dict()
+        assert restored.summary() == a.summary()
+
+        with pytest.raises(ValueError):
+            a.merge(LatencyHistogram(sub_bucket_bits=5))
+
+
+class TestScenario:
+    def test_parse_applies_defaults_and_worker_share(self):
+        scenario = load_simulator.parse_scenario(
+            {"name": "s", "defaults": {"duration_seconds": 30}, "phases": [{"name": "warm", "rps": 10}]},
+            worker_index=0,
+            worker_count=2,
+        )
+        assert scenario["name"] == "s"
+        assert (scenario["phases"][0].duration_seconds, scenario["phases"][0].rps) == (30, 5)
+
+    @pytest.mark.parametrize("data, message", [
+        ({"phases": []}, "no phases"),
+        ({"phases": [{"name": "x", "rps": 1}]}, "duration_seconds"),
+        ({"phases": [{"duration_seconds": 1, "rps": 1, "users": 2}]}, "exactly one"),
+        ({"phases": [{"duration_seconds": 1, "rps": 0}]}, "positive rate"),
+        ({"phases": [{"duration_seconds": 1, "rps": 1, "bogus": 1}]}, "unknown keys"),
+        ({"phases": [{"duration_seconds": 1, "rps": 1, "arrival": "burst"}]}, "arrival"),
+        ({"phases": [{"duration_seconds": 1, "rps": 1, "endpoints": {"nope": 1}}]}, "unknown endpoints"),
+    ])
+    def test_invalid_scenarios_are_rejected(self, data, message):
+        with pytest.raises(ValueError, match=message):
+            load_simulator.parse_scenario(data)
+
+
+class TestLoadStats:
+    def test_merge_combines_counts_errors_and_elapsed(self):
+        first, second = LoadStats(), LoadStats()
+        first.record("/api/chat", {"success": True}, 100)
+        second.record("/api/chat", {"success": False, "status_code": 503}, 300)
+        second.record("/health", {"success": True, "ttft_ms": 5, "inter_token_ms": [1, 2]}, 10)
+        first.finish()
+        second.finish()
+        first.started, second.started = first.finished - 2, second.finished - 4
+
+        merged = LoadStats.from_dict(first.to_dict())
+        merged.merge(LoadStats.from_dict(second.to_dict()))
+        snapshot = merged.snapshot()
+
+        assert snapshot["elapsed_seconds"] == pytest.approx(4, abs=0.01)
+        assert snapshot["completed"] == 3 and snapshot["errors"] == 1
+        chat = snapshot["endpoints"]["/api/chat"]
+        assert chat["count"] == 2 and chat["error_breakdown"] == {"http_503": 1}
+        assert snapshot["endpoints"]["/health"]["inter_token"]["count"] == 2
+
+
+class TestWorkerRegistration:
+    def rejected_worker(self):
+        simulator = load_simulator.LoadSimulator.__new__(load_simulator.LoadSimulator)
+        simulator.enabled, simulator.role = True, "worker"
+        simulator.coordinator_url, simulator.worker_id = "http://coordinator:8089", "worker-restarted"
+        rejection = load_simulator.requests.Response()
+        rejection.status_code, rejection._content = 409, b'{"error": "all 2 worker slots are taken"}'
+        simulator.session = MagicMock()
+        simulator.session.request.return_value = rejection
+        return simulator
+
+    def test_rejected_registration_is_not_retried_and_worker_idles(self):
+        simulator = self.rejected_worker()
+        with patch.object(load_simulator.time, "sleep", side_effect=KeyboardInterrupt) as sleep:
+            simulator.run()
+        assert simulator.session.request.call_count == 1
+        sleep.assert_called_once_with(60)
+
+
+class TestReplay:
+    @pytest.mark.parametrize("recorded, streamed", [(True, True), (False, False), (None, True)])
+    def test_replay_uses_the_recorded_stream_flag(self, recorded, streamed):
+        simulator = load_simulator.LoadSimulator.__new__(load_simulator.LoadSimulator)
+        simulator.target_url, simulator.chat_model, simulator.request_timeout = "http://app", "m", 5
+        simulator.stream_chat, simulator.stats, simulator.session = True, LoadStats(), MagicMock()
+        simulator.session.post.return_value.status_code = 200
+        simulator.session.post.return_value.json.return_value = {"response": "ok"}
+        record = {"endpoint": "chat", "model": "m", "prompt_chars": 1}
+        if recorded is not None:
+            record["stream"] = recorded
+
+        async def replay():
+            with load_simulator.ThreadPoolExecutor(max_workers=1) as executor:
+                loop = load_simulator.asyncio.get_running_loop()
+                await simulator._replay_request(record, loop.time(), load_simulator.asyncio.Semaphore(1), executor)
+
+        with patch.object(simulator, "_prompt_of_length", return_value="p"), \
+                patch.object(simulator, "_send_streaming_chat_request", return_value={"success": True}) as streaming:
+            load_simulator.asyncio.run(replay())
+        assert streaming.called is streamed
+        assert simulator.session.post.called is not streamed
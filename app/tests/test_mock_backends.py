@@ -0,0 +1,187 @@
+"""
+Tests for ChatInterface against the local mock backends (no network or Ollama needed).
+"""
+
+import importlib.util
+import sys
+import time
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from .conftest import make_chat_interface
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+if "main_app" not in sys.modules:
+    spec = importlib.util.spec_from_file_location(
+        "main_app", Path(__file__).parent.parent / "python-ollama-open-webui.py"
+    )
+    main_app = importlib.util.module_from_spec(spec)
+    sys.modules["main_app"] = main_app
+    spec.loader.exec_module(main_app)
+main_app = sys.modules["main_app"]
+
+
+def make_interface(backend_url, pipelines_url=None):
+    """Create a ChatInterface pointed at the mock backend without starting the HTTP API server."""
+    return make_chat_interface(OLLAMA_BASE_URL=backend_url, PIPELINES_BASE_URL=pipelines_url or "")
+
+
+def test_pipeline_batch_timeout_covers_level_rounds():
+    with patch.dict(main_app.os.environ, {"INFERENCE_TIMEOUT": "30", "PIPELINE_BATCH_CONCURRENCY": "2"}):
+        assert make_interface("http://ollama:11434").pipeline_batch_timeout == 90
+
+
+class TestMockBackend:
+    def test_chat_with_ollama_is_deterministic(self, mock_backend):
+        interface = make_interface(mock_backend.url)
+        messages = [{"role": "user", "content": "Why is the sky blue?"}]
+        first = interface.chat_with_ollama(messages, "tinyllama:latest")
+        assert first == interface.chat_with_ollama(messages, "tinyllama:latest")
+        assert len(first.split()) == mock_backend.response_tokens
+
+    def test_streaming_token_rate_and_model_load(self, mock_backend):
+        mock_backend.configure(tokens_per_second=200, response_tokens=5, model_load_ms=100)
+        start = time.monotonic()
+        response = requests.post(
+            f"{mock_backend.url}/api/chat",
+            json={"model": "tinyllama:latest", "messages": [{"role": "user", "content": "hi"}]},
+            stream=True,
+        )
+        chunks = [main_app.json.loads(line) for line in response.iter_lines() if line]
+        elapsed = time.monotonic() - start
+
+        assert len(chunks) == 6 and chunks[-1]["done"]
+        assert chunks[-1]["eval_count"] == 5
+        assert chunks[-1]["load_duration"] >= 100_000_000
+        assert elapsed >= 0.1 + 4 / 200
+        assert requests.get(f"{mock_backend.url}/api/ps").json()["models"][0]["name"] == "tinyllama:latest"
+
+    def test_error_injection_and_pipelines_route(self, mock_backend):
+        interface = make_interface(mock_backend.url, pipelines_url=mock_backend.url)
+        mock_backend.configure(error_rate=1.0)
+        assert "Error communicating with Ollama" in interface.chat_with_ollama(
+            [{"role": "user", "content": "hi"}], "tinyllama:latest"
+        )
+
+        mock_backend.configure(error_rate=0.0)
+        reply = interface.chat_with_open_webui([{"role": "user", "content": "hi"}], "tinyllama:latest")
+        assert "Pipeline" in reply
+        assert mock_backend.requests["/v1/chat/completions"] == 1
+
+    def test_reply_is_truncated_at_response_budget(self, mock_backend):
+        mock_backend.configure(response_tokens=200)
+        interface = make_interface(mock_backend.url)
+        interface.max_response_chars = 50
+        messages = [{"role": "user", "content": "Why?"}]
+
+        data = interface._ollama_chat(messages, "tinyllama:latest", num_predict=10)
+        assert data["truncated"] and len(data["message"]["content"]) == 50
+
+        lines = [main_app.json.loads(line) for line in interface.stream_chat_with_ollama(messages, "tinyllama:latest")]
+        assert lines[-1] == {"message": {"role": "assistant", "content": ""}, "done": True, "truncated": True}
+        assert sum(len(line["message"]["content"]) for line in lines) <= 50
+
+    def test_fallback_chain_shares_one_deadline(self, mock_backend):
+        mock_backend.configure(latency_ms=500)
+        interface = make_interface(mock_backend.url, pipelines_url=mock_backend.url)
+        interface.min_attempt_seconds = 0.1
+        messages = [{"role": "user", "content": "hi"}]
+
+        start = time.monotonic()
+        reply = interface.chat_with_open_webui(messages, "tinyllama:latest", interface.new_deadline(timeout_ms=300))
+        elapsed = time.monotonic() - start
+
+        # Pipelines times out with the remaining budget; direct Ollama is skipped, not tried for 30s
+        assert "request deadline exceeded" in reply
+        assert elapsed < 0.5
+        assert mock_backend.requests.get("/api/chat", 0) == 0
+
+    def test_stream_stops_at_request_deadline(self, mock_backend):
+        mock_backend.configure(tokens_per_second=20, response_tokens=50)
+        interface = make_interface(mock_backend.url)
+        interface.service_health_failure = False
+        interface.min_attempt_seconds = 0.1
+        client = main_app.ObservableAPIServer(interface).app.test_client()
+
+        start = time.monotonic()
+        response = client.post(
+            "/api/chat", json={"message": "hi", "stream": True}, headers={"X-Request-Timeout-Ms": "300"}
+        )
+        lines = [main_app.json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+        assert time.monotonic() - start < 1.0
+        assert lines[-1]["truncated"] is True
+        assert "X-Request-Timeout-Ms" in response.headers["Access-Control-Allow-Headers"]
+
+    def test_pipelines_reply_is_streamed_and_truncated(self, mock_backend):
+        mock_backend.configure(response_tokens=200)
+        interface = make_interface(mock_backend.url, pipelines_url=mock_backend.url)
+        interface.max_response_chars = 50
+
+        reply = interface.chat_with_open_webui([{"role": "user", "content": "hi"}], "tinyllama:latest")
+        header, content = reply.split("\n\n", 1)
+        assert "via Pipelines Service" in header
+        assert 0 < len(content) <= 50
+
+    def test_oversized_json_reply_falls_back_to_ollama(self, mock_backend):
+        interface = make_interface(mock_backend.url, pipelines_url="http://pipelines:9099")
+        interface.max_response_chars = 10
+        oversized = MagicMock(status_code=200, headers={"Content-Type": "application/json"})
+        oversized.iter_content.return_value = [b"x" * 65536] * 3
+        real_post = requests.post
+        with patch.object(main_app.requests, "post",
+                          side_effect=lambda url, **kw: oversized if "pipelines" in url else real_post(url, **kw)):
+            reply = interface.chat_with_open_webui([{"role": "user", "content": "hi"}], "tinyllama:latest")
+        assert "via Direct Ollama" in reply
+        oversized.close.assert_called_once()
+
+    def test_empty_stream_and_config_whitelist(self, mock_backend):
+        mock_backend.configure(response_tokens=0)
+        response = requests.post(f"{mock_backend.url}/api/chat", json={"model": "m", "messages": []})
+        final = main_app.json.loads(response.text.splitlines()[-1])
+        assert final["done"] and final["message"]["content"] == ""
+
+        config = f"{mock_backend.url}/mock/config"
+        assert requests.post(config, json={"_generate": None}).status_code == 400
+        assert requests.post(config, json=["latency_ms"]).status_code == 400
+        assert requests.post(config, json={"latency_ms": 5}).status_code == 200
+        assert callable(mock_backend._generate) and mock_backend.latency_ms == 5
+
+    def test_tags_and_embeddings(self, mock_backend):
+        tags = requests.get(f"{mock_backend.url}/api/tags").json()
+        assert [m["name"] for m in tags["models"]] == mock_backend.models
+        embed = requests.post(f"{mock_backend.url}/api/embed", json={"model": "m", "input": ["a", "b"]}).json()
+        assert len(embed["embeddings"]) == 2 and len(embed["embeddings"][0]) == mock_backend.embedding_dim
+
+
+class TestModelComparison:
+    def test_compare_streams_results_with_bounded_concurrency(self, mock_backend):
+        mock_backend.configure(latency_ms=100, tokens_per_second=1000)
+        interface = make_interface(mock_backend.url)
+        interface.service_health_failure = False
+        interface.compare_max_concurrency = 2
+        interface.compare_slots = main_app.threading.BoundedSemaphore(2)
+        client = main_app.ObservableAPIServer(interface).app.test_client()
+
+        start = time.monotonic()
+        response = client.post("/api/compare", json={"message": "Why?", "models": ["a", "b", "c", "d"]})
+        lines = [main_app.json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        elapsed = time.monotonic() - start
+
+        results, summary = lines[:-1], lines[-1]
+        assert sorted(r["model"] for r in results) == ["a", "b", "c", "d"]
+        assert all(r["ok"] and r["tokens_per_second"] for r in results)
+        assert summary["done"] and summary["models"] == 4
+        # Two at a time: two rounds of ~100ms, not one (unbounded) or four (sequential)
+        assert 0.2 <= elapsed < 0.4
+
+    def test_compare_rejects_bad_requests(self, mock_backend):
+        interface = make_interface(mock_backend.url)
+        interface.service_health_failure = False
+        client = main_app.ObservableAPIServer(interface).app.test_client()
+        assert client.post("/api/compare", json={"message": "Why?", "models": []}).status_code == 400
+        too_many = [f"m{i}" for i in range(interface.compare_max_models + 1)]
+        assert client.post("/api/compare", json={"message": "Why?", "models": too_many}).status_code == 400
@@ -0,0 +1,136 @@
+"""
+Tests for request tracing and observability helpers.
+"""
+
+import importlib.util
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock, Mock, patch
+
+import pytest
+
+from .conftest import make_chat_interface
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+if "main_app" not in sys.modules:
+    spec = importlib.util.spec_from_file_location(
+        "main_app", Path(__file__).parent.parent / "python-ollama-open-webui.py"
+    )
+    main_app = importlib.util.module_from_spec(spec)
+    sys.modules["main_app"] = main_app
+    spec.loader.exec_module(main_app)
+main_app = sys.modules["main_app"]
+
+
+@pytest.fixture
+def span_exporter():
+    """Enable the interface tracer against an in-memory exporter."""
+    sdk_trace = pytest.importorskip("opentelemetry.sdk.trace")
+    export = pytest.importorskip("opentelemetry.sdk.trace.export")
+    in_memory = pytest.importorskip("opentelemetry.sdk.trace.export.in_memory_span_exporter")
+
+    exporter = in_memory.InMemorySpanExporter()
+    provider = sdk_trace.TracerProvider()
+    provider.add_span_processor(export.SimpleSpanProcessor(exporter))
+
+    interface = make_chat_interface()
+    assert interface.tracer.enable(record_model_metrics=True)
+    interface.tracer._tracer = provider.get_tracer("test")
+    yield interface, exporter
+
+
+class TestRequestTracer:
+    def test_disabled_tracer_is_noop(self):
+        tracer = main_app.RequestTracer()
+        with tracer.span("noop") as span:
+            assert span is None
+        assert tracer.inject_headers({"a": "b"}) == {"a": "b"}
+
+    @patch("main_app.requests.post")
+    def test_fallback_chain_spans(self, mock_post, span_exporter):
+        interface, exporter = span_exporter
+        interface.pipelines_base_url = "http://pipelines:9099"
+
+        failed = Mock(status_code=503, text="unavailable")
+        ollama = Mock(status_code=200)
+        ollama.iter_lines.return_value = [
+            b'{"message": {"content": "blue"}, "done": false}',
+            b'{"message": {"content": ""}, "done": true, "prompt_eval_count": 12, '
+            b'"eval_count": 40, "eval_duration": 2000000000}',
+        ]
+        mock_post.side_effect = [failed, ollama]
+
+        reply = interface.chat_with_open_webui([{"role": "user", "content": "sky?"}], "tinyllama:latest")
+        assert "via Direct Ollama" in reply
+
+        spans = {span.name: span for span in exporter.get_finished_spans()}
+        assert {"chat_with_open_webui", "fallback.pipelines", "fallback.direct_ollama", "ollama.chat"} <= set(spans)
+        assert spans["fallback.pipelines"].attributes["http.response.status_code"] == 503
+        assert spans["ollama.chat"].attributes["gen_ai.usage.output_tokens"] == 40
+        assert spans["ollama.chat"].attributes["ollama.tokens_per_second"] == 20.0
+        assert spans["ollama.chat"].parent.span_id == spans["fallback.direct_ollama"].context.span_id
+
+        # Trace context is propagated to each backend
+        for call in mock_post.call_args_list:
+            assert "traceparent" in call.kwargs["headers"]
+
+    @patch("main_app.requests.post")
+    def test_streamed_chat_spans_stay_in_request_trace(self, mock_post, span_exporter):
+        interface, exporter = span_exporter
+        interface.service_health_failure = False
+        upstream = MagicMock(status_code=200)
+        upstream.__enter__.return_value = upstream
+        upstream.iter_lines.return_value = [
+            b'{"message": {"content": "blue"}, "done": false}',
+            b'{"message": {"content": ""}, "done": true, "eval_count": 1}',
+        ]
+        mock_post.return_value = upstream
+
+        client = main_app.ObservableAPIServer(interface).app.test_client()
+        response = client.post("/api/chat", json={"message": "sky?", "stream": True})
+        assert len(response.get_data(as_text=True).splitlines()) == 2
+
+        spans = {span.name: span for span in exporter.get_finished_spans()}
+        server, ollama = spans["POST /api/chat"], spans["ollama.chat"]
+        assert ollama.context.trace_id == server.context.trace_id
+        assert ollama.parent.span_id == server.context.span_id
+
+
+class TestLoggingPipeline:
+    def make_record(self, level=main_app.logging.INFO, msg="hot path %s", args=("x",), lineno=10):
+        return main_app.logging.LogRecord("test", level, __file__, lineno, msg, args, None)
+
+    def test_rate_limit_per_call_site(self):
+        log_filter = main_app.SampledLogFilter(rate_per_second=2)
+        results = [log_filter.filter(self.make_record()) for _ in range(5)]
+        assert results == [True, True, False, False, False]
+        # A different call site has its own bucket, warnings always pass
+        assert log_filter.filter(self.make_record(lineno=11))
+        assert log_filter.filter(self.make_record(level=main_app.logging.WARNING))
+
+    def test_suppressed_count_reported(self):
+        log_filter = main_app.SampledLogFilter(rate_per_second=1)
+        log_filter.filter(self.make_record())
+        log_filter.filter(self.make_record())
+        with patch.object(main_app.time, "monotonic", return_value=main_app.time.monotonic() + 5):
+            record = self.make_record()
+            assert log_filter.filter(record)
+        assert record.suppressed == 1
+
+    def test_queue_handler_drops_without_blocking_and_defers_formatting(self):
+        handler = main_app.NonBlockingQueueHandler(main_app.queue.Queue(maxsize=1))
+        first = self.make_record()
+        handler.emit(first)
+        handler.emit(self.make_record())
+        assert handler.dropped == 1
+        queued = handler.queue.get_nowait()
+        assert queued is first and queued.args == ("x",)
+
+    def test_json_formatter(self):
+        record = self.make_record()
+        record.suppressed = 3
+        entry = main_app.json.loads(main_app.JsonLogFormatter().format(record))
+        assert entry["message"] == "hot path x"
+        assert entry["level"] == "INFO"
+        assert entry["suppressed"] == 3
@@ -0,0 +1,168 @@
+"""
+Tests for the Open WebUI response-level pipeline.
+"""
+
+import importlib.util
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+if "response_level_pipeline" not in sys.modules:
+    spec = importlib.util.spec_from_file_location(
+        "response_level_pipeline",
+        Path(__file__).parent.parent.parent / "pipelines" / "response_level_pipeline.py",
+    )
+    pipeline_module = importlib.util.module_from_spec(spec)
+    sys.modules["response_level_pipeline"] = pipeline_module
+    spec.loader.exec_module(pipeline_module)
+pipeline_module = sys.modules["response_level_pipeline"]
+
+if "main_app" not in sys.modules:
+    spec = importlib.util.spec_from_file_location(
+        "main_app", Path(__file__).parent.parent / "python-ollama-open-webui.py"
+    )
+    main_app = importlib.util.module_from_spec(spec)
+    sys.modules["main_app"] = main_app
+    spec.loader.exec_module(main_app)
+main_app = sys.modules["main_app"]
+
+
+@pytest.fixture
+def config_file(temp_dir):
+    path = os.path.join(temp_dir, "MODEL_CONFIG")
+    with open(path, "w") as f:
+        f.write("models-latest")
+    return path
+
+
+@pytest.fixture
+def pipeline(config_file):
+    with patch.dict(os.environ, {"MODEL_CONFIG_FILE": config_file, "MODEL_CONFIG_REFRESH_SECONDS": "3600"}):
+        return pipeline_module.Pipeline()
+
+
+class TestModelConfig:
+    def test_per_message_check_does_not_spawn_kubectl(self, pipeline):
+        with patch.object(pipeline_module.subprocess, "run") as run:
+            for _ in range(10):
+                assert pipeline._check_model_config() == (True, "models-latest")
+        run.assert_not_called()
+
+    def test_mounted_file_change_is_picked_up(self, pipeline, config_file):
+        with open(config_file, "w") as f:
+            f.write("models_latest")
+        os.utime(config_file, (1, 1))
+        pipeline.refresh_model_config()
+        assert pipeline._check_model_config() == (False, "models_latest")
+        assert "BROKEN" in pipeline.pipe("hi", "response_level", [], {})
+
+
+class TestStreaming:
+    def test_stream_yields_chunks_with_level_modifier(self, pipeline):
+        pipeline.session = MagicMock()
+        mock_post = pipeline.session.post
+        upstream = mock_post.return_value.__enter__.return_value
+        upstream.iter_lines.return_value = iter([
+            b'{"message": {"content": "Light"}, "done": false}',
+            b"",
+            b'{"message": {"content": " scatters"}, "done": false}',
+            b'{"message": {"content": ""}, "done": true, "prompt_eval_count": 12, "prompt_eval_duration": 3000000}',
+        ])
+        pipeline.current_level_index = 1  # Kid Mode
+
+        result = pipeline.pipe("Why is the sky blue?", "response_level",
+                               [{"role": "user", "content": "Why is the sky blue?"}], {"stream": True})
+
+        assert not isinstance(result, str)
+        assert list(result) == ["Light", " scatters"]
+        sent = mock_post.call_args.kwargs["json"]
+        assert sent["stream"] is True
+        assert sent["messages"][0] == {"role": "system", "content": pipeline.levels[1]["modifier"]}
+        kid_mode = pipeline.get_status()["metrics"]["Kid Mode"]
+        assert kid_mode["requests"] == 1
+        assert (kid_mode["avg_prompt_eval_count"], kid_mode["avg_prompt_eval_ms"]) == (12, 3.0)
+
+
+class TestLevelModifiers:
+    def test_system_prefix_is_identical_across_conversations(self, pipeline):
+        level = pipeline.levels[4]
+        first = pipeline.apply_level(level, "a", [{"role": "user", "content": "a"}])
+        second = pipeline.apply_level(level, "b", [
+            {"role": "system", "content": "Be brief."},
+            {"role": "user", "content": "b"},
+        ])
+        assert first[0] == {"role": "system", "content": level["modifier"]}
+        assert second[0]["content"].startswith(level["modifier"])
+        assert first[1] == {"role": "user", "content": "a"}
+
+    def test_append_placement_keeps_legacy_behaviour(self, pipeline):
+        pipeline.modifier_placement = "append"
+        level = pipeline.levels[1]
+        assert pipeline.apply_level(level, "hi", []) == [{"role": "user", "content": f"hi {level['modifier']}"}]
+
+
+class TestConcurrency:
+    def test_concurrent_requests_get_distinct_levels(self, pipeline):
+        pipeline.session = MagicMock()
+        pipeline.session.post.return_value.json.return_value = {"message": {"content": "ok"}}
+        caller_messages = [{"role": "user", "content": "Why?"}]
+        count = len(pipeline.levels) * 20
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda _: pipeline.pipe("Why?", "response_level", caller_messages, {}), range(count)))
+
+        metrics = pipeline.get_status()["metrics"]
+        assert [m["requests"] for m in metrics.values()] == [20] * len(pipeline.levels)
+        assert pipeline.current_level_index == 0
+        assert caller_messages == [{"role": "user", "content": "Why?"}]
+
+
+class TestModelRouting:
+    def routed_pipeline(self, config_file, routes):
+        env = {"MODEL_CONFIG_FILE": config_file, "LEVEL_MODEL_ROUTES": routes}
+        with patch.dict(os.environ, env):
+            pipeline = pipeline_module.Pipeline()
+        pipeline.session = MagicMock()
+        pipeline.session.get.return_value.json.return_value = {
+            "models": [{"name": "tinyllama:latest"}, {"name": "llama3.2:3b"}]
+        }
+        return pipeline
+
+    def test_levels_route_to_available_models(self, config_file):
+        pipeline = self.routed_pipeline(
+            config_file, '{"Scientific": "llama3.2:3b", "Kid Mode": "missing:7b", "Nope": "x"}'
+        )
+        assert pipeline.model_routes == {"Scientific": "llama3.2:3b", "Kid Mode": "missing:7b"}
+        assert pipeline.resolve_model("Scientific", "response_level") == "llama3.2:3b"
+        assert pipeline.resolve_model("Kid Mode", "response_level") == "tinyllama:latest"
+        assert pipeline.resolve_model("Default", "llama3.2:3b") == "llama3.2:3b"
+        # /api/tags is fetched once and cached
+        assert pipeline.session.get.call_count == 1
+
+    def test_pipe_sends_routed_model(self, config_file):
+        pipeline = self.routed_pipeline(config_file, '{"Default": "llama3.2:3b"}')
+        pipeline.session.post.return_value.json.return_value = {"message": {"content": "ok"}}
+        pipeline.pipe("hi", "response_level", [{"role": "user", "content": "hi"}], {})
+        assert pipeline.session.post.call_args.kwargs["json"]["model"] == "llama3.2:3b"
+
+
+class TestAllLevels:
+    def test_app_level_list_matches_pipeline(self, pipeline):
+        app_levels = [level["name"].split(" ", 1)[1] for level in main_app.PIPELINE_LEVELS]
+        assert app_levels == [level["name"] for level in pipeline.levels]
+
+    def test_runs_every_level_without_advancing_cycle(self, pipeline):
+        pipeline.session = MagicMock()
+        pipeline.session.post.return_value.json.return_value = {"message": {"content": "answer"}}
+
+        result = json.loads(pipeline.pipe("Why?", "response_level", [], {"all_levels": True}))
+
+        assert [r["level"] for r in result["results"]] == [level["name"] for level in pipeline.levels]
+        assert all(r["ok"] and r["response"] == "answer" for r in result["results"])
+        assert pipeline.session.post.call_count == len(pipeline.levels)
+        assert pipeline.current_level_index == 0
@@ -1,4 +1,4 @@
-import { useEffect, useCallback } from 'react'
+import { useEffect, useCallback, useRef } from 'react'
 import { useAppStore } from '../store/useAppStore'
 // Inline utils to avoid module resolution issues
 async function apiRequest<T>(endpoint: string, options: RequestInit = {}, retries = 2): Promise<T> {
@@ -35,12 +35,70 @@ function debounce<T extends (...args: any[]) => void>(func: T, wait: number): (.
   };
 }
 
+// One EventSource shared by every hook; polling hooks skip their poll while it is open
+let sharedEvents: EventSource | null = null
+let sharedEventsUsers = 0
+
+function subscribeToEvents(event: string, handler: (data: any) => void): () => void {
+  if (typeof EventSource === 'undefined') {
+    return () => {}
+  }
+  if (!sharedEvents) {
+    const baseUrl = process.env.NODE_ENV === 'development' ? 'http://localhost:8080' : '';
+    sharedEvents = new EventSource(`${baseUrl}/api/events`)
+  }
+  const source = sharedEvents
+  const listener = (e: MessageEvent) => handler(JSON.parse(e.data))
+  source.addEventListener(event, listener as EventListener)
+  sharedEventsUsers++
+
+  return () => {
+    source.removeEventListener(event, listener as EventListener)
+    sharedEventsUsers--
+    if (sharedEventsUsers === 0 && sharedEvents === source) {
+      source.close()
+      sharedEvents = null
+    }
+  }
+}
+
+function eventsConnected(): boolean {
+  return sharedEvents !== null && sharedEvents.readyState === EventSource.OPEN
+}
+
+function toProvider(name: string, provider: any) {
+  return {
+    name,
+    status: provider.status as 'online' | 'offline' | 'warning' | 'unknown',
+    responseTime: provider.response_time,
+    country: provider.country,
+    flag: provider.flag,
+  }
+}
+
 export const useProviderStatus = () => {
   const { setProviders, setConnected, setLastUpdate } = useAppStore()
+  const etagRef = useRef<string | null>(null)
 
   const fetchProviderStatus = useCallback(async () => {
     try {
-      const response = await apiRequest<{
+      const baseUrl = process.env.NODE_ENV === 'development' ? 'http://localhost:8080' : '';
+      const res = await fetch(`${baseUrl}/api/status`, {
+        headers: etagRef.current ? { 'If-None-Match': etagRef.current } : {},
+      })
+
+      // Providers unchanged since the last poll
+      if (res.status === 304) {
+        setConnected(true)
+        setLastUpdate(new Date())
+        return
+      }
+      if (!res.ok) {
+        throw new Error(`API request failed: ${res.status} ${res.statusText}`)
+      }
+      etagRef.current = res.headers.get('ETag')
+
+      const response: {
         providers: Record<string, {
           status: string
           response_time: string | number
@@ -48,18 +106,12 @@ export const useProviderStatus = () => {
           flag: string
         }>
         timestamp: number
-      }>('/api/status')
+      } = await res.json()
 
       // Transform the response to match our store interface
       const transformedProviders = Object.entries(response.providers).reduce(
         (acc, [name, provider]: [string, any]) => {
-          acc[name] = {
-            name,
-            status: provider.status as 'online' | 'offline' | 'warning' | 'unknown',
-            responseTime: provider.response_time,
-            country: provider.country,
-            flag: provider.flag,
-          }
+          acc[name] = toProvider(name, provider)
           return acc
         },
         {} as Record<string, any>
@@ -81,11 +133,32 @@ export const useProviderStatus = () => {
     // Initial fetch
     fetchProviderStatus()
 
-    // Set up polling every 10 seconds
-    const interval = setInterval(debouncedFetch, 10000)
+    // Pushed deltas carry only the providers that changed; the replay on connect is a full snapshot
+    const unsubscribe = subscribeToEvents('provider_status', (update) => {
+      const { providers, setProviders } = useAppStore.getState()
+      const next = update.full ? {} : { ...providers }
+      Object.entries(update.providers).forEach(([name, provider]: [string, any]) => {
+        if (provider) {
+          next[name] = toProvider(name, provider)
+        } else {
+          delete next[name]
+        }
+      })
+      setProviders(next)
+      setConnected(true)
+      setLastUpdate(new Date())
+    })
+
+    // Poll every 10 seconds only while the push channel is down
+    const interval = setInterval(() => {
+      if (!eventsConnected()) debouncedFetch()
+    }, 10000)
 
-    return () => clearInterval(interval)
-  }, [fetchProviderStatus, debouncedFetch])
+    return () => {
+      clearInterval(interval)
+      unsubscribe()
+    }
+  }, [fetchProviderStatus, debouncedFetch, setConnected, setLastUpdate])
 
   return { fetchProviderStatus }
 }
@@ -191,11 +264,20 @@ export const useDemoState = () => {
     // Initial fetch
     checkDemoState()
 
-    // Set up polling every 5 seconds for demo state
-    const interval = setInterval(checkDemoState, 5000)
+    const unsubscribe = subscribeToEvents('demo_state', (state) => {
+      setAvailabilityDemo(state.availability_demo.is_active, state.availability_demo.config_value)
+    })
 
-    return () => clearInterval(interval)
-  }, [checkDemoState])
+    // Poll every 5 seconds only while the push channel is down
+    const interval = setInterval(() => {
+      if (!eventsConnected()) checkDemoState()
+    }, 5000)
+
+    return () => {
+      clearInterval(interval)
+      unsubscribe()
+    }
+  }, [checkDemoState, setAvailabilityDemo])
 
   return { checkDemoState }
 }
\ No newline at end of file
@@ -5,13 +5,24 @@ Generates predictable HTTP traffic patterns for SUSE Observability monitoring.
 Replaces the Gradio automation functionality with dedicated external load generation.
 """
 
+import asyncio
+import copy
+import csv
 import json
+import math
 import logging
 import os
 import random
+import signal
+import socket
+import threading
 import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from typing import List, Dict
 import requests
+from requests.adapters import HTTPAdapter
 
 # Configure logging
 logging.basicConfig(
@@ -22,6 +33,420 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+# Endpoint names (as used in ENDPOINT_WEIGHTS) and the paths they hit
+ENDPOINT_PATHS = {"health": "/health", "chat": "/api/chat", "metrics": "/api/metrics"}
+REPORT_PERCENTILES = (50, 90, 99, 99.9)
+# Per-request streaming measurements (STREAM_CHAT=true) and their report units
+STREAMING_METRICS = {"ttft": "ms", "inter_token": "ms", "tokens_per_second": "tps"}
+
+
+class LatencyHistogram:
+    """Fixed-memory latency histogram with log-linear (HDR-style) buckets.
+
+    Values are stored in microseconds. Each power-of-two range is split into
+    2**(sub_bucket_bits - 1) linear sub-buckets, so the relative error stays
+    below 1 / 2**(sub_bucket_bits - 1) (~1.6% with the default of 7 bits)
+    across the whole range up to max_ms.
+    """
+
+    def __init__(self, max_ms: float = 3_600_000, sub_bucket_bits: int = 7):
+        self.sub_bucket_bits = sub_bucket_bits
+        self.sub_bucket_count = 1 << sub_bucket_bits
+        self.half_count = self.sub_bucket_count // 2
+        self.max_us = int(max_ms * 1000)
+        self.counts = array("Q", [0] * (self._index(self.max_us) + 1))
+        self.total_count = 0
+        self.min_us = None
+        self.max_recorded_us = 0
+        self.sum_us = 0
+
+    def _index(self, value_us: int) -> int:
+        if value_us < self.sub_bucket_count:
+            return value_us
+        shift = value_us.bit_length() - self.sub_bucket_bits
+        return self.sub_bucket_count + (shift - 1) * self.half_count + (value_us >> shift) - self.half_count
+
+    def _highest_equivalent(self, index: int) -> int:
+        """Largest microsecond value that lands in the given bucket."""
+        if index < self.sub_bucket_count:
+            return index
+        shift = (index - self.sub_bucket_count) // self.half_count + 1
+        sub = (index - self.sub_bucket_count) % self.half_count + self.half_count
+        return ((sub + 1) << shift) - 1
+
+    def record(self, value_ms: float):
+        value_us = min(max(int(value_ms * 1000), 0), self.max_us)
+        self.counts[self._index(value_us)] += 1
+        self.total_count += 1
+        self.sum_us += value_us
+        self.min_us = value_us if self.min_us is None else min(self.min_us, value_us)
+        self.max_recorded_us = max(self.max_recorded_us, value_us)
+
+    def percentile(self, percentile: float) -> float:
+        """Value in ms at or below which the given percentage of samples fall."""
+        if not self.total_count:
+            return 0.0
+        target = max(1, math.ceil(percentile / 100 * self.total_count))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(self._highest_equivalent(index), self.max_recorded_us) / 1000
+        return self.max_recorded_us / 1000
+
+    def merge(self, other: "LatencyHistogram"):
+        """Add another histogram's samples (e.g. from a worker) into this one."""
+        if (other.sub_bucket_bits, other.max_us) != (self.sub_bucket_bits, self.max_us):
+            raise ValueError("cannot merge histograms with different bucket layouts")
+        for index, count in enumerate(other.counts):
+            if count:
+                self.counts[index] += count
+        self.total_count += other.total_count
+        self.sum_us += other.sum_us
+        self.max_recorded_us = max(self.max_recorded_us, other.max_recorded_us)
+        if other.min_us is not None:
+            self.min_us = other.min_us if self.min_us is None else min(self.min_us, other.min_us)
+
+    def to_dict(self) -> Dict:
+        """Compact JSON form: only non-empty buckets are sent."""
+        return {
+            "sub_bucket_bits": self.sub_bucket_bits,
+            "max_ms": self.max_us / 1000,
+            "counts": {str(i): c for i, c in enumerate(self.counts) if c},
+            "total_count": self.total_count,
+            "min_us": self.min_us,
+            "max_recorded_us": self.max_recorded_us,
+            "sum_us": self.sum_us,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "LatencyHistogram":
+        histogram = cls(max_ms=data["max_ms"], sub_bucket_bits=data["sub_bucket_bits"])
+        for index, count in data["counts"].items():
+            histogram.counts[int(index)] = count
+        histogram.total_count = data["total_count"]
+        histogram.min_us = data["min_us"]
+        histogram.max_recorded_us = data["max_recorded_us"]
+        histogram.sum_us = data["sum_us"]
+        return histogram
+
+    def summary(self, unit: str = "ms") -> Dict:
+        if not self.total_count:
+            return {"count": 0}
+        summary = {
+            "count": self.total_count,
+            f"min_{unit}": round(self.min_us / 1000, 3),
+            f"mean_{unit}": round(self.sum_us / self.total_count / 1000, 3),
+            f"max_{unit}": round(self.max_recorded_us / 1000, 3),
+        }
+        for p in REPORT_PERCENTILES:
+            summary[f"p{p:g}_{unit}"] = round(self.percentile(p), 3)
+        return summary
+
+
+class LoadStats:
+    """Per-endpoint latency histograms, throughput and error breakdowns for one run."""
+
+    CSV_FIELDS = ["phase", "endpoint", "count", "errors", "throughput_rps", "min_ms", "mean_ms"] + \
+        [f"p{p:g}_ms" for p in REPORT_PERCENTILES] + ["max_ms"] + \
+        ["ttft_p50_ms", "ttft_p99_ms", "inter_token_p50_ms", "inter_token_p99_ms", "tokens_per_second_p50_tps"]
+
+    def __init__(self, name: str = "all"):
+        self.name = name
+        self.started = time.monotonic()
+        self.finished = None
+        self.started_at = time.strftime("%Y-%m-%dT%H:%M:%S")
+        self.sent = 0
+        self.dropped = 0
+        self.endpoints = {}
+
+    def _endpoint(self, path: str) -> Dict:
+        if path not in self.endpoints:
+            self.endpoints[path] = {"histogram": LatencyHistogram(), "errors": {}, "streaming": {}}
+        return self.endpoints[path]
+
+    @staticmethod
+    def _streaming_histogram(endpoint: Dict, metric: str) -> LatencyHistogram:
+        if metric not in endpoint["streaming"]:
+            endpoint["streaming"][metric] = LatencyHistogram()
+        return endpoint["streaming"][metric]
+
+    @staticmethod
+    def classify_error(result: Dict) -> str:
+        if result.get("status_code"):
+            return f"http_{result['status_code']}" if result["status_code"] != 200 else "invalid_response"
+        return result.get("error_type", "error")
+
+    def record(self, path: str, result: Dict, latency_ms: float):
+        endpoint = self._endpoint(path)
+        endpoint["histogram"].record(latency_ms)
+        if result.get("ttft_ms") is not None:
+            self._streaming_histogram(endpoint, "ttft").record(result["ttft_ms"])
+            inter_token = self._streaming_histogram(endpoint, "inter_token")
+            for gap_ms in result.get("inter_token_ms", []):
+                inter_token.record(gap_ms)
+            if result.get("tokens_per_second"):
+                self._streaming_histogram(endpoint, "tokens_per_second").record(result["tokens_per_second"])
+        if not result.get("success"):
+            error = self.classify_error(result)
+            endpoint["errors"][error] = endpoint["errors"].get(error, 0) + 1
+
+    def record_dropped(self):
+        self.dropped += 1
+
+    def finish(self):
+        """Freeze the elapsed time used for throughput (end of a phase)."""
+        self.finished = time.monotonic()
+
+    def elapsed(self) -> float:
+        return (self.finished if self.finished is not None else time.monotonic()) - self.started
+
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "started_at": self.started_at,
+            "elapsed_seconds": self.elapsed(),
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "endpoints": {
+                path: {
+                    "histogram": e["histogram"].to_dict(),
+                    "errors": dict(e["errors"]),
+                    "streaming": {metric: h.to_dict() for metric, h in e["streaming"].items()},
+                }
+                for path, e in self.endpoints.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "LoadStats":
+        stats = cls(data["name"])
+        stats.started_at = data["started_at"]
+        stats.started, stats.finished = 0.0, data["elapsed_seconds"]
+        stats.sent = data["sent"]
+        stats.dropped = data["dropped"]
+        for path, e in data["endpoints"].items():
+            stats.endpoints[path] = {
+                "histogram": LatencyHistogram.from_dict(e["histogram"]),
+                "errors": dict(e["errors"]),
+                "streaming": {metric: LatencyHistogram.from_dict(h) for metric, h in e.get("streaming", {}).items()},
+            }
+        return stats
+
+    def merge(self, other: "LoadStats"):
+        """Combine results from concurrent runs; throughput uses the longest elapsed time."""
+        elapsed = max(self.elapsed(), other.elapsed())
+        self.started, self.finished = 0.0, elapsed
+        self.started_at = min(self.started_at, other.started_at)
+        self.sent += other.sent
+        self.dropped += other.dropped
+        for path, e in other.endpoints.items():
+            endpoint = self._endpoint(path)
+            endpoint["histogram"].merge(e["histogram"])
+            for metric, histogram in e["streaming"].items():
+                self._streaming_histogram(endpoint, metric).merge(histogram)
+            for error, count in e["errors"].items():
+                endpoint["errors"][error] = endpoint["errors"].get(error, 0) + count
+
+    def snapshot(self) -> Dict:
+        elapsed = self.elapsed()
+        endpoints = {}
+        for path, endpoint in sorted(self.endpoints.items()):
+            summary = endpoint["histogram"].summary()
+            summary["errors"] = sum(endpoint["errors"].values())
+            summary["error_breakdown"] = dict(endpoint["errors"])
+            summary["throughput_rps"] = round(summary["count"] / elapsed, 3) if elapsed > 0 else 0.0
+            for metric, histogram in sorted(endpoint["streaming"].items()):
+                summary[metric] = histogram.summary(STREAMING_METRICS[metric])
+            endpoints[path] = summary
+        completed = sum(e["count"] for e in endpoints.values())
+        return {
+            "name": self.name,
+            "started_at": self.started_at,
+            "elapsed_seconds": round(elapsed, 3),
+            "sent": self.sent,
+            "completed": completed,
+            "errors": sum(e["errors"] for e in endpoints.values()),
+            "dropped": self.dropped,
+            "throughput_rps": round(completed / elapsed, 3) if elapsed > 0 else 0.0,
+            "endpoints": endpoints,
+        }
+
+    def log_summary(self):
+        snapshot = self.snapshot()
+        logger.info(
+            f"Summary [{self.name}] after {snapshot['elapsed_seconds']:.0f}s: completed {snapshot['completed']} "
+            f"({snapshot['throughput_rps']:.2f} req/s), errors {snapshot['errors']}, dropped {snapshot['dropped']}"
+        )
+        for path, e in snapshot["endpoints"].items():
+            percentiles = " ".join(f"p{p:g}={e[f'p{p:g}_ms']:.0f}ms" for p in REPORT_PERCENTILES)
+            errors = f" {e['error_breakdown']}" if e["errors"] else ""
+            logger.info(
+                f"  {path}: n={e['count']} {e['throughput_rps']:.2f} req/s {percentiles} "
+                f"max={e['max_ms']:.0f}ms errors={e['errors']}{errors}"
+            )
+            if e.get("ttft", {}).get("count"):
+                itl = e.get("inter_token", {})
+                tps = e.get("tokens_per_second", {})
+                logger.info(
+                    f"    streaming: ttft p50={e['ttft']['p50_ms']:.0f}ms p99={e['ttft']['p99_ms']:.0f}ms, "
+                    f"inter-token p50={itl.get('p50_ms', 0):.1f}ms p99={itl.get('p99_ms', 0):.1f}ms, "
+                    f"tokens/s p50={tps.get('p50_tps', 0):.1f}"
+                )
+        return snapshot
+
+    @staticmethod
+    def csv_rows(snapshot: Dict) -> List[Dict]:
+        rows = []
+        for path, summary in snapshot["endpoints"].items():
+            row = dict(summary, phase=snapshot["name"], endpoint=path)
+            for metric in STREAMING_METRICS:
+                for key, value in summary.get(metric, {}).items():
+                    row[f"{metric}_{key}"] = value
+            rows.append(row)
+        return rows
+
+
+def write_report_files(path_prefix: str, report: Dict, rows: List[Dict]):
+    """Write <path_prefix>.json (full report) and <path_prefix>.csv (one row per phase/endpoint)."""
+    directory = os.path.dirname(path_prefix)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(f"{path_prefix}.json", "w") as f:
+        json.dump(report, f, indent=2)
+    with open(f"{path_prefix}.csv", "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=LoadStats.CSV_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+class LoadPhase:
+    """One phase of a load scenario.
+
+    A phase either drives an open-loop arrival rate (``rps``, ramped linearly
+    from ``start_rps`` when given) or runs ``users`` closed-loop virtual users
+    that wait ``think_time_seconds`` (a number or a ``[min, max]`` range)
+    between requests. ``endpoints`` weights the request mix and ``prompts`` is
+    either a list (uniform) or a ``{prompt: weight}`` mapping.
+    """
+
+    def __init__(self, name: str, duration_seconds: float, rps: float = None, start_rps: float = None,
+                 users: int = None, think_time_seconds=0, endpoints: Dict[str, float] = None,
+                 prompts=None, arrival: str = "poisson"):
+        if (rps is None) == (users is None):
+            raise ValueError(f"phase '{name}' needs exactly one of 'rps' or 'users'")
+        if rps is not None and max(rps, start_rps or 0) <= 0:
+            raise ValueError(f"phase '{name}' needs a positive rate")
+        if users is not None and users < 1:
+            raise ValueError(f"phase '{name}' needs at least one user")
+        if arrival not in ("poisson", "constant"):
+            raise ValueError(f"phase '{name}' has unknown arrival distribution '{arrival}'")
+        self.name = name
+        self.duration_seconds = float(duration_seconds)
+        self.rps = rps
+        self.start_rps = rps if start_rps is None else start_rps
+        self.users = users
+        self.think_time_seconds = think_time_seconds
+        self.endpoints = validate_endpoint_weights(endpoints or {"chat": 1.0})
+        self.prompts = prompts
+        self.arrival = arrival
+
+    @classmethod
+    def from_dict(cls, data: Dict, defaults: Dict = None) -> "LoadPhase":
+        merged = dict(defaults or {}, **data)
+        if "duration_seconds" not in merged or float(merged["duration_seconds"]) <= 0:
+            raise ValueError(f"phase '{merged.get('name')}' needs a positive duration_seconds")
+        known = ("name", "duration_seconds", "rps", "start_rps", "users", "think_time_seconds",
+                 "endpoints", "prompts", "arrival")
+        unknown = set(merged) - set(known)
+        if unknown:
+            raise ValueError(f"phase '{merged.get('name')}' has unknown keys {sorted(unknown)}")
+        merged.setdefault("name", "phase")
+        return cls(**merged)
+
+    @property
+    def is_open(self) -> bool:
+        return self.rps is not None
+
+    def rate_at(self, elapsed: float) -> float:
+        if self.duration_seconds <= 0 or self.start_rps == self.rps:
+            return self.rps
+        progress = min(max(elapsed / self.duration_seconds, 0.0), 1.0)
+        return self.start_rps + (self.rps - self.start_rps) * progress
+
+    def next_arrival(self, elapsed: float) -> float:
+        """Offset (from phase start) of the next arrival after ``elapsed``."""
+        peak = max(self.rps, self.start_rps)
+        if self.arrival == "constant":
+            return elapsed + 1.0 / max(self.rate_at(elapsed), peak / 100)
+        # Thinning: draw at the peak rate and keep each arrival with probability rate(t) / peak
+        t = elapsed
+        while True:
+            t += random.expovariate(peak)
+            if (self.duration_seconds > 0 and t >= self.duration_seconds) or random.random() * peak <= self.rate_at(t):
+                return t
+
+    def pick_endpoint(self) -> str:
+        endpoints = list(self.endpoints)
+        return random.choices(endpoints, weights=[self.endpoints[e] for e in endpoints])[0]
+
+    def pick_prompt(self):
+        """A prompt from the phase distribution, or None to use the simulator's rotation."""
+        if not self.prompts:
+            return None
+        if isinstance(self.prompts, dict):
+            prompts = list(self.prompts)
+            return random.choices(prompts, weights=[float(self.prompts[p]) for p in prompts])[0]
+        return random.choice(self.prompts)
+
+    def think_time(self) -> float:
+        if isinstance(self.think_time_seconds, (list, tuple)):
+            return random.uniform(*self.think_time_seconds)
+        return float(self.think_time_seconds)
+
+    def scaled(self, worker_index: int, worker_count: int) -> "LoadPhase":
+        """This worker's share of the phase: rates are divided, users are dealt out round-robin."""
+        if worker_count <= 1:
+            return self
+        phase = copy.copy(self)
+        if self.is_open:
+            phase.rps = self.rps / worker_count
+            phase.start_rps = self.start_rps / worker_count
+        else:
+            phase.users = self.users // worker_count + (1 if worker_index < self.users % worker_count else 0)
+        return phase
+
+
+def read_scenario_source():
+    """Raw scenario JSON from SCENARIO_FILE or inline LOAD_SCENARIO, or None if neither is set."""
+    scenario_file = os.getenv("SCENARIO_FILE")
+    if scenario_file:
+        with open(scenario_file) as f:
+            return json.load(f)
+    scenario_env = os.getenv("LOAD_SCENARIO")
+    return json.loads(scenario_env) if scenario_env else None
+
+
+def parse_scenario(data: Dict, worker_index: int = 0, worker_count: int = 1) -> Dict:
+    """Validate a scenario and return this worker's share of each phase."""
+    defaults = data.get("defaults", {})
+    phases = [LoadPhase.from_dict(phase, defaults).scaled(worker_index, worker_count) for phase in data.get("phases", [])]
+    if not phases:
+        raise ValueError("scenario has no phases")
+    return {"name": data.get("name", "scenario"), "phases": phases}
+
+
+def validate_endpoint_weights(weights: Dict) -> Dict[str, float]:
+    """Normalise an endpoint mix, rejecting unknown endpoint names."""
+    weights = {k: float(v) for k, v in weights.items() if float(v) > 0}
+    unknown = set(weights) - set(ENDPOINT_PATHS)
+    if unknown:
+        raise ValueError(f"unknown endpoints {sorted(unknown)}")
+    if not weights:
+        raise ValueError("endpoint mix has no positive weights")
+    return weights
+
+
 class LoadSimulator:
     """HTTP load simulator for AI Compare observability."""
     
@@ -34,6 +459,46 @@ class LoadSimulator:
         # HTTP timeouts
         self.request_timeout = int(os.getenv("REQUEST_TIMEOUT", "30"))
         
+        # Streaming chat: measure time-to-first-token and inter-token latency
+        self.stream_chat = os.getenv("STREAM_CHAT", "false").lower() == "true"
+        self.chat_model = os.getenv("CHAT_MODEL", "tinyllama:latest")
+        
+        # Open-loop mode: fixed arrival rate independent of target latency
+        self.mode = os.getenv("LOAD_MODE", "closed").lower()  # "closed" or "open"
+        self.target_rps = float(os.getenv("TARGET_RPS", "1.0"))
+        self.arrival_distribution = os.getenv("ARRIVAL_DISTRIBUTION", "poisson").lower()  # "poisson" or "constant"
+        self.max_concurrency = int(os.getenv("MAX_CONCURRENCY", "16"))
+        self.max_pending = int(os.getenv("MAX_PENDING", str(self.max_concurrency * 10)))
+        self.duration_seconds = float(os.getenv("DURATION_SECONDS", "0"))  # 0 = run forever
+        self.endpoint_weights = self._load_endpoint_weights()
+        
+        # Scenario mode: phased load profile from SCENARIO_FILE or inline LOAD_SCENARIO JSON
+        self.scenario = self._load_scenario()
+        if self.scenario:
+            self.mode = "scenario"
+        
+        # Replay mode: re-issue a captured traffic file (TRAFFIC_CAPTURE_PATH on the app)
+        self.replay_file = os.getenv("REPLAY_FILE")
+        replay_speed = os.getenv("REPLAY_SPEED", "1").lower()
+        self.replay_speed = None if replay_speed == "max" else float(replay_speed)  # None = as fast as possible
+        if self.replay_file:
+            self.mode = "replay"
+        
+        # Distributed mode: LOAD_ROLE=worker pulls its scenario share from COORDINATOR_URL
+        self.role = os.getenv("LOAD_ROLE", "standalone").lower()
+        self.coordinator_url = os.getenv("COORDINATOR_URL", "http://ai-compare-load-coordinator:8089")
+        self.worker_id = os.getenv("WORKER_ID") or f"{socket.gethostname()}-{os.getpid()}"
+        
+        # Latency reporting
+        self.stats = LoadStats()
+        self.phase_stats = []
+        self.report_interval = float(os.getenv("REPORT_INTERVAL_SECONDS", "60"))
+        self.report_path = os.getenv("REPORT_PATH", "/tmp/load-report")  # writes .json and .csv
+        
+        # Keep-alive connection pool sized for the concurrency cap
+        self.session = requests.Session()
+        self._configure_pool()
+        
         # Load simulation configuration
         self.prompts = self._load_prompts()
         self.current_prompt_index = 0
@@ -43,6 +508,47 @@ class LoadSimulator:
         logger.info(f"  Interval: {self.interval_seconds} seconds")
         logger.info(f"  Enabled: {self.enabled}")
         logger.info(f"  Prompts loaded: {len(self.prompts)}")
+        logger.info(f"  Mode: {self.mode}")
+        if self.stream_chat:
+            logger.info(f"  Streaming chat: ttft/inter-token measurement enabled ({self.chat_model})")
+        if self.scenario:
+            logger.info(f"  Scenario: {self.scenario['name']} ({len(self.scenario['phases'])} phases)")
+            for phase in self.scenario["phases"]:
+                load = f"{phase.start_rps}->{phase.rps} req/s" if phase.is_open else f"{phase.users} users"
+                logger.info(f"    {phase.name}: {phase.duration_seconds:.0f}s, {load}")
+        if self.replay_file:
+            logger.info(f"  Replay: {self.replay_file} at {f'{self.replay_speed:g}x' if self.replay_speed else 'max'} speed")
+        if self.mode == "open":
+            logger.info(f"  Target rate: {self.target_rps} req/s ({self.arrival_distribution} arrivals)")
+            logger.info(f"  Max concurrency: {self.max_concurrency}, max pending: {self.max_pending}")
+            logger.info(f"  Endpoint weights: {self.endpoint_weights}")
+    
+    def _load_endpoint_weights(self) -> Dict[str, float]:
+        """Load the open-loop endpoint mix from ENDPOINT_WEIGHTS (JSON) or use chat only."""
+        weights_env = os.getenv("ENDPOINT_WEIGHTS")
+        if weights_env:
+            try:
+                return validate_endpoint_weights(json.loads(weights_env))
+            except (ValueError, AttributeError) as e:
+                logger.warning(f"Failed to parse ENDPOINT_WEIGHTS: {e}")
+        return {"chat": 1.0}
+    
+    def _load_scenario(self):
+        """Load a phased scenario from SCENARIO_FILE (JSON) or LOAD_SCENARIO (inline JSON)."""
+        try:
+            data = read_scenario_source()
+            return parse_scenario(data) if data else None
+        except (OSError, ValueError, TypeError, AttributeError) as e:
+            logger.error(f"Failed to load load scenario: {e}")
+            return None
+    
+    def _configure_pool(self):
+        """Size the worker threads and keep-alive connection pool for the configured load."""
+        # Virtual users each hold a worker thread for their whole request
+        self.pool_size = max([self.max_concurrency] + [p.users or 0 for p in (self.scenario or {}).get("phases", [])])
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
     
     def _load_prompts(self) -> List[str]:
         """Load prompts from environment or use defaults."""
@@ -74,12 +580,15 @@ class LoadSimulator:
         self.current_prompt_index = (self.current_prompt_index + 1) % len(self.prompts)
         return prompt
     
-    def _send_chat_request(self, prompt: str) -> Dict:
-        """Send a chat request to the AI Compare API."""
+    def _send_chat_request(self, prompt: str, model: str = None, stream: bool = None) -> Dict:
+        """Send a chat request to the AI Compare API (``stream`` defaults to STREAM_CHAT)."""
         url = f"{self.target_url}/api/chat"
+        if self.stream_chat if stream is None else stream:
+            return self._send_streaming_chat_request(prompt, model)
+        
         payload = {
             "message": prompt,
-            "model": "tinyllama:latest"
+            "model": model or self.chat_model
         }
         
         headers = {
@@ -89,7 +598,7 @@ class LoadSimulator:
         
         try:
             logger.info(f"Sending chat request: '{prompt[:50]}...'")
-            response = requests.post(
+            response = self.session.post(
                 url, 
                 json=payload, 
                 headers=headers, 
@@ -123,6 +632,7 @@ class LoadSimulator:
                 "status_code": 0,
                 "success": False,
                 "error": f"Request timed out after {self.request_timeout}s",
+                "error_type": "timeout",
                 "prompt": prompt
             }
         except Exception as e:
@@ -131,15 +641,77 @@ class LoadSimulator:
                 "status_code": 0,
                 "success": False,
                 "error": str(e),
+                "error_type": type(e).__name__,
                 "prompt": prompt
             }
     
+    @staticmethod
+    def _stream_token(line: bytes):
+        """Extract (content, done) from an NDJSON (Ollama) or SSE (OpenAI) stream line."""
+        line = line.strip()
+        if line.startswith(b"data:"):
+            line = line[5:].strip()
+            if line == b"[DONE]":
+                return "", True
+        if not line:
+            return "", False
+        chunk = json.loads(line)
+        if "choices" in chunk:
+            choice = (chunk["choices"] or [{}])[0]
+            return choice.get("delta", {}).get("content") or "", choice.get("finish_reason") is not None
+        return chunk.get("message", {}).get("content") or chunk.get("response") or "", chunk.get("done", False)
+    
+    def _send_streaming_chat_request(self, prompt: str, model: str = None) -> Dict:
+        """Send a streamed chat request and time each token chunk as it arrives."""
+        url = f"{self.target_url}/api/chat"
+        payload = {"message": prompt, "model": model or self.chat_model, "stream": True}
+        headers = {"Content-Type": "application/json", "User-Agent": "LoadSimulator/1.0"}
+        
+        start = time.perf_counter()
+        try:
+            with self.session.post(url, json=payload, headers=headers, timeout=self.request_timeout, stream=True) as response:
+                result = {"status_code": response.status_code, "success": response.status_code == 200, "prompt": prompt}
+                if response.status_code != 200:
+                    result["error"] = f"HTTP {response.status_code}: {response.text[:200]}"
+                    logger.warning(f"Streaming chat request failed: {result['error']}")
+                    return result
+                
+                token_times = []
+                for line in response.iter_lines():
+                    content, done = self._stream_token(line)
+                    if content:
+                        token_times.append(time.perf_counter())
+                    if done:
+                        break
+            
+            result["response_time_ms"] = int((time.perf_counter() - start) * 1000)
+            result["tokens"] = len(token_times)
+            if token_times:
+                result["ttft_ms"] = (token_times[0] - start) * 1000
+                result["inter_token_ms"] = [(b - a) * 1000 for a, b in zip(token_times, token_times[1:])]
+                if len(token_times) > 1:
+                    result["tokens_per_second"] = (len(token_times) - 1) / (token_times[-1] - token_times[0])
+                logger.info(f"Streaming chat successful: ttft {result['ttft_ms']:.0f}ms, {len(token_times)} chunks")
+            else:
+                result["success"] = False
+                result["error"] = "Stream ended without tokens"
+                logger.warning("Streaming chat returned no tokens")
+            return result
+        
+        except requests.exceptions.Timeout:
+            logger.error(f"Streaming chat request timed out after {self.request_timeout}s")
+            return {"status_code": 0, "success": False, "error_type": "timeout",
+                    "error": f"Request timed out after {self.request_timeout}s", "prompt": prompt}
+        except (requests.exceptions.RequestException, ValueError) as e:
+            logger.error(f"Streaming chat request failed: {e}")
+            return {"status_code": 0, "success": False, "error_type": type(e).__name__, "error": str(e), "prompt": prompt}
+    
     def _send_health_check(self) -> Dict:
         """Send a health check request."""
         url = f"{self.target_url}/health"
         
         try:
-            response = requests.get(url, timeout=5)
+            response = self.session.get(url, timeout=5)
             result = {
                 "status_code": response.status_code,
                 "success": response.status_code == 200,
@@ -158,7 +730,8 @@ class LoadSimulator:
             return {
                 "status_code": 0,
                 "success": False,
-                "error": str(e)
+                "error": str(e),
+                "error_type": type(e).__name__
             }
     
     def _send_metrics_request(self) -> Dict:
@@ -166,7 +739,7 @@ class LoadSimulator:
         url = f"{self.target_url}/api/metrics"
         
         try:
-            response = requests.get(url, timeout=10)
+            response = self.session.get(url, timeout=10)
             result = {
                 "status_code": response.status_code,
                 "success": response.status_code == 200,
@@ -185,7 +758,8 @@ class LoadSimulator:
             return {
                 "status_code": 0,
                 "success": False,
-                "error": str(e)
+                "error": str(e),
+                "error_type": type(e).__name__
             }
     
     def run_load_cycle(self) -> Dict:
@@ -193,16 +767,15 @@ class LoadSimulator:
         cycle_start = time.time()
         
         # 1. Health check
-        health_result = self._send_health_check()
+        health_result = self._timed("health")
         
         # 2. Chat request with rotating prompt
-        prompt = self._get_next_prompt()
-        chat_result = self._send_chat_request(prompt)
+        chat_result = self._timed("chat")
         
         # 3. Metrics request (every 3rd cycle to reduce noise)
         metrics_result = None
         if self.current_prompt_index % 3 == 0:
-            metrics_result = self._send_metrics_request()
+            metrics_result = self._timed("metrics")
         
         cycle_time = time.time() - cycle_start
         
@@ -222,6 +795,264 @@ class LoadSimulator:
         
         return cycle_summary
     
+    def _send_endpoint(self, endpoint: str, prompt: str = None, model: str = None, stream: bool = None) -> Dict:
+        """Send a single request to the named endpoint (blocking)."""
+        if endpoint == "health":
+            return self._send_health_check()
+        if endpoint == "metrics":
+            return self._send_metrics_request()
+        return self._send_chat_request(prompt or self._get_next_prompt(), model, stream)
+    
+    def _timed(self, endpoint: str) -> Dict:
+        """Send one request and record its wall-clock latency."""
+        start = time.perf_counter()
+        result = self._send_endpoint(endpoint)
+        self.stats.sent += 1
+        self.stats.record(ENDPOINT_PATHS[endpoint], result, (time.perf_counter() - start) * 1000)
+        return result
+    
+    def write_report(self) -> Dict:
+        """Log the final summary and write the JSON/CSV report."""
+        self.stats.log_summary()
+        report = {
+            "target_url": self.target_url,
+            "mode": self.mode,
+            "target_rps": self.target_rps if self.mode == "open" else None,
+            **self.stats.snapshot(),
+        }
+        if self.replay_file:
+            report["replay_file"] = self.replay_file
+            report["replay_speed"] = self.replay_speed or "max"
+        rows = []
+        if self.scenario:
+            report["scenario"] = self.scenario["name"]
+            report["phases"] = [stats.snapshot() for stats in self.phase_stats]
+            for phase in report["phases"]:
+                rows.extend(LoadStats.csv_rows(phase))
+        rows.extend(LoadStats.csv_rows(report))
+        if self.report_path:
+            try:
+                write_report_files(self.report_path, report, rows)
+                logger.info(f"Load report written to {self.report_path}.json and {self.report_path}.csv")
+            except OSError as e:
+                logger.error(f"Failed to write load report: {e}")
+        return report
+    
+    async def _send_and_record(self, phase: LoadPhase, recorders: List[LoadStats], executor: ThreadPoolExecutor,
+                               started: float = None):
+        """Send one request from the phase mix and record it in every recorder."""
+        loop = asyncio.get_running_loop()
+        endpoint = phase.pick_endpoint()
+        prompt = phase.pick_prompt()
+        started = loop.time() if started is None else started
+        result = await loop.run_in_executor(executor, self._send_endpoint, endpoint, prompt)
+        latency_ms = (loop.time() - started) * 1000
+        for stats in recorders:
+            stats.record(ENDPOINT_PATHS[endpoint], result, latency_ms)
+    
+    async def _dispatch(self, intended: float, phase: LoadPhase, recorders: List[LoadStats],
+                        semaphore: asyncio.Semaphore, executor: ThreadPoolExecutor):
+        """Send one request once a concurrency slot is free, timing from the intended send time."""
+        async with semaphore:
+            # Measuring from the schedule (not the actual send) corrects for coordinated omission
+            await self._send_and_record(phase, recorders, executor, started=intended)
+    
+    async def _run_open_phase(self, phase: LoadPhase, recorders: List[LoadStats], executor: ThreadPoolExecutor):
+        """Issue requests at the phase rate regardless of how fast the target responds."""
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        pending = set()
+        start = loop.time()
+        next_send = start
+        next_report = start + self.report_interval
+        
+        while phase.duration_seconds <= 0 or next_send - start < phase.duration_seconds:
+            delay = next_send - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            
+            for stats in recorders:
+                stats.sent += 1
+            if len(pending) >= self.max_pending:
+                # Target can't keep up and the client backlog is full - count, don't queue forever
+                for stats in recorders:
+                    stats.record_dropped()
+            else:
+                task = asyncio.ensure_future(self._dispatch(next_send, phase, recorders, semaphore, executor))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            
+            if loop.time() >= next_report:
+                recorders[-1].log_summary()
+                next_report += self.report_interval
+            next_send = start + phase.next_arrival(next_send - start)
+        
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+    
+    async def _virtual_user(self, phase: LoadPhase, recorders: List[LoadStats], executor: ThreadPoolExecutor,
+                            end: float):
+        loop = asyncio.get_running_loop()
+        while loop.time() < end:
+            for stats in recorders:
+                stats.sent += 1
+            await self._send_and_record(phase, recorders, executor)
+            remaining = end - loop.time()
+            if remaining > 0:
+                await asyncio.sleep(min(phase.think_time(), remaining))
+    
+    async def _run_user_phase(self, phase: LoadPhase, recorders: List[LoadStats], executor: ThreadPoolExecutor):
+        """Run the phase's virtual users, each waiting its think time between requests."""
+        loop = asyncio.get_running_loop()
+        end = loop.time() + phase.duration_seconds
+        await asyncio.gather(*(self._virtual_user(phase, recorders, executor, end) for _ in range(phase.users)))
+        # A distributed worker may get no users in a small phase; still wait so phases stay aligned
+        if end > loop.time():
+            await asyncio.sleep(end - loop.time())
+    
+    async def run_open_loop(self, duration_seconds: float = 0) -> Dict:
+        """Issue requests at target_rps regardless of how fast the target responds."""
+        phase = LoadPhase("open", duration_seconds, rps=self.target_rps,
+                          endpoints=self.endpoint_weights, arrival=self.arrival_distribution)
+        with ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="load") as executor:
+            await self._run_open_phase(phase, [self.stats], executor)
+        return self.stats.snapshot()
+    
+    async def run_scenario(self) -> Dict:
+        """Run each scenario phase in order, reporting per phase."""
+        with ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix="load") as executor:
+            for phase in self.scenario["phases"]:
+                logger.info(f"--- Phase '{phase.name}' ({phase.duration_seconds:.0f}s) ---")
+                phase_stats = LoadStats(phase.name)
+                self.phase_stats.append(phase_stats)
+                recorders = [self.stats, phase_stats]
+                if phase.is_open:
+                    await self._run_open_phase(phase, recorders, executor)
+                else:
+                    await self._run_user_phase(phase, recorders, executor)
+                phase_stats.finish()
+                phase_stats.log_summary()
+        return self.stats.snapshot()
+    
+    def _load_replay(self) -> List[Dict]:
+        """Read a captured traffic file, keeping the requests this simulator can issue."""
+        routes = {path: endpoint for endpoint, path in ENDPOINT_PATHS.items()}
+        records, skipped = [], 0
+        with open(self.replay_file) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    skipped += 1
+                    continue
+                if record.get("route") not in routes or "ts" not in record:
+                    skipped += 1
+                    continue
+                record["endpoint"] = routes[record["route"]]
+                records.append(record)
+        records.sort(key=lambda r: r["ts"])
+        logger.info(f"Loaded {len(records)} requests to replay ({skipped} skipped)")
+        return records
+    
+    def _prompt_of_length(self, length) -> str:
+        """A prompt with the captured length, built from the configured prompts."""
+        prompt = self._get_next_prompt()
+        if not length:
+            return prompt
+        while len(prompt) < length:
+            prompt += " " + self._get_next_prompt()
+        return prompt[:length]
+    
+    async def _replay_request(self, record: Dict, intended: float, semaphore: asyncio.Semaphore,
+                              executor: ThreadPoolExecutor):
+        loop = asyncio.get_running_loop()
+        endpoint = record["endpoint"]
+        prompt = self._prompt_of_length(record.get("prompt_chars")) if endpoint == "chat" else None
+        async with semaphore:
+            # Replay each request as captured, streamed or not, whatever STREAM_CHAT says
+            result = await loop.run_in_executor(
+                executor, self._send_endpoint, endpoint, prompt, record.get("model"), record.get("stream")
+            )
+        self.stats.record(ENDPOINT_PATHS[endpoint], result, (loop.time() - intended) * 1000)
+    
+    async def run_replay(self) -> Dict:
+        """Replay captured requests, preserving inter-arrival gaps scaled by replay_speed."""
+        records = self._load_replay()
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        pending = set()
+        start = loop.time()
+        next_report = start + self.report_interval
+        
+        with ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix="load") as executor:
+            for record in records:
+                if self.replay_speed:
+                    intended = start + (record["ts"] - records[0]["ts"]) / self.replay_speed
+                    delay = intended - loop.time()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                else:
+                    # Max speed: keep max_concurrency requests in flight back to back
+                    while len(pending) >= self.max_concurrency:
+                        await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    intended = loop.time()
+                
+                self.stats.sent += 1
+                if len(pending) >= self.max_pending:
+                    self.stats.record_dropped()
+                else:
+                    task = asyncio.ensure_future(self._replay_request(record, intended, semaphore, executor))
+                    pending.add(task)
+                    task.add_done_callback(pending.discard)
+                
+                if loop.time() >= next_report:
+                    self.stats.log_summary()
+                    next_report += self.report_interval
+            
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        return self.stats.snapshot()
+    
+    def _coordinator_request(self, method: str, path: str, attempts: int = 30, **kwargs) -> Dict:
+        """Call the coordinator, retrying while it starts up (client errors are raised at once)."""
+        for attempt in range(attempts):
+            try:
+                response = self.session.request(method, f"{self.coordinator_url}{path}", timeout=10, **kwargs)
+                response.raise_for_status()
+                return response.json()
+            except requests.exceptions.RequestException as e:
+                rejected = e.response is not None and 400 <= e.response.status_code < 500
+                if rejected or attempt == attempts - 1:
+                    raise
+                logger.info(f"Waiting for coordinator at {self.coordinator_url}: {e}")
+                time.sleep(2)
+    
+    def run_worker(self) -> Dict:
+        """Register with the coordinator, start at its barrier, run our share and push results."""
+        registration = self._coordinator_request("post", "/register", json={"worker_id": self.worker_id})
+        index, count = registration["worker_index"], registration["worker_count"]
+        self.scenario = parse_scenario(registration["scenario"], index, count)
+        self.mode = "scenario"
+        self._configure_pool()
+        logger.info(f"Registered as worker {index + 1}/{count} for scenario '{self.scenario['name']}'")
+        
+        while True:
+            barrier = self._coordinator_request("get", "/barrier")
+            if barrier["ready"]:
+                break
+            time.sleep(0.2)
+        time.sleep(barrier["start_in"])
+        
+        self.stats = LoadStats()
+        asyncio.run(self.run_scenario())
+        self._coordinator_request("post", "/results", json={
+            "worker_id": self.worker_id,
+            "overall": self.stats.to_dict(),
+            "phases": [stats.to_dict() for stats in self.phase_stats],
+        })
+        logger.info("Results sent to coordinator")
+        return self.write_report()
+    
     def run(self):
         """Main load simulation loop."""
         if not self.enabled:
@@ -232,10 +1063,61 @@ class LoadSimulator:
                 logger.debug("Load simulator disabled, sleeping...")
             return
         
+        if self.role == "worker":
+            try:
+                self.run_worker()
+            except KeyboardInterrupt:
+                logger.info("Load simulator stopped by user")
+            except requests.exceptions.HTTPError as e:
+                if e.response is None or e.response.status_code != 409:
+                    raise
+                # e.g. a restarted pod under a new hostname after every slot was taken;
+                # exiting would only crash-loop, so stay up and idle instead
+                logger.error(f"Coordinator rejected this worker: {e.response.text.strip()} - idling")
+                try:
+                    while True:
+                        time.sleep(60)
+                except KeyboardInterrupt:
+                    logger.info("Load simulator stopped by user")
+            return
+        
+        if self.replay_file:
+            logger.info(f"Replaying captured traffic from {self.replay_file}...")
+            try:
+                asyncio.run(self.run_replay())
+            except KeyboardInterrupt:
+                logger.info("Load simulator stopped by user")
+            except OSError as e:
+                logger.error(f"Failed to read replay file: {e}")
+            finally:
+                self.write_report()
+            return
+        
+        if self.scenario:
+            logger.info(f"Starting load scenario '{self.scenario['name']}'...")
+            try:
+                asyncio.run(self.run_scenario())
+            except KeyboardInterrupt:
+                logger.info("Load simulator stopped by user")
+            finally:
+                self.write_report()
+            return
+        
+        if self.mode == "open":
+            logger.info(f"Starting open-loop load simulation at {self.target_rps} req/s...")
+            try:
+                asyncio.run(self.run_open_loop(self.duration_seconds))
+            except KeyboardInterrupt:
+                logger.info("Load simulator stopped by user")
+            finally:
+                self.write_report()
+            return
+        
         logger.info("Starting load simulation...")
         logger.info(f"Will send requests every {self.interval_seconds} seconds")
         
         cycle_count = 0
+        next_report = time.monotonic() + self.report_interval
         
         try:
             while True:
@@ -245,6 +1127,10 @@ class LoadSimulator:
                 # Run load cycle
                 cycle_result = self.run_load_cycle()
                 
+                if time.monotonic() >= next_report:
+                    self.stats.log_summary()
+                    next_report += self.report_interval
+                
                 # Wait for next interval
                 logger.info(f"Waiting {self.interval_seconds} seconds until next cycle...")
                 time.sleep(self.interval_seconds)
@@ -254,12 +1140,190 @@ class LoadSimulator:
         except Exception as e:
             logger.error(f"Load simulator crashed: {e}")
             raise
+        finally:
+            self.write_report()
+
+
+class LoadCoordinator:
+    """Coordinates distributed workers (LOAD_ROLE=coordinator).
+
+    Workers POST /register to get the shared scenario and their index, poll
+    GET /barrier until EXPECTED_WORKERS have registered (everyone then starts
+    START_DELAY_SECONDS later), and POST /results with their serialized
+    histograms. The coordinator merges them into cluster-wide percentiles and
+    throughput (also served at GET /report).
+    """
+
+    def __init__(self):
+        self.port = int(os.getenv("COORDINATOR_PORT", "8089"))
+        self.expected_workers = int(os.getenv("EXPECTED_WORKERS", "2"))
+        self.start_delay = float(os.getenv("START_DELAY_SECONDS", "5"))
+        self.result_timeout = float(os.getenv("RESULT_TIMEOUT_SECONDS", "120"))
+        self.report_path = os.getenv("REPORT_PATH", "/tmp/load-report")
+        
+        self.scenario_data = read_scenario_source()
+        if not self.scenario_data:
+            raise ValueError("coordinator needs SCENARIO_FILE or LOAD_SCENARIO")
+        self.scenario = parse_scenario(self.scenario_data)
+        
+        self.workers = {}  # worker_id -> worker_index
+        self.results = {}  # worker_id -> posted results
+        self.start_at = None
+        self.condition = threading.Condition()
+        self.server = None
+    
+    def register(self, worker_id: str) -> Dict:
+        with self.condition:
+            if worker_id not in self.workers:
+                if len(self.workers) >= self.expected_workers:
+                    raise ValueError(f"all {self.expected_workers} worker slots are taken")
+                self.workers[worker_id] = len(self.workers)
+                logger.info(f"Worker {worker_id} registered ({len(self.workers)}/{self.expected_workers})")
+                if len(self.workers) == self.expected_workers:
+                    self.start_at = time.monotonic() + self.start_delay
+                    self.condition.notify_all()
+            return {
+                "worker_index": self.workers[worker_id],
+                "worker_count": self.expected_workers,
+                "scenario": self.scenario_data,
+            }
+    
+    def barrier(self) -> Dict:
+        with self.condition:
+            if self.start_at is None:
+                return {"ready": False, "registered": len(self.workers)}
+            return {"ready": True, "start_in": max(0.0, self.start_at - time.monotonic())}
+    
+    def submit(self, worker_id: str, results: Dict):
+        with self.condition:
+            if worker_id not in self.workers:
+                raise ValueError(f"unknown worker {worker_id}")
+            self.results[worker_id] = results
+            logger.info(f"Results received from {worker_id} ({len(self.results)}/{self.expected_workers})")
+            self.condition.notify_all()
+    
+    def report(self) -> Dict:
+        """Merge every worker's results received so far."""
+        with self.condition:
+            results = list(self.results.values())
+        overall = LoadStats()
+        phases = [LoadStats(phase.name) for phase in self.scenario["phases"]]
+        for result in results:
+            overall.merge(LoadStats.from_dict(result["overall"]))
+            for merged, phase in zip(phases, result["phases"]):
+                merged.merge(LoadStats.from_dict(phase))
+        report = {
+            "mode": "distributed",
+            "scenario": self.scenario["name"],
+            "workers": len(results),
+            **overall.snapshot(),
+            "phases": [stats.snapshot() for stats in phases],
+        }
+        return report
+    
+    def _make_handler(self):
+        coordinator = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def _reply(self, status: int, body: Dict):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+            
+            def _body(self) -> Dict:
+                length = int(self.headers.get("Content-Length", 0))
+                return json.loads(self.rfile.read(length) or b"{}")
+            
+            def do_GET(self):
+                if self.path == "/health":
+                    self._reply(200, {"status": "ok", "workers": len(coordinator.workers)})
+                elif self.path == "/barrier":
+                    self._reply(200, coordinator.barrier())
+                elif self.path == "/report":
+                    self._reply(200, coordinator.report())
+                else:
+                    self._reply(404, {"error": "not found"})
+            
+            def do_POST(self):
+                try:
+                    body = self._body()
+                    if self.path == "/register":
+                        self._reply(200, coordinator.register(body["worker_id"]))
+                    elif self.path == "/results":
+                        coordinator.submit(body.pop("worker_id"), body)
+                        self._reply(200, {"status": "ok"})
+                    else:
+                        self._reply(404, {"error": "not found"})
+                except (KeyError, ValueError) as e:
+                    self._reply(409, {"error": str(e)})
+            
+            def log_message(self, format, *args):
+                logger.debug("coordinator: " + format, *args)
+        
+        return Handler
+    
+    def serve(self):
+        self.server = ThreadingHTTPServer(("", self.port), self._make_handler())
+        threading.Thread(target=self.server.serve_forever, name="coordinator-http", daemon=True).start()
+        logger.info(f"Load coordinator listening on port {self.port}, waiting for {self.expected_workers} workers")
+    
+    def run(self) -> Dict:
+        """Serve workers until every result is in (or the deadline passes), then write the merged report."""
+        self.serve()
+        scenario_seconds = sum(phase.duration_seconds for phase in self.scenario["phases"])
+        with self.condition:
+            self.condition.wait_for(lambda: self.start_at is not None)
+            deadline = self.start_at + scenario_seconds + self.result_timeout
+            self.condition.wait_for(
+                lambda: len(self.results) == self.expected_workers, timeout=max(0.0, deadline - time.monotonic())
+            )
+        if len(self.results) < self.expected_workers:
+            logger.warning(f"Only {len(self.results)}/{self.expected_workers} workers reported results")
+        
+        report = self.report()
+        logger.info(
+            f"Cluster summary ({report['workers']} workers): completed {report['completed']} "
+            f"({report['throughput_rps']:.2f} req/s), errors {report['errors']}, dropped {report['dropped']}"
+        )
+        for phase in report["phases"] + [report]:
+            for path, e in phase["endpoints"].items():
+                percentiles = " ".join(f"p{p:g}={e[f'p{p:g}_ms']:.0f}ms" for p in REPORT_PERCENTILES)
+                logger.info(f"  [{phase['name']}] {path}: n={e['count']} {e['throughput_rps']:.2f} req/s {percentiles}")
+        
+        rows = [row for phase in report["phases"] for row in LoadStats.csv_rows(phase)] + LoadStats.csv_rows(report)
+        if self.report_path:
+            try:
+                write_report_files(self.report_path, report, rows)
+                logger.info(f"Cluster report written to {self.report_path}.json and {self.report_path}.csv")
+            except OSError as e:
+                logger.error(f"Failed to write cluster report: {e}")
+        return report
+
+
+def _handle_sigterm(signum, frame):
+    # Kubernetes stops pods with SIGTERM; unwind like Ctrl+C so the final report is written
+    raise KeyboardInterrupt
 
 
 def main():
     """Main entry point."""
-    simulator = LoadSimulator()
-    simulator.run()
+    signal.signal(signal.SIGTERM, _handle_sigterm)
+    if os.getenv("LOAD_ROLE", "standalone").lower() == "coordinator":
+        LoadCoordinator().run()
+    else:
+        simulator = LoadSimulator()
+        simulator.run()
+    
+    # Distributed runs are finite; keep the pod up (and the coordinator's /report reachable)
+    if os.getenv("IDLE_AFTER_RUN", "false").lower() == "true":
+        try:
+            while True:
+                time.sleep(60)
+        except KeyboardInterrupt:
+            pass
 
 
 if __name__ == "__main__":
@@ -229,10 +229,41 @@ class AICompareClient {
         return await response.json();
     }
     
+    // Subscribe to server push updates; polling below only runs while this is down
+    subscribeToEvents() {
+        this.pushConnected = false;
+        if (!window.EventSource) {
+            return;
+        }
+        const events = new EventSource(`${this.apiBaseUrl}/events`);
+        events.onopen = () => {
+            this.pushConnected = true;
+            console.log('📡 Push updates connected');
+        };
+        events.onerror = () => {
+            // EventSource reconnects by itself; fall back to polling meanwhile
+            this.pushConnected = false;
+        };
+        events.addEventListener('demo_state', (e) => {
+            const state = JSON.parse(e.data);
+            this.availabilityDemoState = state.availability_demo.is_active || state.service_health_failure;
+            this.updateAvailabilityButton();
+        });
+        events.addEventListener('provider_status', (e) => {
+            const update = JSON.parse(e.data);
+            console.log('📡 Provider status:', update.summary);
+        });
+    }
+    
     // Generate continuous HTTP traffic for observability
     generateTraffic() {
+        this.subscribeToEvents();
+        
         // Health check every 30 seconds
         setInterval(async () => {
+            if (this.pushConnected) {
+                return;
+            }
             try {
                 await fetch('/health');
                 console.log('🟢 Health check - OK');
@@ -243,6 +274,9 @@ class AICompareClient {
         
         // Metrics check every 60 seconds  
         setInterval(async () => {
+            if (this.pushConnected) {
+                return;
+            }
             try {
                 const response = await fetch('/api/metrics');
                 const metrics = await response.json();
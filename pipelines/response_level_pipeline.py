@@ -12,11 +12,17 @@ This pipeline modifies user messages to request responses at different complexit
 The pipeline cycles through levels automatically for testing purposes.
 """
 
-from typing import List, Optional
+from typing import Iterator, List, Optional, Union
 import os
 import json
 import logging
+import subprocess
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
 
 class Pipeline:
     """Open WebUI Pipeline for Response Level Management"""
@@ -61,22 +67,61 @@ class Pipeline:
         self.current_level_index = 0
         self.mode = os.getenv("PIPELINE_MODE", "auto-cycle")  # "auto-cycle" or "manual"
         self.selected_level = 0  # For manual mode
+        # Guards level assignment and metrics - pipe() runs concurrently for concurrent users
+        self._lock = threading.Lock()
+        self.metrics = {
+            level["name"]: {
+                "requests": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0, "recent_ms": deque(maxlen=200),
+                "prompt_evals": 0, "prompt_eval_count": 0, "prompt_eval_ms": 0.0,
+            }
+            for level in self.levels
+        }
+        # "system": level modifier is a stable system prefix, so Ollama reuses the cached
+        # prompt prefix across requests at the same level; "append": legacy suffix on the user message
+        self.modifier_placement = os.getenv("LEVEL_MODIFIER_PLACEMENT", "system")
         
         # Model config checking for demo purposes
         self.model_config_check = os.getenv("MODEL_CONFIG_CHECK", "true").lower() == "true"
+        # Mounted ConfigMap key (updated in place by the kubelet); kubectl is the fallback
+        self.model_config_file = os.getenv("MODEL_CONFIG_FILE", "/etc/ai-compare-config/MODEL_CONFIG")
+        self.model_config_refresh_seconds = float(os.getenv("MODEL_CONFIG_REFRESH_SECONDS", "5"))
+        # (config_ok, config_value) - read per message, refreshed by a background watcher
+        self.model_config_state = (True, "models-latest")
+        self._model_config_mtime = None
+        self._kubectl_available = True
         
         # Ollama connection configuration
         self.ollama_base_url = os.getenv("OLLAMA_BASE_URL", "http://ollama-service:11434")
         if self.ollama_base_url.endswith('/'):
             self.ollama_base_url = self.ollama_base_url[:-1]
+        # Keep-alive connection pool to Ollama shared by all pipe() calls
+        pool_size = int(os.getenv("OLLAMA_POOL_SIZE", "16"))
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        # Parallel requests for run_all_levels(), kept within the connection pool
+        self.batch_concurrency = max(1, min(int(os.getenv("PIPELINE_BATCH_CONCURRENCY", "5")), pool_size))
         
         # Setup logging
         self.logger = logging.getLogger(__name__)
         self.logger.setLevel(logging.INFO)
+
+        # Level -> Ollama model routing, e.g. small fast model for Kid Mode, larger for Scientific
+        self.default_model = os.getenv("PIPELINE_DEFAULT_MODEL", "tinyllama:latest")
+        self.model_routes = self._load_model_routes()
+        self.model_tags_ttl_seconds = float(os.getenv("MODEL_TAGS_TTL_SECONDS", "60"))
+        self._available_models = None
+        self._available_models_at = 0.0
         
         self.logger.info(f"Response Level Pipeline initialized in {self.mode} mode")
         self.logger.info(f"Available levels: {[level['name'] for level in self.levels]}")
         self.logger.info(f"Ollama backend URL: {self.ollama_base_url}")
+        if self.model_routes:
+            self.logger.info(f"Level model routes: {self.model_routes} (default {self.default_model})")
+
+        if self.model_config_check:
+            self.refresh_model_config()
+            threading.Thread(target=self._watch_model_config, name="model-config-watcher", daemon=True).start()
 
     def get_current_level(self):
         """Get the current response level configuration"""
@@ -88,7 +133,83 @@ class Pipeline:
     def advance_level(self):
         """Advance to the next level (auto-cycle mode)"""
         if self.mode == "auto-cycle":
-            self.current_level_index = (self.current_level_index + 1) % len(self.levels)
+            with self._lock:
+                self.current_level_index = (self.current_level_index + 1) % len(self.levels)
+
+    def claim_level(self) -> int:
+        """Atomically take the level for one request and, in auto-cycle mode, advance the cycle"""
+        with self._lock:
+            if self.mode != "auto-cycle":
+                return self.selected_level
+            level_index = self.current_level_index
+            self.current_level_index = (level_index + 1) % len(self.levels)
+            return level_index
+
+    def _record(self, level_name: str, elapsed_ms: float, ok: bool):
+        """Add one request to the per-level metrics"""
+        with self._lock:
+            stats = self.metrics[level_name]
+            stats["requests"] += 1
+            stats["errors"] += 0 if ok else 1
+            stats["total_ms"] += elapsed_ms
+            stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+            stats["recent_ms"].append(elapsed_ms)
+
+    def _record_prompt_eval(self, level_name: str, response_data: dict):
+        """Track Ollama's prompt evaluation work, which the system prefix is meant to cut"""
+        if "prompt_eval_count" not in response_data and "prompt_eval_duration" not in response_data:
+            return
+        with self._lock:
+            stats = self.metrics[level_name]
+            stats["prompt_evals"] += 1
+            stats["prompt_eval_count"] += response_data.get("prompt_eval_count", 0)
+            stats["prompt_eval_ms"] += response_data.get("prompt_eval_duration", 0) / 1e6
+
+    def get_metrics(self) -> dict:
+        """Per-level request counts and latencies (percentiles over the last 200 requests)"""
+        with self._lock:
+            snapshot = {name: dict(stats, recent_ms=sorted(stats["recent_ms"])) for name, stats in self.metrics.items()}
+        result = {}
+        for name, stats in snapshot.items():
+            recent = stats["recent_ms"]
+            result[name] = {
+                "requests": stats["requests"],
+                "errors": stats["errors"],
+                "avg_ms": round(stats["total_ms"] / stats["requests"], 1) if stats["requests"] else None,
+                "p50_ms": round(recent[len(recent) // 2], 1) if recent else None,
+                "p95_ms": round(recent[min(len(recent) - 1, int(len(recent) * 0.95))], 1) if recent else None,
+                "max_ms": round(stats["max_ms"], 1),
+                "avg_prompt_eval_count": round(stats["prompt_eval_count"] / stats["prompt_evals"], 1)
+                if stats["prompt_evals"] else None,
+                "avg_prompt_eval_ms": round(stats["prompt_eval_ms"] / stats["prompt_evals"], 1)
+                if stats["prompt_evals"] else None,
+            }
+        return result
+
+    def apply_level(self, level: dict, user_message: str, messages: List[dict]) -> List[dict]:
+        """Return a copy of the conversation carrying the level's modifier (the caller's list is left alone)"""
+        modified_messages = [dict(message) for message in messages]
+        if not modified_messages:
+            modified_messages = [{"role": "user", "content": user_message}]
+        modifier = level["modifier"]
+        if not modifier:
+            return modified_messages
+
+        if self.modifier_placement == "append":
+            # Find the last user message and modify it
+            for i in range(len(modified_messages) - 1, -1, -1):
+                if modified_messages[i].get("role") == "user":
+                    modified_messages[i]["content"] = f"{modified_messages[i]['content']} {modifier}"
+                    break
+            return modified_messages
+
+        # Modifier first, then any existing system prompt: the prompt prefix is identical for every
+        # request at this level, so Ollama only evaluates the new conversation tokens
+        if modified_messages[0].get("role") == "system":
+            modified_messages[0]["content"] = f"{modifier}\n\n{modified_messages[0]['content']}"
+        else:
+            modified_messages.insert(0, {"role": "system", "content": modifier})
+        return modified_messages
 
     def set_level(self, level_index: int):
         """Set specific level (manual mode)"""
@@ -96,32 +217,103 @@ class Pipeline:
             self.selected_level = level_index
             self.logger.info(f"Level set to: {self.levels[level_index]['name']}")
 
+    def _load_model_routes(self) -> dict:
+        """Read the level -> model table from LEVEL_MODEL_ROUTES_FILE or LEVEL_MODEL_ROUTES (JSON)"""
+        routes_file = os.getenv("LEVEL_MODEL_ROUTES_FILE")
+        try:
+            if routes_file and os.path.exists(routes_file):
+                with open(routes_file) as f:
+                    routes = json.load(f)
+            else:
+                routes = json.loads(os.getenv("LEVEL_MODEL_ROUTES", "{}"))
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Invalid level model routes, using {self.default_model} for all levels: {e}")
+            return {}
+        level_names = {level["name"] for level in self.levels}
+        unknown = set(routes) - level_names
+        if unknown:
+            self.logger.warning(f"Ignoring model routes for unknown levels: {sorted(unknown)}")
+        return {name: model for name, model in routes.items() if name in level_names and model}
+
+    def _get_available_models(self) -> Optional[set]:
+        """Model names from Ollama /api/tags, cached for MODEL_TAGS_TTL_SECONDS (None if unknown)"""
+        now = time.monotonic()
+        if self._available_models is not None and now - self._available_models_at < self.model_tags_ttl_seconds:
+            return self._available_models
+        try:
+            response = self.session.get(f"{self.ollama_base_url}/api/tags", timeout=5)
+            response.raise_for_status()
+            self._available_models = {model["name"] for model in response.json().get("models", [])}
+        except Exception as e:
+            self.logger.warning(f"Could not list Ollama models: {e}")
+        # Failures are cached too, so an unreachable Ollama is not re-polled per message
+        self._available_models_at = now
+        return self._available_models
+
+    def resolve_model(self, level_name: str, model_id: str = "") -> str:
+        """Pick the Ollama model for a request: level route, then an Ollama model_id, then the default"""
+        available = self._get_available_models()
+        route = self.model_routes.get(level_name)
+        if route:
+            # Trust the route when the model list is unknown; Ollama reports a missing model itself
+            if available is None or route in available:
+                return route
+            self.logger.warning(f"Routed model {route} for {level_name} not available, falling back")
+        if model_id and available and model_id in available:
+            return model_id
+        return self.default_model
+
     def _check_model_config(self) -> tuple:
-        """Check ConfigMap for model configuration status"""
+        """Return the cached ConfigMap model configuration status"""
         if not self.model_config_check:
             return True, "models-latest"  # Skip check if disabled
-            
+        return self.model_config_state
+
+    def _watch_model_config(self):
+        """Keep model_config_state current without touching the request path"""
+        while True:
+            time.sleep(self.model_config_refresh_seconds)
+            self.refresh_model_config()
+
+    def refresh_model_config(self):
+        """Re-read MODEL_CONFIG from the mounted file if it changed, else via kubectl"""
         try:
-            import subprocess
-            import json
-            
-            # Try to get ConfigMap value
-            cmd = ["kubectl", "get", "configmap", "ai-compare-config", "-o", "jsonpath={.data.MODEL_CONFIG}"]
-            result = subprocess.run(cmd, capture_output=True, text=True, check=False)
-            
-            if result.returncode == 0 and result.stdout:
-                config_value = result.stdout.strip()
-                self.logger.info(f"ConfigMap MODEL_CONFIG value: {config_value}")
-                return config_value == "models-latest", config_value
+            if os.path.exists(self.model_config_file):
+                mtime = os.stat(self.model_config_file).st_mtime
+                if mtime == self._model_config_mtime:
+                    return
+                with open(self.model_config_file) as f:
+                    config_value = f.read().strip()
+                self._model_config_mtime = mtime
             else:
-                self.logger.info("ConfigMap not found or no MODEL_CONFIG, assuming working state")
-                return True, "models-latest"  # Default to working if ConfigMap not found
-                
+                config_value = self._read_model_config_kubectl()
         except Exception as e:
             self.logger.warning(f"Failed to check ConfigMap: {e}")
-            return True, "models-latest"  # Default to working if check fails
+            config_value = None
 
-    def pipe(self, user_message: str, model_id: str, messages: List[dict], body: dict) -> str:
+        if not config_value:
+            config_value = "models-latest"  # Default to working if ConfigMap not found
+        state = (config_value == "models-latest", config_value)
+        if state != self.model_config_state:
+            self.logger.info(f"ConfigMap MODEL_CONFIG value: {config_value}")
+        self.model_config_state = state
+
+    def _read_model_config_kubectl(self) -> Optional[str]:
+        """Read MODEL_CONFIG through the API server (when the ConfigMap is not mounted)"""
+        if not self._kubectl_available:
+            return None
+        cmd = ["kubectl", "get", "configmap", "ai-compare-config", "-o", "jsonpath={.data.MODEL_CONFIG}"]
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, check=False, timeout=10)
+        except FileNotFoundError:
+            self.logger.info("kubectl not available and MODEL_CONFIG not mounted, assuming working state")
+            self._kubectl_available = False
+            return None
+        if result.returncode == 0 and result.stdout:
+            return result.stdout.strip()
+        return None
+
+    def pipe(self, user_message: str, model_id: str, messages: List[dict], body: dict) -> Union[str, Iterator[str]]:
         """
         Main pipeline function called by Open WebUI
         
@@ -132,7 +324,8 @@ class Pipeline:
             body: Request body from Open WebUI
             
         Returns:
-            AI response from Ollama with modified prompt
+            AI response from Ollama with modified prompt, or a generator of
+            response chunks when the request body asks for ``stream``
         """
         try:
             # Check model configuration status first
@@ -140,40 +333,39 @@ class Pipeline:
             if not config_ok:
                 self.logger.error(f"Pipeline broken: MODEL_CONFIG is '{config_value}' instead of 'models-latest'")
                 return f"🔴 **Pipeline Service BROKEN**: Configuration error detected!\n\n❌ Expected: 'models-latest'\n🔧 Current: '{config_value}'\n\n💡 This pipeline cannot process requests with invalid model configuration.\n⚠️ Update the model config to 'models-latest' to restore functionality."
-            # Get current level configuration
-            current_level = self.get_current_level()
+            # Compare-levels request: every level for this prompt, returned as one JSON document
+            if body.get("all_levels"):
+                return json.dumps(self.run_all_levels(user_message, model_id, messages))
+
+            # Claim this request's level (and advance the cycle) in one atomic step
+            current_level = self.levels[self.claim_level()]
             
             # Log the pipeline action
             self.logger.info(f"Processing message with level: {current_level['name']}")
             self.logger.info(f"Original message: {user_message[:100]}...")
             
-            # Modify the last user message based on current level
-            modified_messages = messages.copy()
-            if current_level["modifier"] and modified_messages:
-                # Find the last user message and modify it
-                for i in range(len(modified_messages) - 1, -1, -1):
-                    if modified_messages[i].get("role") == "user":
-                        original_content = modified_messages[i]["content"]
-                        modified_messages[i]["content"] = f"{original_content} {current_level['modifier']}"
-                        break
-            elif current_level["modifier"]:
-                # If no messages, create a new modified message
-                modified_messages = [{"role": "user", "content": f"{user_message} {current_level['modifier']}"}]
+            modified_messages = self.apply_level(current_level, user_message, messages)
             
-            # Advance to next level for next request (auto-cycle mode)
             if self.mode == "auto-cycle":
-                self.advance_level()
-                next_level = self.levels[self.current_level_index]
-                self.logger.info(f"Next level will be: {next_level['name']}")
+                self.logger.info(f"Next level will be: {self.levels[self.current_level_index]['name']}")
             
             self.logger.info(f"Modified message: {modified_messages[-1]['content'][:150] if modified_messages else 'No messages'}...")
             
+            ollama_model = self.resolve_model(current_level["name"], model_id)
+
+            if body.get("stream"):
+                return self._stream_from_ollama(model_id, modified_messages, current_level["name"], ollama_model)
+
             # Forward the modified request to Ollama
+            start = time.monotonic()
             try:
-                ollama_response = self._forward_to_ollama(model_id, modified_messages)
+                ollama_response = self._forward_to_ollama(model_id, modified_messages, ollama_model,
+                                                          level_name=current_level["name"])
+                self._record(current_level["name"], (time.monotonic() - start) * 1000, ok=True)
                 self.logger.info(f"Ollama response received: {ollama_response[:100] if ollama_response else 'Empty'}...")
                 return ollama_response
             except Exception as ollama_error:
+                self._record(current_level["name"], (time.monotonic() - start) * 1000, ok=False)
                 self.logger.error(f"Ollama forwarding failed: {str(ollama_error)}")
                 return f"Pipeline processed the request with level '{current_level['name']}', but failed to get AI response: {str(ollama_error)}"
             
@@ -181,12 +373,52 @@ class Pipeline:
             self.logger.error(f"Pipeline error: {str(e)}")
             return f"Pipeline error: {str(e)}"
 
-    def _forward_to_ollama(self, model_id: str, messages: List[dict]) -> str:
+    def run_all_levels(self, user_message: str, model_id: str = "", messages: Optional[List[dict]] = None) -> dict:
+        """
+        Run one prompt at every response level in parallel (the cycle is not advanced)
+
+        Returns:
+            {"prompt", "total_ms", "concurrency", "results": [{"level", "model", "response", "ok", "elapsed_ms"}]}
+        """
+        messages = messages or []
+
+        def run_level(level: dict) -> dict:
+            ollama_model = self.resolve_model(level["name"], model_id)
+            start = time.monotonic()
+            try:
+                response = self._forward_to_ollama(model_id, self.apply_level(level, user_message, messages),
+                                                   ollama_model, level_name=level["name"])
+                ok = True
+            except Exception as e:
+                self.logger.error(f"Level {level['name']} failed: {str(e)}")
+                response, ok = str(e), False
+            elapsed_ms = (time.monotonic() - start) * 1000
+            self._record(level["name"], elapsed_ms, ok)
+            return {
+                "level": level["name"],
+                "model": ollama_model,
+                "response": response,
+                "ok": ok,
+                "elapsed_ms": round(elapsed_ms, 1),
+            }
+
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.batch_concurrency, thread_name_prefix="level-batch") as executor:
+            results = list(executor.map(run_level, self.levels))
+        return {
+            "prompt": user_message,
+            "total_ms": round((time.monotonic() - start) * 1000, 1),
+            "concurrency": self.batch_concurrency,
+            "results": results,
+        }
+
+    def _forward_to_ollama(self, model_id: str, messages: List[dict], ollama_model: Optional[str] = None,
+                           level_name: Optional[str] = None) -> str:
         """Forward the modified request to Ollama and return the response"""
         try:
-            # The model_id passed to pipeline is the pipeline name, not the Ollama model
-            # Use the actual Ollama model available in the cluster
-            ollama_model = "tinyllama:latest"  # Default model available in cluster
+            # The model_id passed to pipeline is usually the pipeline name, not the Ollama model;
+            # pipe() resolves the Ollama model from the level routing table
+            ollama_model = ollama_model or self.default_model
             
             self.logger.info(f"Pipeline called with model_id: {model_id}, using Ollama model: {ollama_model}")
             
@@ -197,8 +429,8 @@ class Pipeline:
                 "stream": False
             }
             
-            # Make the request to Ollama
-            response = requests.post(
+            # Make the request to Ollama over the pooled keep-alive session
+            response = self.session.post(
                 f"{self.ollama_base_url}/api/chat",
                 json=payload,
                 timeout=120
@@ -208,6 +440,8 @@ class Pipeline:
             # Parse the response
             response_data = response.json()
             content = response_data.get('message', {}).get('content', '')
+            if level_name:
+                self._record_prompt_eval(level_name, response_data)
             
             if content:
                 return content
@@ -219,6 +453,43 @@ class Pipeline:
         except Exception as e:
             raise Exception(f"Error processing Ollama response: {str(e)}")
 
+    def _stream_from_ollama(self, model_id: str, messages: List[dict], level_name: str,
+                            ollama_model: Optional[str] = None) -> Iterator[str]:
+        """Relay Ollama's NDJSON chunks as content strings as soon as they arrive"""
+        ollama_model = ollama_model or self.default_model
+        payload = {
+            "model": ollama_model,
+            "messages": messages,
+            "stream": True
+        }
+        self.logger.info(f"Streaming pipeline response for model_id: {model_id}, using Ollama model: {ollama_model}")
+        start = time.monotonic()
+        ok = False
+        try:
+            with self.session.post(
+                f"{self.ollama_base_url}/api/chat",
+                json=payload,
+                stream=True,
+                timeout=120
+            ) as response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    content = chunk.get("message", {}).get("content", "")
+                    if content:
+                        yield content
+                    if chunk.get("done"):
+                        self._record_prompt_eval(level_name, chunk)
+                        break
+            ok = True
+        except Exception as e:
+            self.logger.error(f"Ollama streaming failed: {str(e)}")
+            yield f"Pipeline processed the request with level '{level_name}', but failed to get AI response: {str(e)}"
+        finally:
+            self._record(level_name, (time.monotonic() - start) * 1000, ok)
+
     def get_info(self) -> dict:
         """Return pipeline information for Open WebUI"""
         return {
@@ -240,7 +511,10 @@ class Pipeline:
             "current_level": current_level["name"],
             "current_index": self.current_level_index if self.mode == "auto-cycle" else self.selected_level,
             "total_levels": len(self.levels),
-            "description": current_level["description"]
+            "description": current_level["description"],
+            "modifier_placement": self.modifier_placement,
+            "model_routes": {level["name"]: self.model_routes.get(level["name"], self.default_model) for level in self.levels},
+            "metrics": self.get_metrics()
         }
 
 